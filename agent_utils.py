@@ -1,19 +1,43 @@
-import google.generativeai as genai
+import asyncio
+import contextlib
 import os
-from dotenv import load_dotenv
+import time
+from collections import deque
+from extraction_cache import cache_key, get_extraction_cache
+from llm_backend import get_backend
+from metrics import stage
+from rate_limit import SingleFlight
+from rule_extractor import extract_rule_based
+from task_schema import TaskValidationError, coerce_task, parse_task_reply, record, tasks_from_json, tasks_to_json
+from task_stream import IncrementalTaskParser
+from transcript_chunker import estimate_tokens, find_duplicate, merge_tasks, split_transcript
 
-# Load Gemini API key from .env file
-load_dotenv()
-genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
+# Concurrency limits for the async path (see README → Configuration)
+MAX_IN_FLIGHT = int(os.getenv("LLM_MAX_IN_FLIGHT", "4"))
+QUEUE_TIMEOUT = float(os.getenv("LLM_QUEUE_TIMEOUT", "30"))
+CALL_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "60"))
 
-def extract_tasks_from_text(transcript: str):
-    """
-    Uses Gemini to extract action items (who, task, deadline, status)
-    from meeting transcripts or notes.
-    """
-    model = genai.GenerativeModel("models/gemini-2.5-flash")
+# Map-reduce mode for long transcripts
+CHUNK_TOKENS = int(os.getenv("CHUNK_TOKENS", "1500"))
+CHUNK_OVERLAP_TOKENS = int(os.getenv("CHUNK_OVERLAP_TOKENS", "150"))
+
+# Try the local pattern-based extractor before calling the model
+RULES_FAST_PATH = os.getenv("RULES_FAST_PATH", "1") != "0"
+
+# How many times to re-ask the model when its JSON cannot be repaired locally
+MAX_REASKS = int(os.getenv("LLM_MAX_REASKS", "1"))
+
+# Bump whenever the prompt changes so cached results from the old prompt are ignored
+PROMPT_VERSION = "2"
+
+
+class ExtractionTimeout(Exception):
+    """Raised when an extraction waits too long for a slot or for the model."""
 
-    prompt = f"""
+
+def build_extraction_prompt(transcript: str) -> str:
+    """Prompt shared by every extraction path."""
+    return f"""
     You are an AI agent that extracts actionable tasks from meeting notes.
     Return the output in **valid JSON format** as a list of objects with keys:
     person, task, deadline, and status (default status is 'Pending').
@@ -33,5 +57,313 @@ def extract_tasks_from_text(transcript: str):
     {transcript}
     """
 
-    response = model.generate_content(prompt)
-    return response.text.strip()
+
+def build_reask_prompt(reply: str, error: Exception) -> str:
+    """Last-resort follow-up when a reply could not be repaired locally."""
+    return (
+        "Your previous reply could not be parsed as the requested JSON "
+        f"({error}). Return ONLY a corrected JSON array of objects with keys "
+        "person, task, deadline and status. No prose, no code fences.\n\n"
+        f"Previous reply:\n{reply}"
+    )
+
+
+def _rule_fast_path(transcript: str):
+    """
+    Run the rule-based extractor first. Returns (rule_tasks, text_for_llm); text_for_llm
+    is "" when the rules covered every sentence, only the leftover sentences when they
+    covered some, and the whole transcript when they found nothing.
+    """
+    if not RULES_FAST_PATH:
+        return [], transcript
+    with stage("rules"):
+        rules = extract_rule_based(transcript)
+    if rules.complete:
+        return rules.tasks, ""
+    if not rules.tasks:
+        return [], transcript
+    return rules.tasks, "\n".join(rules.leftover)
+
+
+def extract_tasks_from_text(transcript: str):
+    """
+    Uses Gemini to extract action items (who, task, deadline, status)
+    from meeting transcripts or notes.
+    Simple sentences are handled by the rule-based fast path; only the rest reach the model.
+    Returns a list of validated `task_schema.Task` objects.
+    """
+    rule_tasks, llm_text = _rule_fast_path(transcript)
+    if not llm_text:
+        return rule_tasks
+    return merge_tasks([rule_tasks, _extract_llm(llm_text)])
+
+
+def _extract_llm(transcript: str):
+    backend = get_backend()
+    cache = get_extraction_cache()
+    key = cache_key(transcript, PROMPT_VERSION, backend.model_name)
+    with stage("cache_lookup"):
+        cached = cache.get(key)
+    if cached is not None:
+        return tasks_from_json(cached)
+
+    with stage("llm"):
+        reply = backend.generate(build_extraction_prompt(transcript))
+    for attempt in range(MAX_REASKS + 1):
+        try:
+            with stage("validation"):
+                tasks, _ = parse_task_reply(reply)
+            break
+        except TaskValidationError as e:
+            if attempt == MAX_REASKS:
+                raise
+            record("reasks")
+            with stage("llm"):
+                reply = backend.generate(build_reask_prompt(reply, e))
+
+    cache.set(key, tasks_to_json(tasks))
+    return tasks
+
+
+# ---------------------
+# ⚡ Async, concurrency-bounded path (used by the FastAPI backend)
+# ---------------------
+_semaphore = None
+_single_flight = SingleFlight()
+_stats = {"in_flight": 0, "waiting": 0, "completed": 0, "failed": 0, "timeouts": 0}
+
+
+def _get_semaphore():
+    global _semaphore
+    if _semaphore is None:
+        _semaphore = asyncio.Semaphore(MAX_IN_FLIGHT)
+    return _semaphore
+
+
+async def extract_tasks_async(transcript: str):
+    """
+    Non-blocking version of `extract_tasks_from_text`.
+    At most LLM_MAX_IN_FLIGHT calls run at once; the rest queue for up to
+    LLM_QUEUE_TIMEOUT seconds, and each call is cut off after LLM_TIMEOUT seconds.
+    Cached results (see extraction_cache) skip the queue entirely, and concurrent
+    requests for the same transcript are coalesced into one model call.
+    """
+    rule_tasks, llm_text = _rule_fast_path(transcript)
+    if not llm_text:
+        return rule_tasks
+    return merge_tasks([rule_tasks, await _extract_llm_async(llm_text)])
+
+
+async def _extract_llm_async(transcript: str):
+    backend = get_backend()
+    cache = get_extraction_cache()
+    key = cache_key(transcript, PROMPT_VERSION, backend.model_name)
+    with stage("cache_lookup"):
+        cached = await asyncio.to_thread(cache.get, key)
+    if cached is not None:
+        return tasks_from_json(cached)
+
+    # Identical transcripts already being extracted share that upstream call
+    return await _single_flight.do(key, lambda: _extract_uncached(backend, cache, key, transcript))
+
+
+@contextlib.asynccontextmanager
+async def _llm_slot():
+    """Wait (up to LLM_QUEUE_TIMEOUT) for one of the LLM_MAX_IN_FLIGHT model slots."""
+    semaphore = _get_semaphore()
+
+    _stats["waiting"] += 1
+    try:
+        with stage("llm_queue_wait"):
+            await asyncio.wait_for(semaphore.acquire(), QUEUE_TIMEOUT)
+    except asyncio.TimeoutError:
+        _stats["timeouts"] += 1
+        raise ExtractionTimeout("Server is busy, too many transcripts in progress. Please retry shortly.")
+    finally:
+        _stats["waiting"] -= 1
+
+    _stats["in_flight"] += 1
+    try:
+        yield
+    except ExtractionTimeout:
+        raise  # already counted in "timeouts"
+    except Exception:
+        _stats["failed"] += 1
+        raise
+    else:
+        _stats["completed"] += 1
+    finally:
+        _stats["in_flight"] -= 1
+        semaphore.release()
+
+
+async def _generate(backend, prompt):
+    try:
+        with stage("llm"):
+            return await asyncio.wait_for(backend.generate_async(prompt), CALL_TIMEOUT)
+    except asyncio.TimeoutError:
+        _stats["timeouts"] += 1
+        raise ExtractionTimeout(f"Model did not respond within {CALL_TIMEOUT:g}s.")
+
+
+async def _extract_uncached(backend, cache, key, transcript):
+    async with _llm_slot():
+        reply = await _generate(backend, build_extraction_prompt(transcript))
+        # Repair locally first; re-ask the model only as a bounded last resort
+        for attempt in range(MAX_REASKS + 1):
+            try:
+                with stage("validation"):
+                    tasks, _ = parse_task_reply(reply)
+                break
+            except TaskValidationError as e:
+                if attempt == MAX_REASKS:
+                    raise
+                record("reasks")
+                reply = await _generate(backend, build_reask_prompt(reply, e))
+
+    await asyncio.to_thread(cache.set, key, tasks_to_json(tasks))
+    return tasks
+
+
+def extraction_stats():
+    """Snapshot of the async extraction queue (in flight, waiting, completed, failed, timeouts, coalesced)."""
+    return dict(_stats, coalesced=_single_flight.coalesced)
+
+
+def should_chunk(transcript: str) -> bool:
+    """Long transcripts go through the map-reduce path automatically."""
+    return estimate_tokens(transcript) > CHUNK_TOKENS
+
+
+async def extract_tasks_chunked(transcript: str):
+    """
+    Map-reduce extraction for long transcripts: split into overlapping chunks,
+    extract each chunk concurrently (still bounded by LLM_MAX_IN_FLIGHT), then
+    merge and de-duplicate the tasks.
+    Returns (tasks, chunk_reports) where each report has index, tokens, seconds,
+    task count and any error.
+    """
+    chunks = split_transcript(transcript, CHUNK_TOKENS, CHUNK_OVERLAP_TOKENS)
+
+    async def run_chunk(index, chunk):
+        started = time.perf_counter()
+        report = {"index": index, "tokens": estimate_tokens(chunk)}
+        try:
+            tasks = await extract_tasks_async(chunk)
+            report["tasks"] = len(tasks)
+            return tasks, report
+        except Exception as e:
+            report["error"] = str(e)
+            return None, report
+        finally:
+            report["seconds"] = round(time.perf_counter() - started, 3)
+
+    results = await asyncio.gather(*(run_chunk(i, c) for i, c in enumerate(chunks)))
+    reports = [report for _, report in results]
+    task_lists = [tasks for tasks, _ in results if tasks is not None]
+    if not task_lists and reports:
+        raise RuntimeError(f"All {len(reports)} chunks failed: {reports[0]['error']}")
+    return merge_tasks(task_lists), reports
+
+
+# ---------------------
+# 📡 Streaming extraction (tasks are yielded as soon as each one is complete)
+# ---------------------
+_time_to_first_task = deque(maxlen=1000)
+
+
+async def stream_tasks(transcript: str):
+    """
+    Async generator of Tasks for `transcript`, yielded as the model writes them.
+    Long transcripts are chunked; each chunk's new (non-duplicate) tasks are yielded
+    as soon as that chunk finishes.
+    """
+    started = time.perf_counter()
+    first = True
+    async for task in (_stream_chunked(transcript) if should_chunk(transcript) else _stream_single(transcript)):
+        if first:
+            _time_to_first_task.append(time.perf_counter() - started)
+            first = False
+        yield task
+
+
+async def _stream_single(transcript: str):
+    # Rule-based tasks are available immediately; the model only streams the leftovers
+    rule_tasks, llm_text = _rule_fast_path(transcript)
+    for task in rule_tasks:
+        yield task
+    if llm_text:
+        async for task in _stream_llm(llm_text):
+            if find_duplicate(task, rule_tasks) is None:
+                yield task
+
+
+async def _stream_llm(transcript: str):
+    backend = get_backend()
+    cache = get_extraction_cache()
+    key = cache_key(transcript, PROMPT_VERSION, backend.model_name)
+    with stage("cache_lookup"):
+        cached = await asyncio.to_thread(cache.get, key)
+    if cached is not None:
+        for task in tasks_from_json(cached):
+            yield task
+        return
+
+    parser = IncrementalTaskParser()
+    pieces, emitted = [], []
+    async with _llm_slot():
+        stream = backend.generate_stream(build_extraction_prompt(transcript)).__aiter__()
+        # The whole stream, including the time the caller spends on each yielded task
+        with stage("llm"):
+            while True:
+                try:
+                    piece = await asyncio.wait_for(stream.__anext__(), CALL_TIMEOUT)
+                except StopAsyncIteration:
+                    break
+                except asyncio.TimeoutError:
+                    _stats["timeouts"] += 1
+                    raise ExtractionTimeout(f"Model stalled for more than {CALL_TIMEOUT:g}s.")
+                pieces.append(piece)
+                for item in parser.feed(piece):
+                    task = coerce_task(item)
+                    if task is not None:
+                        emitted.append(task)
+                        yield task
+
+    if not emitted:
+        # Not a streamable array (e.g. a single object or broken JSON): repair the whole reply
+        emitted, _ = parse_task_reply("".join(pieces))
+        for task in emitted:
+            yield task
+    await asyncio.to_thread(cache.set, key, tasks_to_json(emitted))
+
+
+async def _stream_chunked(transcript: str):
+    chunks = split_transcript(transcript, CHUNK_TOKENS, CHUNK_OVERLAP_TOKENS)
+    emitted, errors = [], []
+    for finished in asyncio.as_completed([extract_tasks_async(chunk) for chunk in chunks]):
+        try:
+            tasks = await finished
+        except Exception as e:
+            errors.append(e)  # a failed chunk only loses its own tasks
+            continue
+        for task in tasks:
+            if find_duplicate(task, emitted) is None:
+                emitted.append(task)
+                yield task
+    if chunks and len(errors) == len(chunks):
+        # Same as extract_tasks_chunked: "nothing worked" must not look like "no tasks"
+        raise RuntimeError(f"All {len(chunks)} chunks failed: {errors[0]}")
+
+
+def streaming_stats():
+    """Time-to-first-task over the last 1000 streams (seconds)."""
+    samples = sorted(_time_to_first_task)
+    if not samples:
+        return {"streams": 0}
+    return {
+        "streams": len(samples),
+        "time_to_first_task_avg": round(sum(samples) / len(samples), 3),
+        "time_to_first_task_p50": round(samples[len(samples) // 2], 3),
+        "time_to_first_task_p95": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 3),
+    }
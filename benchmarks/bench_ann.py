@@ -0,0 +1,101 @@
+"""
+Recall-vs-latency benchmark for the ChatMemory index tiers.
+
+    python -m benchmarks.bench_ann                          # 20k synthetic vectors, hnsw + ivf + ivfpq
+    python -m benchmarks.bench_ann --n 100000 --tiers hnsw,ivf
+    python -m benchmarks.bench_ann --vectors embeddings.npy --out ann.json
+
+Every tier is built with memory_index.build_ann (the same code the background
+promotion uses) and swept over its search-time knob (efSearch for HNSW, nprobe
+for IVF). recall@k is measured against exact IndexFlatL2 results; latency is
+per single query, which is how ChatMemory.retrieve searches.
+"""
+import argparse
+import json
+import statistics
+import time
+import faiss
+import numpy as np
+from memory_index import DIM, build_ann, set_search_params
+
+SWEEPS = {
+    "hnsw": ("efSearch", [16, 32, 64, 128]),
+    "ivf": ("nprobe", [1, 4, 16, 64]),
+    "ivfpq": ("nprobe", [4, 16, 64]),
+}
+
+
+def synthetic_vectors(n, dim=DIM, clusters=200, seed=0):
+    """Clustered unit vectors: closer to sentence embeddings than uniform noise."""
+    rng = np.random.default_rng(seed)
+    centres = rng.standard_normal((clusters, dim)).astype("float32")
+    vectors = centres[rng.integers(clusters, size=n)] + 0.6 * rng.standard_normal((n, dim)).astype("float32")
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def _latencies(index, queries, k):
+    samples = []
+    for query in queries:
+        started = time.perf_counter()
+        index.search(query.reshape(1, -1), k)
+        samples.append(time.perf_counter() - started)
+    samples.sort()
+    return {
+        "p50_ms": round(statistics.median(samples) * 1000, 4),
+        "p95_ms": round(samples[int(len(samples) * 0.95) - 1] * 1000, 4),
+    }
+
+
+def _recall(index, queries, truth, k):
+    _, found = index.search(queries, k)
+    hits = sum(len(set(row) & set(expected)) for row, expected in zip(found, truth))
+    return round(hits / truth.size, 4)
+
+
+def run(vectors, queries, tiers, k=3):
+    flat = faiss.IndexFlatL2(vectors.shape[1])
+    flat.add(vectors)
+    _, truth = flat.search(queries, k)
+    results = {"vectors": len(vectors), "queries": len(queries), "k": k,
+               "flat": {"recall": 1.0, **_latencies(flat, queries, k)}, "tiers": {}}
+
+    for tier in tiers:
+        started = time.perf_counter()
+        index = build_ann(tier, vectors)
+        build_seconds = round(time.perf_counter() - started, 3)
+        knob, values = SWEEPS[tier]
+        sweep = []
+        for value in values:
+            set_search_params(index, tier, {knob: value})
+            sweep.append({knob: value, "recall": _recall(index, queries, truth, k), **_latencies(index, queries, k)})
+        results["tiers"][tier] = {"build_seconds": build_seconds, "sweep": sweep}
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--n", type=int, default=20000, help="synthetic store size")
+    parser.add_argument("--vectors", help=".npy file of real embeddings to use instead of synthetic ones")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=3)
+    parser.add_argument("--tiers", default="hnsw,ivf,ivfpq")
+    parser.add_argument("--out", help="write JSON results here instead of stdout")
+    args = parser.parse_args()
+
+    if args.vectors:
+        vectors = np.load(args.vectors).astype("float32")
+    else:
+        vectors = synthetic_vectors(args.n + args.queries)
+    # Held-out queries drawn from the same distribution
+    vectors, queries = np.ascontiguousarray(vectors[:-args.queries]), np.ascontiguousarray(vectors[-args.queries:])
+
+    results = run(vectors, queries, [t.strip() for t in args.tiers.split(",") if t.strip()], args.k)
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(results, f, indent=2)
+    else:
+        print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Deadline parsing microbenchmark: dateparser.parse once per task (the previous
+export_ics / calendar path) vs deadline_parser.parse_deadlines.
+
+    python -m benchmarks.bench_deadlines                  # 10k tasks drawn from our real deadline strings
+    python -m benchmarks.bench_deadlines --tasks 100000 --out deadlines.json
+
+The phrases are the deadlines in benchmarks/data/extraction_cases.json plus the
+variants the rule extractor accepts. "cold" starts with an empty memo cache,
+"warm" repeats the batch as a second export would. `agreement` is the share of
+phrases where both parsers return the same datetime, counted over the phrases
+dateparser understands.
+"""
+import argparse
+import json
+import os
+import random
+import time
+from datetime import datetime
+import deadline_parser
+
+CASES_PATH = os.path.join(os.path.dirname(__file__), "data", "extraction_cases.json")
+EXTRA_PHRASES = ["Friday", "Monday", "tomorrow", "next week", "by Friday", "end of the week", "today",
+                 "Nov 14", "next Monday", "tomorrow morning", "in 3 days", "end of month", "2025-11-14", "EOD"]
+SETTINGS = {"PREFER_DATES_FROM": "future"}
+
+
+def real_phrases(path=CASES_PATH):
+    with open(path) as f:
+        cases = json.load(f)["cases"]
+    found = [t["deadline"] for case in cases for t in case["expected"] if t.get("deadline")]
+    return found + EXTRA_PHRASES
+
+
+def workload(phrases, n, seed=0):
+    """`n` deadlines, skewed towards the first phrases as real exports are towards "Friday"/"tomorrow"."""
+    rng = random.Random(seed)
+    weights = [1 / (rank + 1) for rank in range(len(phrases))]
+    return rng.choices(phrases, weights=weights, k=n)
+
+
+def run(texts, now):
+    import dateparser
+
+    dateparser.parse("Friday", settings=SETTINGS)  # pay dateparser's one-off warm-up outside the timings
+    results = {"tasks": len(texts), "distinct_phrases": len(set(texts))}
+
+    started = time.perf_counter()
+    baseline = [dateparser.parse(text, settings=dict(SETTINGS, RELATIVE_BASE=now)) for text in texts]
+    results["dateparser_seconds"] = round(time.perf_counter() - started, 4)
+
+    deadline_parser._cache.clear()
+    started = time.perf_counter()
+    parsed = deadline_parser.parse_deadlines(texts, now)
+    results["batch_cold_seconds"] = round(time.perf_counter() - started, 4)
+
+    started = time.perf_counter()
+    deadline_parser.parse_deadlines(texts, now)
+    results["batch_warm_seconds"] = round(time.perf_counter() - started, 4)
+
+    started = time.perf_counter()
+    for text in texts:
+        deadline_parser.parse_deadline(text, now)
+    results["single_calls_seconds"] = round(time.perf_counter() - started, 4)
+
+    base = results["dateparser_seconds"]
+    for key in ("batch_cold", "batch_warm", "single_calls"):
+        results[f"{key}_speedup"] = round(base / max(results[f"{key}_seconds"], 1e-9), 1)
+    understood = [(a, b) for a, b in zip(baseline, parsed) if a is not None]
+    results["agreement"] = round(sum(a == b for a, b in understood) / len(understood), 4) if understood else None
+    results["parsed_only_by_fast_path"] = len({t for t, a, b in zip(texts, baseline, parsed) if a is None and b})
+    results["stats"] = deadline_parser.deadline_stats()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=10000)
+    parser.add_argument("--out", help="write JSON results here instead of stdout")
+    args = parser.parse_args()
+
+    results = run(workload(real_phrases(), args.tasks), datetime.now().replace(microsecond=0))
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(results, f, indent=2)
+    else:
+        print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
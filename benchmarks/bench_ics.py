@@ -0,0 +1,122 @@
+"""
+ICS export benchmark: the previous ics.Calendar exporter vs the streaming
+exporter, plus an incremental merge into an existing export.
+
+    python -m benchmarks.bench_ics                         # 100k tasks (previous exporter on 10k)
+    python -m benchmarks.bench_ics --tasks 20000 --legacy-tasks 20000 --out ics.json
+
+The previous exporter needs the `ics` package, which the app no longer depends
+on (`pip install ics`); without it that comparison is skipped.
+
+Tasks are generated lazily, so the streaming export never holds them all.
+Memory is the tracemalloc peak. Deadlines go through the shared cached parser
+in both exporters, so the numbers isolate the writer (see bench_deadlines for
+the parsing side). The incremental run changes `--changed` tasks' status and
+deadline, adds as many new ones, and merges them into the 100k-event file.
+"""
+import argparse
+import importlib.util
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import timedelta
+from deadline_parser import parse_deadlines
+from export_ics import export_tasks_to_ics, parse_deadline
+
+NAMES = ["Riya", "Arjun", "Nisha", "Kavya", "Rohan", "Meera", "Vikram", "Ananya", "Ishaan", "Priya"]
+VERBS = ["Finalize", "Review", "Draft", "Prepare", "Update", "Schedule", "Fix", "Collect"]
+DEADLINES = ["Friday", "tomorrow", "Monday", "next week", "end of the week", "Nov 14", "Wednesday", "", "today"]
+
+
+def synthetic_tasks(n, seed=0):
+    rng = random.Random(seed)
+    for i in range(n):
+        yield {"person": rng.choice(NAMES), "task": f"{rng.choice(VERBS)} item #{i}",
+               "deadline": rng.choice(DEADLINES), "status": "Pending"}
+
+
+def legacy_export(tasks, filename):
+    """The exporter this module replaced: whole ics.Calendar in memory, random UIDs."""
+    from ics import Calendar, Event
+
+    calendar = Calendar()
+    tasks = list(tasks)
+    for t, parsed_date in zip(tasks, parse_deadlines([t.get("deadline", "") for t in tasks])):
+        event = Event()
+        event.name = f"{t.get('person', 'Someone')} - {t.get('task', 'Unnamed Task')}"
+        event.description = f"Status: {t.get('status', 'Pending')}"
+        event.begin = parse_deadline(t.get("deadline", ""), parsed_date)
+        event.end = event.begin + timedelta(hours=1)
+        calendar.events.add(event)
+    with open(filename, "w") as f:
+        f.writelines(calendar)
+
+
+def measure(fn, make_args, **kwargs):
+    """Time one run, then repeat it under tracemalloc for the peak (tracing slows it down a lot)."""
+    started = time.perf_counter()
+    fn(*make_args(), **kwargs)
+    seconds = time.perf_counter() - started
+    tracemalloc.start()
+    fn(*make_args(), **kwargs)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"seconds": round(seconds, 3), "peak_mb": round(peak / 2**20, 2)}
+
+
+def changed_tasks(n, changed, seed=0):
+    """`changed` existing tasks with a new status/deadline, plus `changed` brand-new ones."""
+    rng = random.Random(seed + 1)
+    picks = set(rng.sample(range(n), min(changed, n)))
+    for i, task in enumerate(synthetic_tasks(n, seed)):
+        if i in picks:
+            yield dict(task, status="Done", deadline=rng.choice(DEADLINES))
+    for j in range(changed):
+        yield {"person": rng.choice(NAMES), "task": f"New item #{j}", "deadline": "Friday", "status": "Pending"}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=100000)
+    parser.add_argument("--legacy-tasks", type=int, default=10000, help="the previous exporter is much slower")
+    parser.add_argument("--changed", type=int, default=1000)
+    parser.add_argument("--out", help="write JSON results here instead of stdout")
+    args = parser.parse_args()
+
+    results = {"tasks": args.tasks}
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "tasks.ics")
+        if args.legacy_tasks and importlib.util.find_spec("ics") is None:
+            print("⚠️ Warning: ics is not installed, skipping the previous exporter", file=sys.stderr)
+            args.legacy_tasks = 0
+        if args.legacy_tasks:
+            results["legacy"] = dict(tasks=args.legacy_tasks, **measure(
+                legacy_export, lambda: (synthetic_tasks(args.legacy_tasks), path)))
+            results["streaming_same_size"] = measure(
+                export_tasks_to_ics, lambda: (synthetic_tasks(args.legacy_tasks), path))
+        results["streaming"] = measure(export_tasks_to_ics, lambda: (synthetic_tasks(args.tasks), path))
+        results["file_mb"] = round(os.path.getsize(path) / 2**20, 2)
+        merge_path = os.path.join(tmp, "merged.ics")
+
+        def merge_args():
+            shutil.copyfile(path, merge_path)  # merge into a fresh copy of the full export each time
+            return list(changed_tasks(args.tasks, args.changed)), merge_path
+
+        results["incremental_merge"] = dict(changed=args.changed, added=args.changed, **measure(
+            export_tasks_to_ics, merge_args, incremental=True))
+        with open(merge_path, encoding="utf-8") as f:
+            results["events_after_merge"] = sum(line.startswith("BEGIN:VEVENT") for line in f)
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(results, f, indent=2)
+    else:
+        print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Import-time profile of the app's entry points: how long a cold `import` takes
+in a fresh interpreter and which packages that time goes to, from
+`python -X importtime`.
+
+    python -m benchmarks.bench_imports                            # every entry point, 3 runs each
+    python -m benchmarks.bench_imports --modules main,chat_app --top 15 --out imports.json
+
+"chat_app" is a Streamlit script, so importing it would render the page; its
+top-level import statements are profiled instead, which is what the page pays
+before it can draw anything (memory, the embedding model and the Google
+clients load in the background after that, see warmup.py). `seconds` is the
+fastest of --repeat runs; `slowest` attributes that run's time to top-level
+packages (self time, so nothing is counted twice) and `project_ms` is the
+share spent in this repository's own modules. Modules the bare interpreter
+already loads at startup are left out.
+"""
+import argparse
+import ast
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODULES = ("chat_app", "main", "memory_service", "memory_manager", "memory_client", "google_calendar", "export_ics")
+TIMER = "import time as _t\n_s = _t.perf_counter()\n{imports}\nprint(_t.perf_counter() - _s)"
+
+
+def import_code(module):
+    """Python source that imports `module` (only the top-level imports, for chat_app)."""
+    if module != "chat_app":
+        return f"import {module}"
+    with open(os.path.join(ROOT, "chat_app.py"), encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    return "\n".join(ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom)))
+
+
+def run(code):
+    """(wall seconds, [(depth, self_us, name)]) for `code` in a fresh interpreter."""
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [ROOT, os.getenv("PYTHONPATH")])))
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", TIMER.format(imports=code)],
+                          cwd=ROOT, env=env, capture_output=True, text=True)
+    if proc.returncode:
+        raise RuntimeError((proc.stderr.strip().splitlines() or ["import failed"])[-1])
+    entries = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|", 2)
+        name = name[1:]
+        entries.append((len(name) - len(name.lstrip()), int(self_us), name.strip()))
+    return float(proc.stdout.strip().splitlines()[-1]), entries
+
+
+def project_modules():
+    return {name[:-3] for name in os.listdir(ROOT) if name.endswith(".py")} | {"benchmarks"}
+
+
+def profile(module, repeat, top, startup, own):
+    best = None
+    for _ in range(repeat):
+        seconds, entries = run(import_code(module))
+        if best is None or seconds < best[0]:
+            best = (seconds, entries)
+    seconds, entries = best
+    by_package = {}
+    for _, self_us, name in entries:
+        if name not in startup:
+            package = name.split(".")[0]
+            by_package[package] = by_package.get(package, 0) + self_us
+    slowest = sorted(by_package.items(), key=lambda item: item[1], reverse=True)[:top]
+    return {
+        "seconds": round(seconds, 4),
+        "modules_imported": sum(1 for _, _, name in entries if name not in startup),
+        "project_ms": round(sum(us for package, us in by_package.items() if package in own) / 1000, 1),
+        "slowest": [{"package": package, "ms": round(us / 1000, 1)} for package, us in slowest],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modules", default=",".join(MODULES), help="comma-separated entry points to profile")
+    parser.add_argument("--repeat", type=int, default=3, help="fresh interpreters per module; the fastest counts")
+    parser.add_argument("--top", type=int, default=10, help="packages listed per module")
+    parser.add_argument("--out", help="write JSON results here instead of stdout")
+    args = parser.parse_args()
+
+    startup = {name for _, _, name in run("pass")[1]}
+    own = project_modules()
+    results = {"python": sys.version.split()[0], "modules": {}}
+    for module in args.modules.split(","):
+        print(f"⏱️ {module}...", file=sys.stderr)
+        try:
+            results["modules"][module] = profile(module, args.repeat, args.top, startup, own)
+        except RuntimeError as e:
+            results["modules"][module] = {"error": str(e)}
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(results, f, indent=2)
+    else:
+        print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
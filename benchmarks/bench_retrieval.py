@@ -0,0 +1,139 @@
+"""
+Retrieval benchmark: vector-only memory search (the previous ChatMemory.retrieve
+path) vs hybrid BM25 + vector search with reciprocal rank fusion.
+
+    python -m benchmarks.bench_retrieval                  # 500 synthetic meetings, 200 queries, top_k=3
+    python -m benchmarks.bench_retrieval --meetings 5000 --top-k 5 --out retrieval.json
+
+The corpus is built in the same "Meeting Summary / Tasks / person → task" shape
+ChatMemory stores. Queries mention a project code and/or an assignee of one
+target meeting; a hit means the target meeting is in the returned top_k.
+Latency covers query embedding, search and the line filter, as in retrieve().
+"""
+import argparse
+import json
+import random
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from bm25_index import BM25Index, reciprocal_rank_fusion, tokenize
+from embedding_cache import CachedEmbedder, EmbeddingCache
+from memory_index import TieredIndex
+
+MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+NAMES = ["Riya", "Arjun", "Nisha", "Kavya", "Rohan", "Meera", "Vikram", "Ananya", "Ishaan", "Priya", "Aditya",
+         "Sneha", "Karan", "Pooja", "Rahul", "Divya", "Siddharth", "Tanvi", "Farhan", "Leela", "Omar", "Grace",
+         "Tomasz", "Ingrid", "Mateo", "Yuki", "Chidi", "Astrid", "Bilal", "Noor"]
+TASKS = ["finalize the {p} campaign design", "collect customer feedback on {p}", "draft the {p} launch email",
+         "review the {p} budget", "fix the {p} onboarding bug", "prepare the {p} investor deck",
+         "update the {p} pricing page", "schedule the {p} vendor call", "write the {p} release notes"]
+PRODUCTS = ["EcoGlow", "BrightPay", "CloudNest", "GreenLeaf", "SwiftCart", "PulseFit", "NovaDesk", "TerraByte"]
+DEADLINES = ["Monday", "Tuesday", "Friday", "next week", "tomorrow", "Nov 14", "end of month"]
+
+
+def synthetic_meetings(n, seed=0):
+    """[(text, code, people)] for `n` meetings, each with a unique project code."""
+    rng = random.Random(seed)
+    meetings = []
+    for i in range(n):
+        code = f"PRJ-{1000 + i * 7 % 9000}"
+        product = rng.choice(PRODUCTS)
+        people = rng.sample(NAMES, 3)
+        lines = [f"Meeting Summary: {product} sync for {code}.", "Tasks:"]
+        for person in people:
+            task = rng.choice(TASKS).format(p=product)
+            lines.append(f"{person} → {task[0].upper() + task[1:]} for {code} (Deadline: {rng.choice(DEADLINES)})")
+        meetings.append(("\n".join(lines), code, people))
+    return meetings
+
+
+def synthetic_queries(meetings, n, seed=1):
+    rng = random.Random(seed)
+    queries = []
+    for target in rng.sample(range(len(meetings)), min(n, len(meetings))):
+        _, code, people = meetings[target]
+        template = rng.choice(["What is {code} about?", "What did {person} take on for {code}?",
+                               "When is {person}'s deadline on {code}?", "Show tasks for {code}"])
+        queries.append((template.format(code=code, person=rng.choice(people)), target))
+    return queries
+
+
+def _filter_substring(results, query):
+    """The previous line filter: every query word substring-matched against every line."""
+    words = query.lower().split()
+    return [line for r in results for line in r.split("\n") if any(w in line.lower() for w in words)]
+
+
+def _filter_tokens(results, query):
+    terms = set(tokenize(query))
+    return [line for r in results for line in r.split("\n") if terms.intersection(tokenize(line))]
+
+
+def run(meetings, queries, embedder, top_k=3, candidates=20):
+    texts = [text for text, _, _ in meetings]
+    index = TieredIndex(tier="flat")
+    index.add(embedder.embed(texts))
+    bm25 = BM25Index()
+    bm25.add_many(texts)
+    pool = ThreadPoolExecutor(max_workers=2)
+
+    def vector_ids(query, depth):
+        _, ids = index.search(embedder.embed_one(query), depth)
+        return [int(i) for i in ids[0] if i >= 0]
+
+    def vector_only(query):
+        ids = vector_ids(query, top_k)
+        _filter_substring([texts[i] for i in ids], query)
+        return ids
+
+    def hybrid(query):
+        depth = max(top_k, candidates)
+        future = pool.submit(vector_ids, query, depth)
+        lexical = [doc_id for doc_id, _ in bm25.search(query, depth)]
+        ids = reciprocal_rank_fusion([future.result(), lexical], top_k)
+        _filter_tokens([texts[i] for i in ids], query)
+        return ids
+
+    results = {"meetings": len(meetings), "queries": len(queries), "top_k": top_k}
+    for name, search in (("vector_only", vector_only), ("hybrid_rrf", hybrid)):
+        hits, latencies = 0, []
+        for query, target in queries:
+            started = time.perf_counter()
+            ids = search(query)
+            latencies.append(time.perf_counter() - started)
+            hits += target in ids
+        latencies.sort()
+        results[name] = {
+            "hit_rate": round(hits / len(queries), 4),
+            "p50_ms": round(statistics.median(latencies) * 1000, 3),
+            "p95_ms": round(latencies[int(len(latencies) * 0.95) - 1] * 1000, 3),
+        }
+    pool.shutdown()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--meetings", type=int, default=500)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=3)
+    parser.add_argument("--candidates", type=int, default=20, help="results taken from each retriever before fusion")
+    parser.add_argument("--model", default=MODEL)
+    parser.add_argument("--out", help="write JSON results here instead of stdout")
+    args = parser.parse_args()
+
+    from langchain_huggingface import HuggingFaceEmbeddings
+
+    # No query caching here: each query pays for its embedding, as a first-time question would
+    embedder = CachedEmbedder(HuggingFaceEmbeddings(model_name=args.model), args.model, EmbeddingCache(memory_items=0))
+    meetings = synthetic_meetings(args.meetings)
+    results = run(meetings, synthetic_queries(meetings, args.queries), embedder, args.top_k, args.candidates)
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(results, f, indent=2)
+    else:
+        print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Offline benchmark: rule-based fast path vs the expected extractions in
+benchmarks/data/extraction_cases.json.
+
+    python -m benchmarks.bench_rules                 # score the rules against the cases
+    python -m benchmarks.bench_rules --record        # re-record expected output + latency from the live model
+    python -m benchmarks.bench_rules --out rules.json
+
+The checked-in cases are a hand-labelled gold set (including transcripts with
+no tasks), so they have no model latencies: until they are re-recorded with
+--record, `llm_seconds_median` and `hybrid_seconds_mean` are null and only
+rule accuracy and rule latency are reported. `source` in the output says
+which kind of cases were used.
+
+Accuracy counts a task as correct when the person matches and the task text is
+near-identical (same threshold the chunk merger uses for duplicates).
+"""
+import argparse
+import json
+import os
+import statistics
+import time
+from rule_extractor import extract_rule_based
+from transcript_chunker import find_duplicate
+
+CASES_PATH = os.path.join(os.path.dirname(__file__), "data", "extraction_cases.json")
+
+
+def _score(predicted, expected):
+    """(true positives, predicted count, expected count) for one case."""
+    remaining = list(expected)
+    hits = 0
+    for task in predicted:
+        i = find_duplicate(task, remaining, similarity=0.8)
+        if i is not None:
+            hits += 1
+            remaining.pop(i)
+    return hits, len(predicted), len(expected)
+
+
+def record(data):
+    """Replace `expected`/`llm_seconds` with fresh output from the configured LLM backend."""
+    from agent_utils import _extract_llm
+    from llm_backend import get_backend
+
+    data["source"] = f"recorded from {get_backend().model_name}"
+    for case in data["cases"]:
+        started = time.perf_counter()
+        tasks = _extract_llm(case["transcript"])
+        case["llm_seconds"] = round(time.perf_counter() - started, 3)
+        case["expected"] = [{"person": t.person, "task": t.task, "deadline": t.deadline} for t in tasks]
+
+
+def run(cases, repeats=200, source=None):
+    per_case, hits, predicted, expected = [], 0, 0, 0
+    rule_latencies, hybrid_latencies, missing_llm = [], [], 0
+    llm_latencies = [c["llm_seconds"] for c in cases if c.get("llm_seconds")]
+    llm_median = statistics.median(llm_latencies) if llm_latencies else None
+
+    for case in cases:
+        samples = []
+        for _ in range(repeats):
+            started = time.perf_counter()
+            result = extract_rule_based(case["transcript"])
+            samples.append(time.perf_counter() - started)
+        rule_seconds = statistics.median(samples)
+        rule_latencies.append(rule_seconds)
+
+        h, p, e = _score(result.tasks, case["expected"])
+        hits, predicted, expected = hits + h, predicted + p, expected + e
+        llm_seconds = case.get("llm_seconds") or llm_median
+        if result.complete:
+            hybrid_latencies.append(rule_seconds)
+        elif llm_seconds is not None:
+            hybrid_latencies.append(rule_seconds + llm_seconds)
+        else:
+            missing_llm += 1  # handed to the model, but no timing to charge for it
+        per_case.append({
+            "complete": result.complete,
+            "rule_tasks": len(result.tasks),
+            "leftover_sentences": len(result.leftover),
+            "correct": h,
+            "expected": e,
+            "rule_ms": round(rule_seconds * 1000, 3),
+            "llm_seconds": case.get("llm_seconds"),
+        })
+
+    return {
+        "source": source,
+        "cases": len(cases),
+        "fully_covered": sum(c["complete"] for c in per_case),
+        "rule_precision": round(hits / predicted, 3) if predicted else None,
+        "rule_recall": round(hits / expected, 3) if expected else None,
+        "rule_ms_median": round(statistics.median(rule_latencies) * 1000, 3),
+        "llm_seconds_median": llm_median,
+        # Only meaningful when every case the rules hand over has a model latency to add
+        "hybrid_seconds_mean": round(statistics.mean(hybrid_latencies), 4) if hybrid_latencies and not missing_llm else None,
+        "per_case": per_case,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cases", default=CASES_PATH)
+    parser.add_argument("--record", action="store_true", help="re-record expected outputs from the live model")
+    parser.add_argument("--repeats", type=int, default=200)
+    parser.add_argument("--out", help="write JSON results here instead of stdout")
+    args = parser.parse_args()
+
+    with open(args.cases) as f:
+        data = json.load(f)
+    if args.record:
+        record(data)
+        with open(args.cases, "w") as f:
+            json.dump(data, f, indent=2)
+
+    results = run(data["cases"], args.repeats, data.get("source"))
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(results, f, indent=2)
+    else:
+        print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""
+Local stub of the Google Calendar events API (insert, update, batch) for
+exercising google_calendar.sync_events without a Google account.
+
+    python -m benchmarks.calendar_stub                       # sync 50 events: one per request vs batched, then resync
+    python -m benchmarks.calendar_stub --events 200 --latency 0.1 --fail-rate 0.1
+    python -m benchmarks.calendar_stub --serve --port 8089   # just run the stub; then set
+                                                             # GOOGLE_CALENDAR_API_URL=http://127.0.0.1:8089/calendar/v3/
+
+`--latency` is added to every HTTP request the stub receives, standing in for
+the round trip to Google. `--fail-rate` answers that share of event requests
+with 503 so the retry path runs.
+"""
+import argparse
+import json
+import os
+import random
+import re
+import threading
+import time
+from datetime import datetime, timedelta
+from email.parser import BytesParser
+from email.policy import HTTP
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+EVENT_PATH = re.compile(r"^/calendar/v3/calendars/([^/]+)/events(?:/([^/?]+))?")
+
+
+class CalendarStub:
+    """In-memory calendars plus request counters."""
+
+    def __init__(self, latency=0.0, fail_rate=0.0, seed=0):
+        self.latency = latency
+        self.fail_rate = fail_rate
+        self.events = {}  # (calendar id, event id) -> event
+        self.http_requests = 0
+        self.event_requests = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def handle(self, method, path, body):
+        """(status, json body) for one events request."""
+        match = EVENT_PATH.match(path)
+        if not match:
+            return 404, {"error": {"code": 404, "message": "Not Found"}}
+        calendar_id, event_id = match.groups()
+        with self._lock:
+            self.event_requests += 1
+            if self._rng.random() < self.fail_rate:
+                return 503, {"error": {"code": 503, "message": "Backend Error"}}
+            if method == "POST" and event_id is None:
+                event = json.loads(body or b"{}")
+                event.setdefault("id", f"stub{len(self.events)}")
+                key = (calendar_id, event["id"])
+                if key in self.events:
+                    return 409, {"error": {"code": 409, "message": "The requested identifier already exists."}}
+            elif method == "PUT" and event_id:
+                key = (calendar_id, event_id)
+                if key not in self.events:
+                    return 404, {"error": {"code": 404, "message": "Not Found"}}
+                event = dict(json.loads(body or b"{}"), id=event_id)
+            else:
+                return 405, {"error": {"code": 405, "message": "Method Not Allowed"}}
+            event["htmlLink"] = f"https://calendar.example/event?eid={event['id']}"
+            self.events[key] = event
+            return 200, event
+
+
+def _http_part(status, payload):
+    body = json.dumps(payload)
+    return f"HTTP/1.1 {status} {'OK' if status < 300 else 'Error'}\r\nContent-Type: application/json\r\n\r\n{body}"
+
+
+def make_handler(stub: CalendarStub):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def _reply(self, status, body: bytes, content_type="application/json"):
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _handle(self):
+            with stub._lock:
+                stub.http_requests += 1
+            time.sleep(stub.latency)
+            body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+            if self.path.startswith("/batch/"):
+                return self._batch(body)
+            status, payload = stub.handle(self.command, self.path, body)
+            self._reply(status, json.dumps(payload).encode("utf-8"))
+
+        def _batch(self, body):
+            message = BytesParser(policy=HTTP).parsebytes(
+                f"Content-Type: {self.headers['Content-Type']}\r\n\r\n".encode("utf-8") + body
+            )
+            boundary = "stub_batch_boundary"
+            out = []
+            for part in message.iter_parts():
+                request = part.get_payload(decode=True).decode("utf-8")
+                head, _, part_body = request.replace("\r\n", "\n").partition("\n\n")
+                method, url = head.split("\n", 1)[0].split(" ")[:2]
+                path = re.sub(r"^https?://[^/]+", "", url)
+                status, payload = stub.handle(method, path, part_body.encode("utf-8"))
+                content_id = part["Content-ID"].strip("<>").replace("<", "").replace(">", "")
+                out.append(f"--{boundary}\r\nContent-Type: application/http\r\n"
+                           f"Content-ID: <response-{content_id}>\r\n\r\n{_http_part(status, payload)}\r\n")
+            out.append(f"--{boundary}--\r\n")
+            self._reply(200, "".join(out).encode("utf-8"), f"multipart/mixed; boundary={boundary}")
+
+        do_POST = do_PUT = _handle
+
+    return Handler
+
+
+def serve(stub: CalendarStub, port=0):
+    """Start the stub in a background thread; returns (server, base url for GOOGLE_CALENDAR_API_URL)."""
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(stub))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/calendar/v3/"
+
+
+def synthetic_events(n):
+    start = datetime.now().replace(minute=0, second=0, microsecond=0) + timedelta(days=1)
+    return [{"summary": f"Person{i % 7} - Task {i}", "description": "Task assigned by AI agent",
+             "start": start + timedelta(hours=i % 48), "key": f"Person{i % 7}|Task {i}"} for i in range(n)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds added to every HTTP request")
+    parser.add_argument("--fail-rate", type=float, default=0.0)
+    parser.add_argument("--serve", action="store_true", help="only run the stub server")
+    parser.add_argument("--port", type=int, default=0)
+    parser.add_argument("--out", help="write JSON results here instead of stdout")
+    args = parser.parse_args()
+
+    stub = CalendarStub(args.latency, args.fail_rate)
+    server, url = serve(stub, args.port)
+    if args.serve:
+        print(f"📅 Calendar stub listening: GOOGLE_CALENDAR_API_URL={url}")
+        threading.Event().wait()
+
+    os.environ["GOOGLE_CALENDAR_API_URL"] = url
+    os.environ.setdefault("GOOGLE_CALENDAR_BACKOFF", "0.05")
+    import google_calendar
+
+    events = synthetic_events(args.events)
+    results = {"events": args.events, "latency": args.latency, "fail_rate": args.fail_rate}
+    for name, batch_size, calendar_id in (("one_per_request", 1, "serial"), ("batched", None, "batched"),
+                                          ("batched_resync", None, "batched")):
+        http_before = stub.http_requests
+        started = time.perf_counter()
+        synced = google_calendar.sync_events(events, calendar_id=calendar_id, batch_size=batch_size)
+        results[name] = {
+            "seconds": round(time.perf_counter() - started, 3),
+            "http_requests": stub.http_requests - http_before,
+            "created": sum(r.get("action") == "created" for r in synced),
+            "updated": sum(r.get("action") == "updated" for r in synced),
+            "errors": sum("error" in r for r in synced),
+        }
+    results["stored_events"] = sum(1 for calendar_id, _ in stub.events if calendar_id == "batched")
+    server.shutdown()
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(results, f, indent=2)
+    else:
+        print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
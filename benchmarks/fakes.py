@@ -0,0 +1,150 @@
+"""
+Deterministic local stand-ins for the services the app calls, so benchmarks run
+offline: Gemini (google.generativeai.GenerativeModel), the Hugging Face
+embedding model and the Google Calendar API (benchmarks/calendar_stub.py).
+
+    from benchmarks.fakes import install_fakes
+    install_fakes(llm_latency=0.05)     # before the app modules create their clients
+
+The fakes only replace the remote call: extraction still runs through
+GeminiBackend, the rate limiter (with its limits lifted) and the JSON repair
+path, and memory still embeds, indexes and searches as it would in production.
+"""
+import asyncio
+import os
+import time
+import zlib
+from types import SimpleNamespace
+import numpy as np
+from bm25_index import tokenize
+from llm_backend import FakeBackend
+from memory_index import DIM
+from transcript_chunker import estimate_tokens
+
+EXTRACTION_MARKER = "extract tasks from this transcript"
+
+
+class FakeEmbeddings:
+    """
+    Drop-in for langchain_huggingface.HuggingFaceEmbeddings: hashed bag-of-words
+    unit vectors of the real model's dimension, so texts sharing words land close
+    together. `latency` seconds are added per embedded text to mimic model cost.
+    """
+
+    def __init__(self, model_name="fake", dim=DIM, latency=0.0):
+        self.model_name = model_name
+        self.dim = dim
+        self.latency = latency
+        self._slots = {}  # token -> (dimension, sign)
+
+    def _slot(self, token):
+        slot = self._slots.get(token)
+        if slot is None:
+            digest = zlib.crc32(token.encode("utf-8"))
+            slot = self._slots[token] = (digest % self.dim, 1.0 if digest & 0x80000000 else -1.0)
+        return slot
+
+    def _vector(self, text):
+        vector = np.zeros(self.dim, dtype="float32")
+        for token in tokenize(text) or [text]:
+            index, sign = self._slot(token)
+            vector[index] += sign
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def embed_documents(self, texts):
+        if self.latency:
+            time.sleep(self.latency * len(texts))
+        return [self._vector(text) for text in texts]
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+
+def fake_reply(prompt: str) -> str:
+    """What the fake model answers: task JSON for extraction prompts, else the first context line."""
+    if EXTRACTION_MARKER in prompt:
+        return FakeBackend(latency=0)._respond(prompt)
+    context = prompt.split("Context:\n", 1)[-1].strip()
+    return context.split("\n")[0] if context else "I couldn't find that."
+
+
+def _response(prompt, text):
+    usage = SimpleNamespace(prompt_token_count=estimate_tokens(prompt), candidates_token_count=estimate_tokens(text))
+    return SimpleNamespace(text=text, usage_metadata=usage)
+
+
+class _Stream:
+    """Async iterator over reply chunks, like a streamed generate_content_async response."""
+
+    def __init__(self, prompt, text, latency, piece_size=24):
+        self.pieces = [text[i:i + piece_size] for i in range(0, len(text), piece_size)] or [""]
+        self.prompt = prompt
+        self.latency = latency
+
+    async def __aiter__(self):
+        await asyncio.sleep(self.latency / 2)
+        for n, piece in enumerate(self.pieces):
+            await asyncio.sleep(self.latency / 2 / len(self.pieces))
+            chunk = _response(self.prompt, piece)
+            if n < len(self.pieces) - 1:
+                chunk.usage_metadata = None  # only the last chunk reports usage
+            yield chunk
+
+
+class FakeGenerativeModel:
+    """Drop-in for google.generativeai.GenerativeModel with a fixed `latency` per call."""
+
+    latency = 0.2
+
+    def __init__(self, model_name="fake", generation_config=None, **kwargs):
+        self.model_name = model_name
+        self.calls = 0
+
+    def generate_content(self, prompt, stream=False):
+        self.calls += 1
+        time.sleep(self.latency)
+        return _response(prompt, fake_reply(prompt))
+
+    async def generate_content_async(self, prompt, stream=False):
+        self.calls += 1
+        if stream:
+            return _Stream(prompt, fake_reply(prompt), self.latency)
+        await asyncio.sleep(self.latency)
+        return _response(prompt, fake_reply(prompt))
+
+
+def install_fakes(llm_latency=None, embed_latency=0.0, calendar_latency=None):
+    """
+    Swap the remote services for the fakes in this process and return the
+    calendar stub (or None). Call it before the app modules build their
+    clients; Gemini rate limits are lifted since nothing leaves the machine.
+    """
+    import google.generativeai as genai
+
+    os.environ["GEMINI_RPM"] = os.environ["GEMINI_TPM"] = "0"
+    if llm_latency is not None:
+        FakeGenerativeModel.latency = llm_latency
+    genai.configure = lambda **kwargs: None
+    genai.GenerativeModel = FakeGenerativeModel
+
+    import llm_backend
+    import memory_client
+    import memory_manager
+
+    llm_backend.set_backend(llm_backend.GeminiBackend())
+
+    def get_embeddings(model_name="fake"):
+        return FakeEmbeddings(model_name, latency=embed_latency)
+
+    memory_manager.get_embeddings = memory_client.get_embeddings = get_embeddings
+    memory_manager._model = None
+
+    stub = None
+    if calendar_latency is not None:
+        from benchmarks.calendar_stub import CalendarStub, serve
+
+        stub = CalendarStub(latency=calendar_latency)
+        stub.server, os.environ["GOOGLE_CALENDAR_API_URL"] = serve(stub)
+        os.environ.setdefault("GOOGLE_CALENDAR_BACKOFF", "0.05")
+    return stub
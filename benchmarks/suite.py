@@ -0,0 +1,315 @@
+"""
+Offline benchmark suite: the whole app against local fakes (benchmarks/fakes.py)
+instead of Gemini, the Hugging Face model and Google Calendar.
+
+    python -m benchmarks.suite --out results.json                     # all sections, default sizes
+    python -m benchmarks.suite --sections extract,memory --memory-sizes 1000,10000,100000,1000000
+    python -m benchmarks.suite --out new.json --compare results.json  # flag regressions vs an earlier run
+
+Sections:
+- extract: POST /extract_tasks through the ASGI app, at each --concurrency level.
+  Every transcript is unique (no cache hits); --llm-share of its sentences are
+  hedged so the rule fast path hands them to the (fake) model.
+- memory: ChatMemory.add_many grown to each --memory-sizes step, then search()
+  and retrieve() latency and top-k hit rate at that size (retrieve includes the
+  fake rephrase call). Background checkpoints show up under "stages". The
+  synthetic project codes repeat after ~9k meetings, so hit rates are only
+  comparable between runs at the same size.
+- ics: streaming export of each --ics-sizes task count.
+- deadlines: parse_deadlines on real deadline phrases, cold and warm memo cache.
+- calendar: batched sync, then resync, of --calendar-events events to the stub.
+
+Everything runs in a temporary working directory, so no memory, cache or job
+files of the project are touched. Results are JSON (with the commit and
+settings they were taken with); --compare prints every latency or throughput
+figure that got worse by more than --tolerance and exits with status 1.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+SECTIONS = ("extract", "memory", "ics", "deadlines", "calendar")
+NAMES = ["Riya", "Arjun", "Nisha", "Kavya", "Rohan", "Meera", "Vikram", "Ananya", "Ishaan", "Priya"]
+TASKS = ["finalize the campaign design", "review the budget", "draft the launch email", "collect feedback",
+         "fix the onboarding bug", "prepare the investor deck", "update the pricing page", "schedule the vendor call"]
+DEADLINES = ["Friday", "Monday", "tomorrow", "next week", "end of the week", "Nov 14"]
+
+
+def percentiles(samples):
+    """p50/p95/p99 in milliseconds."""
+    samples = sorted(samples)
+    if not samples:
+        return {}
+
+    def at(share):
+        return round(samples[min(len(samples) - 1, int(len(samples) * share))] * 1000, 3)
+
+    return {"p50_ms": round(statistics.median(samples) * 1000, 3), "p95_ms": at(0.95), "p99_ms": at(0.99)}
+
+
+def synthetic_transcript(i, sentences=6, llm_share=0.5, seed=0):
+    """A unique meeting transcript; hedged sentences ("will maybe ...") go past the rules to the model."""
+    rng = random.Random(seed * 1_000_003 + i)
+    lines = ["Hi all, thanks for joining."]
+    for n in range(sentences):
+        person, task, deadline = rng.choice(NAMES), rng.choice(TASKS), rng.choice(DEADLINES)
+        hedge = "maybe " if rng.random() < llm_share else ""
+        lines.append(f"{person}: {person} will {hedge}{task} #{i}-{n} by {deadline}.")
+    return "\n".join(lines)
+
+
+# ---------------------
+# 🧾 Extraction
+# ---------------------
+async def _extract_load(app, transcripts, concurrency):
+    import httpx
+
+    latencies, errors = [], 0
+    slots = asyncio.Semaphore(concurrency)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+        async def one(transcript):
+            nonlocal errors
+            async with slots:
+                started = time.perf_counter()
+                response = await client.post("/extract_tasks", json={"transcript": transcript})
+                latencies.append(time.perf_counter() - started)
+                errors += "error" in response.json()
+
+        await client.post("/extract_tasks", json={"transcript": synthetic_transcript(-1)})  # warm-up, not timed
+        started = time.perf_counter()
+        await asyncio.gather(*(one(t) for t in transcripts))
+        wall = time.perf_counter() - started
+    return {"requests": len(transcripts), "errors": errors, "seconds": round(wall, 3),
+            "requests_per_sec": round(len(transcripts) / wall, 2), **percentiles(latencies)}
+
+
+def bench_extract(args):
+    import main
+
+    results = {"llm_latency": args.llm_latency, "llm_share": args.llm_share}
+    offset = 0
+    for concurrency in args.concurrency:
+        transcripts = [synthetic_transcript(offset + i, llm_share=args.llm_share) for i in range(args.requests)]
+        offset += args.requests
+        results[f"concurrency_{concurrency}"] = asyncio.run(_extract_load(main.app, transcripts, concurrency))
+    return results
+
+
+# ---------------------
+# 🧠 Memory
+# ---------------------
+def bench_memory(args):
+    import memory_manager
+    from benchmarks.bench_retrieval import synthetic_meetings, synthetic_queries
+
+    sizes = sorted(args.memory_sizes)
+    meetings = synthetic_meetings(sizes[-1])
+    memory = memory_manager.ChatMemory()
+    results = {}
+    try:
+        stored = 0
+        for size in sizes:
+            started = time.perf_counter()
+            for start in range(stored, size, args.add_batch):
+                memory.add_many([text for text, _, _ in meetings[start:min(start + args.add_batch, size)]])
+            added = size - stored
+            add_seconds = time.perf_counter() - started
+            stored = size
+
+            queries = synthetic_queries(meetings[:size], args.queries)
+            search, retrieve, hits = [], [], 0
+            for query, target in queries:
+                started = time.perf_counter()
+                ids = memory.search(query)
+                search.append(time.perf_counter() - started)
+                hits += meetings[target][0] in [memory.entries[i]["text"] for i in ids if i in memory.entries]
+                started = time.perf_counter()
+                memory.retrieve(query)
+                retrieve.append(time.perf_counter() - started)
+
+            results[str(size)] = {
+                "add_seconds": round(add_seconds, 3),
+                "adds_per_sec": round(added / add_seconds, 1) if add_seconds else None,
+                "search": percentiles(search),
+                "retrieve": percentiles(retrieve),
+                "hit_rate": round(hits / len(queries), 4) if queries else None,
+                "tiers": sorted({p["tier"] for p in memory.stats()["partitions"].values()}),
+            }
+    finally:
+        memory.close()
+    return results
+
+
+# ---------------------
+# 📅 Export, deadlines, calendar
+# ---------------------
+def bench_ics(args):
+    from benchmarks.bench_ics import measure, synthetic_tasks
+    from export_ics import export_tasks_to_ics
+
+    return {str(n): measure(export_tasks_to_ics, lambda n=n: (synthetic_tasks(n), "tasks.ics"))
+            for n in args.ics_sizes}
+
+
+def bench_deadlines(args):
+    import deadline_parser
+    from benchmarks.bench_deadlines import real_phrases, workload
+
+    texts = workload(real_phrases(), args.deadline_tasks)
+    now = datetime.now().replace(microsecond=0)
+    deadline_parser.parse_deadline("in 13 fortnights", now)  # dateparser's one-off import and warm-up
+    deadline_parser._cache.clear()
+    results = {"tasks": len(texts)}
+    for run in ("cold", "warm"):
+        started = time.perf_counter()
+        deadline_parser.parse_deadlines(texts, now)
+        results[f"{run}_seconds"] = round(time.perf_counter() - started, 4)
+    return results
+
+
+def bench_calendar(args, stub):
+    import google_calendar
+    from benchmarks.calendar_stub import synthetic_events
+
+    events = synthetic_events(args.calendar_events)
+    results = {"events": len(events), "latency": args.calendar_latency}
+    for name in ("sync", "resync"):
+        http_before = stub.http_requests
+        started = time.perf_counter()
+        synced = google_calendar.sync_events(events, calendar_id="bench")
+        results[name] = {"seconds": round(time.perf_counter() - started, 3),
+                         "http_requests": stub.http_requests - http_before,
+                         "errors": sum("error" in r for r in synced)}
+    return results
+
+
+# ---------------------
+# 📊 Results
+# ---------------------
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def _flatten(results, prefix=""):
+    for key, value in results.items():
+        name = f"{prefix}.{key}" if prefix else key
+        if isinstance(value, dict):
+            yield from _flatten(value, name)
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            yield name, value
+
+
+def _direction(name):
+    """+1 when higher is better, -1 when lower is better, 0 for figures that are not performance."""
+    leaf = name.rsplit(".", 1)[-1]
+    if leaf.endswith(("per_sec", "hit_rate")):
+        return 1
+    if leaf.endswith(("_ms", "seconds")) and not name.startswith(("meta.", "stages.")):
+        return -1
+    return 0
+
+
+def compare(baseline, current, tolerance):
+    """[(metric, before, after, change)] for figures that got worse by more than `tolerance`."""
+    before = dict(_flatten(baseline))
+    regressions = []
+    for name, after in _flatten(current):
+        direction = _direction(name)
+        if not direction or name not in before or not before[name]:
+            continue
+        change = (after - before[name]) / before[name]
+        if change * direction < -tolerance:
+            regressions.append((name, before[name], after, round(change, 3)))
+    return regressions
+
+
+def _ints(text):
+    return [int(x) for x in text.split(",") if x]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sections", default=",".join(SECTIONS), help="comma-separated subset of " + ",".join(SECTIONS))
+    parser.add_argument("--requests", type=int, default=200, help="extraction requests per concurrency level")
+    parser.add_argument("--concurrency", type=_ints, default=[1, 8, 32])
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="seconds per fake model call")
+    parser.add_argument("--llm-share", type=float, default=0.5, help="share of sentences left to the model")
+    parser.add_argument("--memory-sizes", type=_ints, default=[1000, 10000, 100000])
+    parser.add_argument("--add-batch", type=int, default=1000, help="texts per ChatMemory.add_many call")
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--ics-sizes", type=_ints, default=[10000, 100000])
+    parser.add_argument("--deadline-tasks", type=int, default=10000)
+    parser.add_argument("--calendar-events", type=int, default=200)
+    parser.add_argument("--calendar-latency", type=float, default=0.05, help="seconds per stub HTTP request")
+    parser.add_argument("--out", help="write JSON results here instead of stdout")
+    parser.add_argument("--compare", help="earlier results file to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed slowdown before flagging (0.2 = 20%%)")
+    args = parser.parse_args()
+    sections = [s for s in args.sections.split(",") if s]
+    unknown = set(sections) - set(SECTIONS)
+    if unknown:
+        parser.error(f"unknown sections: {', '.join(sorted(unknown))}")
+    out = os.path.abspath(args.out) if args.out else None
+    baseline_path = os.path.abspath(args.compare) if args.compare else None
+
+    workdir = tempfile.TemporaryDirectory(prefix="mta-bench-")
+    os.chdir(workdir.name)
+    os.environ.update(EXTRACTION_CACHE_PATH="", EMBEDDING_CACHE_PATH="", TASK_STORE_PATH="",
+                      JOB_QUEUE_PATH=os.path.join(workdir.name, "jobs.sqlite"))
+    from benchmarks.fakes import install_fakes
+    import metrics
+
+    stub = install_fakes(args.llm_latency, calendar_latency=args.calendar_latency if "calendar" in sections else None)
+    results = {"meta": {
+        "commit": _git_commit(), "started": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count(),
+        "args": {k: v for k, v in vars(args).items() if k not in ("out", "compare")},
+    }, "stages": {}}
+    runners = {"extract": bench_extract, "memory": bench_memory, "ics": bench_ics, "deadlines": bench_deadlines,
+               "calendar": lambda a: bench_calendar(a, stub)}
+    for section in sections:
+        print(f"⏱️ {section}...", file=sys.stderr)
+        metrics.reset()
+        started = time.perf_counter()
+        results[section] = runners[section](args)
+        results["meta"].setdefault("section_seconds", {})[section] = round(time.perf_counter() - started, 1)
+        results["stages"][section] = metrics.summary()
+    if stub is not None:
+        stub.server.shutdown()
+
+    if out:
+        with open(out, "w") as f:
+            json.dump(results, f, indent=2)
+    else:
+        print(json.dumps(results, indent=2))
+
+    if baseline_path:
+        with open(baseline_path) as f:
+            baseline = json.load(f)
+        regressions = compare(baseline, results, args.tolerance)
+        if baseline.get("meta", {}).get("args") != results["meta"]["args"]:
+            print("⚠️ Warning: the runs used different settings; only matching figures are compared", file=sys.stderr)
+        print(f"📊 Compared with {baseline.get('meta', {}).get('commit') or baseline_path}: "
+              f"{len(regressions)} regression(s) beyond {args.tolerance:.0%}", file=sys.stderr)
+        for name, before, after, change in regressions:
+            print(f"  {name}: {before} -> {after} ({change:+.1%})", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+import heapq
+import math
+import re
+import threading
+from collections import Counter
+
+# Keeps names and codes like "PRJ-4821" or "q3_budget" as single tokens
+TOKEN = re.compile(r"[a-z0-9]+(?:[-_][a-z0-9]+)*")
+STOPWORDS = {
+    "a", "an", "the", "and", "or", "of", "to", "in", "on", "for", "at", "by", "with", "from", "about", "as",
+    "is", "are", "was", "were", "be", "been", "do", "does", "did", "has", "have", "had", "will", "would",
+    "what", "who", "whom", "whose", "when", "where", "which", "why", "how", "me", "my", "i", "we", "our",
+    "you", "your", "it", "its", "this", "that", "there", "any", "anything", "show", "list", "tell", "remind",
+}
+
+
+def tokenize(text: str):
+    """Lower-cased content tokens (stopwords removed)."""
+    return [t for t in TOKEN.findall((text or "").lower()) if t not in STOPWORDS]
+
+
+class BM25Index:
+    """
+    Incremental BM25 (Okapi) inverted index keyed by caller-supplied document ids
+    (ChatMemory passes its entry ids, which are also the FAISS ids).
+    Adding a document only touches its own terms' postings; scoring reads the
+    current corpus statistics, so nothing has to be rebuilt. Removed documents
+    leave stale postings behind until `compact()`.
+    """
+
+    def __init__(self, k1=1.5, b=0.75):
+        self.k1 = k1
+        self.b = b
+        self._postings = {}  # term -> {doc id: term frequency}
+        self._doc_len = {}  # doc id -> token count, live documents only
+        self._total_len = 0
+        self._next_id = 0
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._doc_len)
+
+    def add(self, text: str, doc_id=None) -> int:
+        tokens = tokenize(text)
+        with self._lock:
+            doc_id = self._next_id if doc_id is None else doc_id
+            self._next_id = max(self._next_id, doc_id + 1)
+            for term, tf in Counter(tokens).items():
+                self._postings.setdefault(term, {})[doc_id] = tf
+            self._doc_len[doc_id] = len(tokens)
+            self._total_len += len(tokens)
+        return doc_id
+
+    def add_many(self, texts):
+        return [self.add(text) for text in texts]
+
+    def remove(self, doc_id):
+        with self._lock:
+            self._total_len -= self._doc_len.pop(doc_id, 0)
+
+    def compact(self):
+        """Drop postings of removed documents."""
+        with self._lock:
+            for term in list(self._postings):
+                postings = {d: tf for d, tf in self._postings[term].items() if d in self._doc_len}
+                if postings:
+                    self._postings[term] = postings
+                else:
+                    del self._postings[term]
+
+    def clear(self):
+        with self._lock:
+            self._postings.clear()
+            self._doc_len.clear()
+            self._total_len = 0
+
+    def search(self, query: str, top_k=10):
+        """Best `top_k` (doc id, score) pairs for the query terms, highest score first."""
+        terms = set(tokenize(query))
+        scores = {}
+        with self._lock:
+            n = len(self._doc_len)
+            if not n or not terms:
+                return []
+            avg_len = self._total_len / n or 1.0
+            for term in terms:
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+                for doc_id, tf in postings.items():
+                    if doc_id not in self._doc_len:
+                        continue
+                    norm = self.k1 * (1 - self.b + self.b * self._doc_len[doc_id] / avg_len)
+                    scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+        return heapq.nlargest(top_k, scores.items(), key=lambda item: item[1])
+
+
+def reciprocal_rank_fusion(rankings, top_k=3, k=60):
+    """
+    Merge ranked id lists (best first) with RRF: score(d) = Σ 1 / (k + rank).
+    Robust to the retrievers' incomparable score scales.
+    """
+    scores = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, start=1):
+            scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (k + rank)
+    return [doc_id for doc_id, _ in heapq.nlargest(top_k, scores.items(), key=lambda item: item[1])]
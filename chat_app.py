@@ -1,22 +1,57 @@
 import streamlit as st
 import requests
 import json
-import os
 import time
 import datetime
-import dateparser
-from google_calendar import add_event_to_calendar
-from memory_manager import ChatMemory  # 🧠 Import your memory system
+import hashlib
+import importlib
+from deadline_parser import parse_deadlines
+import metrics  # 📈 Stage timings, served on METRICS_PORT
+from task_store import get_task_store  # 🗂️ Structured tasks for direct deadline/assignee questions
+import warmup  # ⚡ Memory, calendar client etc. load in the background while the page renders
 
 # ---------------------
 # CONFIG
 # ---------------------
 API_URL = "http://127.0.0.1:8000/extract_tasks"
+STREAM_API_URL = "http://127.0.0.1:8000/extract_tasks/stream"
+JOBS_API_URL = "http://127.0.0.1:8000/jobs"
+JOB_POLL_TIMEOUT = 600  # seconds the page waits for a background job before giving up
 st.set_page_config(page_title="AI Meeting Assistant", page_icon="💬", layout="wide")
 
 st.title("💬 AI Meeting Assistant")
 st.write("Chat with your AI assistant to analyze meeting transcripts, auto-schedule tasks, and even remember previous conversations!")
 
+# ✅ Memory loads once per process on a background thread; the heavy imports (FAISS,
+# sentence-transformers, Gemini) happen there too, so the page renders right away
+def load_memory():
+    """Build the chat memory and pay the embedding model's and index's first-call costs."""
+    from memory_client import SERVICE_URL as MEMORY_SERVICE_URL, RemoteChatMemory
+
+    # With a memory service running, this worker only reads snapshots and sends writes to it
+    if MEMORY_SERVICE_URL:
+        memory = RemoteChatMemory(MEMORY_SERVICE_URL)
+    else:
+        from memory_manager import ChatMemory  # 🧠 Import your memory system
+
+        memory = ChatMemory()
+    memory.warm_up()
+    return memory
+
+
+warmup.start("memory", load_memory)
+warmup.start("calendar", lambda: importlib.import_module("google_calendar"))
+warmup.start("dateparser", lambda: importlib.import_module("dateparser"))
+
+
+def get_memory():
+    """The process-wide chat memory, waiting for the background load if it hasn't finished."""
+    if not warmup.ready("memory"):
+        with st.spinner("⚙️ Loading AI memory system..."):
+            return warmup.get("memory", load_memory)
+    return warmup.get("memory", load_memory)
+
+
 # ---------------------
 # 🧠 MEMORY CONTROLS SIDEBAR
 # ---------------------
@@ -24,10 +59,8 @@ st.sidebar.header("🧠 Memory Controls")
 
 if st.sidebar.button("🧹 Clear All Memory"):
     try:
-        if os.path.exists("vector_store.faiss"):
-            os.remove("vector_store.faiss")
-        if os.path.exists("memory_texts.pkl"):
-            os.remove("memory_texts.pkl")
+        get_memory().clear()  # index, texts and write-ahead log
+        get_task_store().clear()
 
         for key in list(st.session_state.keys()):
             del st.session_state[key]
@@ -55,15 +88,31 @@ if "messages" not in st.session_state:
 if "last_tasks" not in st.session_state:
     st.session_state["last_tasks"] = []
 
-
-# ✅ Cached memory initialization
-@st.cache_resource(show_spinner=False)
-def get_memory():
-    return ChatMemory()
-
-if "memory" not in st.session_state:
-    with st.spinner("⚙️ Loading AI memory system..."):
-        st.session_state["memory"] = get_memory()
+metrics.register_collector("memory", lambda: get_memory().stats() if warmup.ready("memory") else {})
+metrics.register_collector("warmup", warmup.status)
+metrics.serve_metrics()  # no-op unless METRICS_PORT is set
+
+# 🗑️ Forget a single meeting (vector memory + task store) without wiping everything
+if warmup.ready("memory"):
+    saved_meetings = get_memory().meetings()
+    if saved_meetings:
+        labels = {meeting_id: f"{title[:60]} ({meeting_id[:6]})" for meeting_id, title in saved_meetings}
+        forget_id = st.sidebar.selectbox("Forget a meeting", list(labels), format_func=labels.get)
+        if st.sidebar.button("🗑️ Forget selected meeting"):
+            get_memory().delete_meeting(forget_id)
+            get_task_store().delete_meeting(forget_id)
+            st.sidebar.success("✅ Meeting removed from memory.")
+elif warmup.status()["memory"]["error"]:
+    # Not reloaded on every rerun: the warm-up is retried after WARMUP_RETRY_DELAY (doubling per failure)
+    memory_status = warmup.status()["memory"]
+    st.sidebar.error(f"⚠️ Memory failed to load: {memory_status['error']} (retrying in {memory_status['retry_in']}s)")
+else:
+    st.sidebar.caption("⚙️ Memory is still loading; saved meetings show up on the next interaction.")
+
+with st.sidebar.expander("📈 Memory stats"):
+    if warmup.ready("memory"):
+        st.json(get_memory().stats())  # index tier, embeddings/sec, embedding cache hit rate
+    st.json({"warmup": warmup.status()})  # background loads and how long they took
 
 
 # ✅ Cached API call for faster response on same text
@@ -74,23 +123,102 @@ def analyze_transcript_cached(transcript: str):
     return response.json()
 
 
-# ✅ Cached parsing of task data (since it's done often)
-@st.cache_data(show_spinner=False)
+# 📡 Streamed API call: tasks show up one by one while the model is still writing
+def analyze_transcript_streaming(transcript: str, on_update=None):
+    """Read tasks from the SSE endpoint, calling on_update(tasks_so_far) as each arrives."""
+    # Streamlit reruns the script on every interaction; don't re-stream the same transcript
+    streamed = st.session_state.setdefault("streamed_results", {})
+    if transcript in streamed:
+        return streamed[transcript]
+
+    tasks = []
+    try:
+        with requests.post(STREAM_API_URL, json={"transcript": transcript}, stream=True, timeout=(5, 120)) as response:
+            response.raise_for_status()
+            event = "message"
+            for line in response.iter_lines(decode_unicode=True):
+                if line.startswith("event:"):
+                    event = line[len("event:"):].strip()
+                elif line.startswith("data:"):
+                    payload = json.loads(line[len("data:"):])
+                    if event == "task":
+                        tasks.append(payload)
+                        if on_update:
+                            on_update(tasks)
+                    elif event == "error":
+                        return {"error": payload.get("error", "Unknown error")}
+    except requests.RequestException:
+        # Older backend without the streaming endpoint
+        return analyze_transcript_cached(transcript)
+    streamed[transcript] = {"tasks": tasks}
+    return streamed[transcript]
+
+
+# 🗃️ Background job: the backend keeps the work if this page is refreshed or the run is interrupted
+def analyze_transcript_job(transcript: str, on_status=None):
+    """Submit the transcript as a backend job and poll until it finishes; returns the extraction result."""
+    # Streamlit reruns the script on every interaction; don't resubmit (or re-poll) the same transcript
+    key = hashlib.sha1(transcript.encode("utf-8")).hexdigest()
+    finished = st.session_state.setdefault("job_results", {})
+    if key in finished:
+        return finished[key]
+    job_ids = st.session_state.setdefault("job_ids", {})
+    try:
+        if key not in job_ids:
+            submitted = requests.post(JOBS_API_URL, json={"transcript": transcript}, timeout=10).json()
+            if "error" in submitted:
+                return submitted
+            job_ids[key] = submitted["job_id"]
+        deadline = time.monotonic() + JOB_POLL_TIMEOUT
+        while time.monotonic() < deadline:
+            job = requests.get(f"{JOBS_API_URL}/{job_ids[key]}", params={"wait": 2}, timeout=15).json()
+            if "error" in job and "status" not in job:
+                job_ids.pop(key)  # e.g. the backend lost its queue: submit again next time
+                return job
+            if job["status"] == "done":
+                job_ids.pop(key)
+                finished[key] = job["result"]
+                return finished[key]
+            if job["status"] == "failed":
+                job_ids.pop(key)
+                return {"error": job.get("error") or "Processing failed"}
+            if on_status:
+                on_status(job)
+        return {"error": f"Still processing after {JOB_POLL_TIMEOUT // 60} minutes. "
+                         "The job keeps running in the background; interact with the page to check again."}
+    except requests.RequestException:
+        # Older backend without the job API
+        return analyze_transcript_streaming(transcript)
+
+
+def format_task_lines(tasks):
+    """Markdown bullet list of tasks for chat replies."""
+    return "".join(
+        f"- {t.get('person', 'Someone')} → {t.get('task', '')} (Deadline: {t.get('deadline', 'N/A')})\n"
+        for t in tasks if isinstance(t, dict)
+    )
+
+
+def remember_meeting(transcript, summary, tasks):
+    """Save a meeting to the vector memory and its tasks to the structured task store."""
+    memory_text = f"Meeting Summary: {summary}\nTasks:\n"
+    for t in tasks:
+        memory_text += f"{t.get('person', 'Someone')} → {t.get('task', '')} (Deadline: {t.get('deadline', 'N/A')})\n"
+    # Same transcript → same meeting id, so re-analysing it replaces rather than duplicates it
+    meeting_id = hashlib.sha1(transcript.encode("utf-8")).hexdigest()[:16]
+    memory = get_memory()
+    with metrics.stage("remember_meeting"):
+        memory.delete_meeting(meeting_id)
+        memory.add(memory_text, {"meeting_id": meeting_id})
+        get_task_store().add_meeting(meeting_id, tasks)
+
+
+# ✅ The backend already returns validated task objects; just drop anything unexpected
 def parse_tasks_data(tasks_raw):
-    """Safely parse task JSONs and cache results."""
-    if isinstance(tasks_raw, str):
-        try:
-            cleaned = tasks_raw.strip()
-            if cleaned.startswith("```"):
-                cleaned = cleaned.strip("`").replace("json", "", 1).strip()
-            tasks = json.loads(cleaned)
-        except Exception:
-            tasks = []
-    elif isinstance(tasks_raw, list):
-        tasks = tasks_raw
-    else:
-        tasks = []
-    return tasks
+    """Keep only well-formed task dicts from an API response."""
+    if not isinstance(tasks_raw, list):
+        return []
+    return [t for t in tasks_raw if isinstance(t, dict)]
 
 
 # ---------------------
@@ -115,7 +243,16 @@ if uploaded_file is not None:
                 st.text_area("Transcript Preview", transcript_text, height=200, disabled=True)
 
             with st.spinner("Analyzing meeting transcript from file... 🤖"):
-                data = analyze_transcript_cached(transcript_text)
+                job_status = st.empty()
+
+                def show_job_status(job):
+                    if job["status"] == "queued":
+                        job_status.info(f"⏳ Queued ({job.get('position', 0)} ahead of it)...")
+                    else:
+                        job_status.info(f"⚙️ Processing (attempt {job['attempts']} of {job['max_attempts']})...")
+
+                data = analyze_transcript_job(transcript_text, show_job_status)
+                job_status.empty()
 
                 if "error" in data:
                     st.error(f"⚠️ Error: {data['error']}")
@@ -123,15 +260,15 @@ if uploaded_file is not None:
                     summary = data.get("summary", "Here's what I understood from your meeting.")
                     tasks = parse_tasks_data(data.get("tasks", []))
 
-                    st.session_state["last_tasks"] = tasks
-
-                    # 🧠 Add to memory
-                    if tasks:
-                        memory_text = f"Meeting Summary: {summary}\nTasks:\n"
-                        for t in tasks:
-                            memory_text += f"{t.get('person', 'Someone')} → {t.get('task', '')} (Deadline: {t.get('deadline', 'N/A')})\n"
-                        st.session_state["memory"].add(memory_text)
-                        st.success("💾 Meeting has been added to memory successfully!")
+                    # 🧠 Add to memory, once per upload rather than on every rerun while the file is attached
+                    processed = st.session_state.setdefault("processed_uploads", set())
+                    upload_key = hashlib.sha1(transcript_text.encode("utf-8")).hexdigest()
+                    if upload_key not in processed:
+                        processed.add(upload_key)
+                        st.session_state["last_tasks"] = tasks
+                        if tasks:
+                            remember_meeting(transcript_text, summary, tasks)
+                            st.success("💾 Meeting has been added to memory successfully!")
 
                     st.write("### 🧠 Summary:")
                     st.write(summary)
@@ -183,23 +320,32 @@ if prompt := st.chat_input("Paste your meeting transcript, ask about tasks, or s
     elif user_text in ["yes", "add", "yes please", "add to calendar", "sure", "confirm"]:
         if st.session_state["last_tasks"]:
             reply = "📅 Adding your tasks to Google Calendar...\n\n"
+            tasks = st.session_state["last_tasks"]
+            deadlines = parse_deadlines([task.get("deadline", "tomorrow") for task in tasks])
+            events = []
+            for task, parsed_date in zip(tasks, deadlines):
+                person = task.get("person", "Someone")
+                desc = task.get("task", "No description")
+                if not parsed_date:
+                    parsed_date = datetime.datetime.now() + datetime.timedelta(days=1)
+                # Same person + task -> same event id, so confirming twice updates instead of duplicating
+                events.append({"summary": f"{person} - {desc}", "description": "Task assigned by AI agent",
+                               "start": parsed_date, "key": f"{person}|{desc}"})
+
+            # 📦 One batched request for all tasks instead of a round trip per task
+            try:
+                from google_calendar import sync_events  # usually already imported in the background
+
+                results = sync_events(events)
+            except Exception as e:
+                results = [{"error": str(e)}] * len(events)
             success = 0
-            for task in st.session_state["last_tasks"]:
-                try:
-                    person = task.get("person", "Someone")
-                    desc = task.get("task", "No description")
-                    deadline = task.get("deadline", "tomorrow")
-
-                    parsed_date = dateparser.parse(deadline, settings={"PREFER_DATES_FROM": "future"})
-                    if not parsed_date:
-                        parsed_date = datetime.datetime.now() + datetime.timedelta(days=1)
-
-                    summary = f"{person} - {desc}"
-                    event_link = add_event_to_calendar(summary, "Task assigned by AI agent", parsed_date)
-                    reply += f"✅ {summary} — [View Event]({event_link})\n"
+            for event, result in zip(events, results):
+                if "error" in result:
+                    reply += f"⚠️ Failed to add task: {result['error']}\n"
+                else:
+                    reply += f"✅ {event['summary']} — [View Event]({result['link']})\n"
                     success += 1
-                except Exception as e:
-                    reply += f"⚠️ Failed to add task: {e}\n"
 
             reply += f"\n🎉 Successfully added {success} tasks to Google Calendar!"
         else:
@@ -208,19 +354,30 @@ if prompt := st.chat_input("Paste your meeting transcript, ask about tasks, or s
         with st.chat_message("assistant"):
             st.markdown(reply)
 
-    # ✅ CASE 2: Memory retrieval queries
+    # ✅ CASE 2: Deadline / assignee / overdue questions answered straight from the task store
+    elif (structured_answer := get_task_store().answer(prompt)) is not None:
+        reply = f"🗂️ From your tasks:\n\n{structured_answer}"
+        st.session_state["messages"].append({"role": "assistant", "content": reply})
+        with st.chat_message("assistant"):
+            st.markdown(reply)
+
+    # ✅ CASE 3: Open-ended memory retrieval queries
     elif any(word in user_text.split() for word in ["what", "who", "when", "show", "list", "remind", "task", "deadline"]) and len(user_text.split()) < 15:
-        result = st.session_state["memory"].retrieve(user_text)
+        result = get_memory().retrieve(user_text)
         reply = f"🧠 Based on my memory:\n\n{result}"
         st.session_state["messages"].append({"role": "assistant", "content": reply})
         with st.chat_message("assistant"):
             st.markdown(reply)
 
-    # ✅ CASE 3: Normal chat/transcript input
+    # ✅ CASE 4: Normal chat/transcript input
     else:
+        with st.chat_message("assistant"):
+            live_reply = st.empty()
         with st.spinner("Analyzing your meeting transcript... 🤖"):
             try:
-                data = analyze_transcript_cached(prompt)
+                data = analyze_transcript_streaming(
+                    prompt, lambda so_far: live_reply.markdown("**🧾 Extracting tasks...**\n" + format_task_lines(so_far))
+                )
 
                 if "error" in data:
                     reply = f"⚠️ Error: {data['error']}"
@@ -230,10 +387,7 @@ if prompt := st.chat_input("Paste your meeting transcript, ask about tasks, or s
                     st.session_state["last_tasks"] = tasks
 
                     if tasks:
-                        memory_text = f"Meeting Summary: {summary}\nTasks:\n"
-                        for t in tasks:
-                            memory_text += f"{t.get('person', 'Someone')} → {t.get('task', '')} (Deadline: {t.get('deadline', 'N/A')})\n"
-                        st.session_state["memory"].add(memory_text)
+                        remember_meeting(prompt, summary, tasks)
                         memory_note = "💾 Got it! I’ve saved this meeting in my memory."
                     else:
                         memory_note = ""
@@ -241,18 +395,14 @@ if prompt := st.chat_input("Paste your meeting transcript, ask about tasks, or s
                     reply = f"**🧠 Summary:**\n{summary}\n\n"
                     if tasks:
                         reply += "**🧾 Extracted Tasks:**\n"
-                        for t in tasks:
-                            if isinstance(t, dict):
-                                reply += f"- {t.get('person', 'Someone')} → {t.get('task', '')} (Deadline: {t.get('deadline', 'N/A')})\n"
+                        reply += format_task_lines(tasks)
                         reply += f"\n{memory_note}\n✅ Shall I add these tasks to your Google Calendar?"
                     else:
                         reply += "_No clear tasks found in this transcript._"
 
                 st.session_state["messages"].append({"role": "assistant", "content": reply})
-                with st.chat_message("assistant"):
-                    st.markdown(reply)
+                live_reply.markdown(reply)
             except Exception as e:
                 error_msg = f"Request failed: {e}"
                 st.session_state["messages"].append({"role": "assistant", "content": error_msg})
-                with st.chat_message("assistant"):
-                    st.error(error_msg)
+                live_reply.error(error_msg)
@@ -0,0 +1,186 @@
+import re
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Optional
+from metrics import stage
+
+try:
+    from zoneinfo import ZoneInfo
+except ImportError:  # Python < 3.9
+    ZoneInfo = None
+
+# dateparser fallback results kept per process (keyed on text, reference date and timezone);
+# phrases whose result depends on the time of day ("10am", "in 2 hours") are re-parsed every call
+CACHE_ITEMS = 4096
+DATEPARSER_SETTINGS = {"PREFER_DATES_FROM": "future"}
+
+WEEKDAYS = {"monday": 0, "tuesday": 1, "wednesday": 2, "thursday": 3, "friday": 4, "saturday": 5, "sunday": 6,
+            "mon": 0, "tue": 1, "tues": 1, "wed": 2, "thu": 3, "thur": 3, "thurs": 3, "fri": 4, "sat": 5, "sun": 6}
+DAY_PARTS = {"morning": 9, "afternoon": 14, "evening": 18, "night": 21, "tonight": 21}
+NUMBERS = {"a": 1, "an": 1, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6, "seven": 7}
+
+LEADING = re.compile(r"^(?:by|before|on|until|till|due(?:\s+(?:by|on))?)\s+")
+WEEKDAY = re.compile(rf"^(?:(this|next|coming)\s+)?({'|'.join(WEEKDAYS)})(?:\s+({'|'.join(DAY_PARTS)}))?$")
+TOMORROW = re.compile(rf"^tomorrow(?:\s+({'|'.join(DAY_PARTS)}))?$")
+IN_N = re.compile(rf"^in\s+(\d+|{'|'.join(NUMBERS)})\s+(day|week)s?$")
+END_OF = re.compile(r"^(?:eod|eow|eom|end\s+of\s+(?:the\s+)?(next\s+)?(day|week|month))$")
+ISO_DATE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+
+_cache = OrderedDict()
+_CLOCK = object()  # cached in place of a result that depends on the time of day
+_lock = threading.Lock()
+_stats = {"fast_path": 0, "cache_hits": 0, "dateparser_calls": 0, "unparsed": 0}
+
+
+def _now(timezone: Optional[str]) -> datetime:
+    if timezone and ZoneInfo is not None:
+        return datetime.now(ZoneInfo(timezone))
+    return datetime.now()
+
+
+def _midnight(moment: datetime) -> datetime:
+    return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _normalise(text: str) -> str:
+    return LEADING.sub("", " ".join(text.lower().replace(",", " ").split()).rstrip("."))
+
+
+def _fast_path(text: str, now: datetime) -> Optional[datetime]:
+    """
+    Hand-written parser for the phrases meetings actually use. Matches what
+    dateparser returns (PREFER_DATES_FROM=future) where it understands the phrase:
+    weekdays are the next such day at midnight (a week ahead if it is today),
+    "tomorrow" / "in 3 days" / "next week" keep the current time of day.
+    """
+    today = _midnight(now)
+    if text in ("today", "now"):
+        return now
+    if text in ("tonight", "this evening"):
+        return today.replace(hour=DAY_PARTS["tonight"])
+    if text in ("next week", "next month"):
+        if text == "next week":
+            return now + timedelta(days=7)
+        month = now.month % 12 + 1
+        year = now.year + (now.month == 12)
+        try:
+            return now.replace(year=year, month=month)
+        except ValueError:  # Jan 31 -> no Feb 31; dateparser's answer is used instead
+            return None
+    match = WEEKDAY.match(text)
+    if match:
+        days = (WEEKDAYS[match[2]] - now.weekday()) % 7 or 7
+        # "next Friday" is read as the coming Friday, like "Friday" and "this Friday"
+        day = today + timedelta(days=days)
+        return day.replace(hour=DAY_PARTS[match[3]]) if match[3] else day
+    match = TOMORROW.match(text)
+    if match:
+        return (today + timedelta(days=1)).replace(hour=DAY_PARTS[match[1]]) if match[1] else now + timedelta(days=1)
+    match = IN_N.match(text)
+    if match:
+        count = int(match[1]) if match[1].isdigit() else NUMBERS[match[1]]
+        return now + timedelta(days=count * (7 if match[2] == "week" else 1))
+    match = END_OF.match(text)
+    if match:
+        # Date-only results: consumers read a midnight deadline as "by the end of that day"
+        unit = {"eod": "day", "eow": "week", "eom": "month"}.get(text) or match[2]
+        if unit == "day":
+            return today
+        if unit == "week":
+            friday = today + timedelta(days=(4 - now.weekday()) % 7)
+            return friday + timedelta(days=7) if match[1] else friday
+        first_of_next = (today.replace(day=28) + timedelta(days=4)).replace(day=1)
+        if match[1]:
+            first_of_next = (first_of_next.replace(day=28) + timedelta(days=4)).replace(day=1)
+        return first_of_next - timedelta(days=1)
+    if ISO_DATE.match(text):
+        try:
+            return datetime.strptime(text, "%Y-%m-%d").replace(tzinfo=now.tzinfo)
+        except ValueError:
+            return None
+    return None
+
+
+def _dateparser(text: str, now: datetime, timezone: Optional[str]) -> Optional[datetime]:
+    """
+    dateparser.parse relative to `now`, memoised on (text, reference date, timezone).
+    The first parse of a phrase on a given day resolves it at the day's first and
+    last second; if both agree the result does not depend on the time of day and is
+    kept, otherwise the phrase is marked as clock-relative and parsed against `now`.
+    """
+    key = (text, now.date(), timezone)
+    with _lock:
+        seen = key in _cache
+        if seen:
+            _cache.move_to_end(key)
+            if _cache[key] is not _CLOCK:
+                _stats["cache_hits"] += 1
+                return _cache[key]
+    import dateparser  # slow import, only needed off the fast path
+
+    def parse(base):
+        settings = dict(DATEPARSER_SETTINGS, RELATIVE_BASE=base.replace(tzinfo=None))
+        if timezone:
+            settings.update(TIMEZONE=timezone, RETURN_AS_TIMEZONE_AWARE=True)
+        with stage("dateparser"):
+            return dateparser.parse(text, settings=settings)
+
+    if seen:  # known to depend on the time of day
+        parsed, cached = parse(now), _CLOCK
+    else:
+        midnight = _midnight(now)
+        parsed = cached = parse(midnight)
+        if parsed != parse(midnight + timedelta(days=1, microseconds=-1)):
+            parsed, cached = parse(now), _CLOCK
+    with _lock:
+        _stats["dateparser_calls"] += 1
+        _cache[key] = cached
+        if len(_cache) > CACHE_ITEMS:
+            _cache.popitem(last=False)
+    return parsed
+
+
+def parse_deadline(text: str, now: datetime = None, timezone: str = None) -> Optional[datetime]:
+    """
+    Datetime for a natural-language deadline ('Friday', 'tomorrow', 'Nov 14'), or
+    None if it cannot be read. Relative phrases are resolved against `now`
+    (default: the current time in `timezone`, or local time). Results are naive
+    unless a timezone is given.
+    """
+    if not text or not text.strip():
+        return None
+    now = now or _now(timezone)
+    normalised = _normalise(text)
+    parsed = _fast_path(normalised, now)
+    if parsed is not None:
+        with _lock:
+            _stats["fast_path"] += 1
+        return parsed
+    parsed = _dateparser(normalised, now, timezone)
+    if parsed is None:
+        with _lock:
+            _stats["unparsed"] += 1
+    return parsed
+
+
+def parse_deadlines(texts, now: datetime = None, timezone: str = None):
+    """
+    Batch form of parse_deadline for bulk exports: one reference time for the whole
+    batch (so "Friday" means the same day in every row), each distinct phrase parsed once.
+    """
+    now = now or _now(timezone)
+    parsed = {}
+    for text in texts:
+        if text not in parsed:
+            parsed[text] = parse_deadline(text, now, timezone)
+    return [parsed[text] for text in texts]
+
+
+def deadline_stats():
+    """Fast-path, cache and dateparser counters."""
+    with _lock:
+        stats = dict(_stats, cached=len(_cache))
+    total = stats["fast_path"] + stats["cache_hits"] + stats["dateparser_calls"]
+    stats["fast_path_ratio"] = round(stats["fast_path"] / total, 4) if total else None
+    return stats
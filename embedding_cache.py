@@ -0,0 +1,189 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+import numpy as np
+from metrics import stage
+
+
+def embedding_key(text: str, model_name: str) -> str:
+    """Content address: sha256 of model name and exact text (embeddings are whitespace-sensitive)."""
+    digest = hashlib.sha256()
+    digest.update(model_name.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(text.encode("utf-8"))
+    return digest.hexdigest()
+
+
+class EmbeddingCache:
+    """
+    Two-tier cache for embedding vectors.
+    - memory: per-process LRU of the most recent `memory_items` vectors
+    - disk (optional): SQLite file of float32 blobs, least recently used rows are
+      evicted once it holds more than `max_items`
+    Embeddings of a given text never change for a given model, so there is no TTL.
+    """
+
+    def __init__(self, path=None, memory_items=4096, max_items=200000):
+        self.path = path
+        self.memory_items = memory_items
+        self.max_items = max_items
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "sets": 0, "evictions": 0}
+        self._conn = None
+        if path:
+            self._conn = sqlite3.connect(path, timeout=10, check_same_thread=False, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                " key TEXT PRIMARY KEY, vector BLOB NOT NULL, accessed REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS embeddings_accessed ON embeddings(accessed)")
+
+    def _remember(self, key, vector):
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_items:
+            self._memory.popitem(last=False)
+
+    def get_many(self, keys):
+        """Return {key: vector} for the keys that are cached."""
+        found, missing = {}, []
+        with self._lock:
+            for key in keys:
+                if key in self._memory:
+                    self._memory.move_to_end(key)
+                    found[key] = self._memory[key]
+                    self._stats["memory_hits"] += 1
+                else:
+                    missing.append(key)
+
+            if self._conn is not None and missing:
+                now = time.time()
+                for start in range(0, len(missing), 500):  # stay under SQLite's bound-variable limit
+                    batch = missing[start:start + 500]
+                    rows = self._conn.execute(
+                        f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(batch))})", batch
+                    ).fetchall()
+                    for key, blob in rows:
+                        vector = np.frombuffer(blob, dtype="float32")
+                        found[key] = vector
+                        self._remember(key, vector)
+                    if rows:
+                        self._conn.executemany("UPDATE embeddings SET accessed = ? WHERE key = ?",
+                                               [(now, key) for key, _ in rows])
+                self._stats["disk_hits"] += sum(key in found for key in missing)
+
+            self._stats["misses"] += sum(key not in found for key in missing)
+        return found
+
+    def set_many(self, items):
+        """Store {key: vector} in both tiers."""
+        with self._lock:
+            for key, vector in items.items():
+                self._remember(key, vector)
+            self._stats["sets"] += len(items)
+            if self._conn is None or not items:
+                return
+            now = time.time()
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector, accessed) VALUES (?, ?, ?)",
+                [(key, np.asarray(vector, dtype="float32").tobytes(), now) for key, vector in items.items()],
+            )
+            self._evict()
+
+    def _evict(self):
+        excess = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0] - self.max_items
+        if excess > 0:
+            self._conn.execute(
+                "DELETE FROM embeddings WHERE key IN (SELECT key FROM embeddings ORDER BY accessed LIMIT ?)", (excess,)
+            )
+            self._stats["evictions"] += excess
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM embeddings")
+
+    def stats(self):
+        """Hit/miss counters plus the current hit ratio."""
+        with self._lock:
+            stats = dict(self._stats)
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_ratio"] = round((stats["memory_hits"] + stats["disk_hits"]) / lookups, 4) if lookups else 0.0
+        return stats
+
+
+class CachedEmbedder:
+    """
+    Batched, cached front for a LangChain embeddings model.
+    Texts are de-duplicated, looked up in the cache, and only the misses are sent
+    to the model, `batch_size` texts per embed_documents call.
+    """
+
+    def __init__(self, embeddings, model_name: str, cache: EmbeddingCache = None, batch_size=64):
+        self.embeddings = embeddings
+        self.model_name = model_name
+        self.cache = cache or EmbeddingCache()
+        self.batch_size = max(1, batch_size)
+        self._lock = threading.Lock()
+        self._stats = {"embedded": 0, "batches": 0, "embed_seconds": 0.0}
+
+    def embed(self, texts) -> np.ndarray:
+        """float32 matrix with one row per input text (in input order)."""
+        keys = [embedding_key(text, self.model_name) for text in texts]
+        vectors = self.cache.get_many(list(dict.fromkeys(keys)))
+
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in vectors:
+                missing.setdefault(key, text)
+        pending = list(missing.items())
+        for start in range(0, len(pending), self.batch_size):
+            batch = pending[start:start + self.batch_size]
+            started = time.perf_counter()
+            with stage("embed"):
+                computed = self.embeddings.embed_documents([text for _, text in batch])
+            elapsed = time.perf_counter() - started
+            fresh = {key: np.asarray(vector, dtype="float32") for (key, _), vector in zip(batch, computed)}
+            self.cache.set_many(fresh)
+            vectors.update(fresh)
+            with self._lock:
+                self._stats["embedded"] += len(batch)
+                self._stats["batches"] += 1
+                self._stats["embed_seconds"] += elapsed
+
+        if not keys:
+            return np.zeros((0, 0), dtype="float32")
+        return np.vstack([vectors[key] for key in keys]).astype("float32")
+
+    def embed_one(self, text: str) -> np.ndarray:
+        return self.embed([text])
+
+    def stats(self):
+        """Model throughput (embeddings/sec over time spent in the model) and cache counters."""
+        with self._lock:
+            stats = dict(self._stats)
+        stats["embed_seconds"] = round(stats["embed_seconds"], 4)
+        stats["embeddings_per_sec"] = round(stats["embedded"] / stats["embed_seconds"], 1) if stats["embed_seconds"] else None
+        stats["cache"] = self.cache.stats()
+        return stats
+
+
+_cache = None
+
+
+def get_embedding_cache() -> EmbeddingCache:
+    """Process-wide cache configured from EMBEDDING_CACHE_* environment variables."""
+    global _cache
+    if _cache is None:
+        _cache = EmbeddingCache(
+            path=os.getenv("EMBEDDING_CACHE_PATH", ""),
+            memory_items=int(os.getenv("EMBEDDING_CACHE_MEMORY_ITEMS", "4096")),
+            max_items=int(os.getenv("EMBEDDING_CACHE_MAX_ITEMS", "200000")),
+        )
+    return _cache
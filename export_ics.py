@@ -1,16 +1,26 @@
-from ics import Calendar, Event
-from datetime import datetime, timedelta
-import dateparser  # install this: pip install dateparser
+import functools
+import hashlib
+import os
+from datetime import datetime, timedelta, timezone
+from deadline_parser import parse_deadlines
+from metrics import stage
 
+PRODID = "-//Meeting to Action Agent//Task Export//EN"
+UID_DOMAIN = "meeting-to-action"
+# Deadlines are parsed this many tasks at a time, so memory stays flat however many tasks stream through
+PARSE_CHUNK = 1000
 
-def parse_deadline(deadline_text):
+
+def parse_deadline(deadline_text, parsed_date=None):
     """
     Converts natural language like 'Friday' or 'next week' into a real datetime.
+    Pass `parsed_date` when the text was already parsed in bulk (see parse_deadlines).
     """
     if not deadline_text:
         return datetime.now() + timedelta(days=1)
 
-    parsed_date = dateparser.parse(deadline_text, settings={'PREFER_DATES_FROM': 'future'})
+    if parsed_date is None:
+        parsed_date = parse_deadlines([deadline_text])[0]
     if parsed_date:
         return parsed_date
     else:
@@ -18,26 +28,183 @@ def parse_deadline(deadline_text):
         return datetime.now() + timedelta(days=2)
 
 
-def export_tasks_to_ics(tasks, filename="tasks.ics"):
+def task_uid(task) -> str:
+    """Stable UID from the task's content (person + task), so re-exports update the same event."""
+    key = f"{task.get('person', 'Someone')}|{task.get('task', 'Unnamed Task')}".strip().lower()
+    return f"{hashlib.sha1(key.encode('utf-8')).hexdigest()}@{UID_DOMAIN}"
+
+
+def _escape(text) -> str:
+    return (str(text).replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,")
+            .replace("\r\n", "\\n").replace("\n", "\\n"))
+
+
+def _fold(line: str) -> str:
+    """RFC 5545 line folding: at most 75 octets per line, continuations start with a space."""
+    data = line.encode("utf-8")
+    if len(data) <= 75:
+        return line + "\r\n"
+    parts, start, limit = [], 0, 75
+    while start < len(data):
+        end = min(start + limit, len(data))
+        while end < len(data) and (data[end] & 0xC0) == 0x80:  # don't split a UTF-8 sequence
+            end -= 1
+        parts.append(data[start:end].decode("utf-8"))
+        start, limit = end, 74
+    return "\r\n ".join(parts) + "\r\n"
+
+
+@functools.lru_cache(maxsize=4096)  # exports repeat the same few deadlines
+def _utc(moment: datetime) -> str:
+    if moment.tzinfo is None:
+        moment = moment.astimezone()  # naive deadlines are local time
+    return moment.astimezone(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+
+def _event_properties(task, start: datetime, stamp: str):
     """
-    Takes a list of task dictionaries and exports them as an .ics calendar file.
-    Each task should have: person, task, deadline, and status.
+    [(name, value)] the exporter writes for one task. These are the only
+    properties a merge overwrites; anything else on an event is kept.
     """
+    return [
+        ("DTSTAMP", stamp),
+        ("DTSTART", _utc(start)),
+        ("DTEND", _utc(start + timedelta(hours=1))),
+        ("SUMMARY", _escape(f"{task.get('person', 'Someone')} - {task.get('task', 'Unnamed Task')}")),
+        ("DESCRIPTION", _escape(f"Status: {task.get('status', 'Pending')}")),
+    ]
+
+
+def _with_starts(tasks):
+    """(task, start datetime) pairs, parsing deadlines PARSE_CHUNK tasks at a time."""
+    chunk = []
+    for task in tasks:
+        chunk.append(task)
+        if len(chunk) == PARSE_CHUNK:
+            yield from _parse_chunk(chunk)
+            chunk = []
+    yield from _parse_chunk(chunk)
+
 
-    calendar = Calendar()
+def _parse_chunk(chunk):
+    parsed = parse_deadlines([t.get("deadline", "") for t in chunk])
+    for task, parsed_date in zip(chunk, parsed):
+        yield task, parse_deadline(task.get("deadline", ""), parsed_date)
 
-    for t in tasks:
-        event = Event()
-        event.name = f"{t.get('person', 'Someone')} - {t.get('task', 'Unnamed Task')}"
-        event.description = f"Status: {t.get('status', 'Pending')}"
 
-        deadline_text = t.get("deadline", "")
-        event.begin = parse_deadline(deadline_text)
-        event.end = event.begin + timedelta(hours=1)
+def _vevent(task, start, stamp):
+    lines = ["BEGIN:VEVENT", f"UID:{task_uid(task)}"]
+    lines += [f"{name}:{value}" for name, value in _event_properties(task, start, stamp)]
+    lines.append("END:VEVENT")
+    return "".join(_fold(line) for line in lines)
+
+
+def iter_vevents(tasks, stamp=None):
+    """
+    Yield one folded VEVENT block per task. `tasks` can be any iterable (e.g. a
+    database cursor): nothing is collected, so exports of any size stream.
+    """
+    stamp = stamp or _utc(datetime.now(timezone.utc))
+    for task, start in _with_starts(tasks):
+        yield _vevent(task, start, stamp)
 
-        calendar.events.add(event)
 
-    with open(filename, "w") as f:
-        f.writelines(calendar)
+def iter_calendar(tasks, stamp=None):
+    """Yield a whole VCALENDAR document in pieces."""
+    yield f"BEGIN:VCALENDAR\r\nVERSION:2.0\r\nPRODID:{PRODID}\r\n"
+    yield from iter_vevents(tasks, stamp)
+    yield "END:VCALENDAR\r\n"
+
+
+def _iter_unfolded(path):
+    """Logical (unfolded) content lines of an .ics file."""
+    current = None
+    with open(path, encoding="utf-8", newline="") as f:
+        for raw in f:
+            line = raw.rstrip("\r\n")
+            if line[:1] in (" ", "\t") and current is not None:
+                current += line[1:]
+                continue
+            if current is not None:
+                yield current
+            current = line
+    if current:
+        yield current
+
+
+def _merge_event(lines, task, start, stamp):
+    """Existing VEVENT lines with the managed properties replaced and everything else kept."""
+    updated = dict(_event_properties(task, start, stamp))
+    out, depth = [], 0
+    for line in lines:
+        name = line.split(":", 1)[0].split(";", 1)[0].upper()
+        if name == "BEGIN":
+            depth += 1
+        elif name == "END":
+            depth -= 1
+        # Only the event's own properties, not those of nested VALARMs
+        if depth == 1 and name in updated:
+            if updated[name] is not None:
+                out.append(f"{name}:{updated[name]}")
+                updated[name] = None
+            continue
+        out.append(line)
+    missing = [f"{name}:{value}" for name, value in updated.items() if value is not None]
+    return out[:2] + missing + out[2:]
+
+
+def _iter_merged(path, tasks, stamp):
+    """
+    Stream the existing calendar, updating events whose UID matches a task and
+    keeping every other event and property untouched; new tasks are appended.
+    """
+    by_uid = {task_uid(task): (task, start) for task, start in _with_starts(tasks)}
+    event, uid, depth = None, None, 0
+    for line in _iter_unfolded(path):
+        upper = line.upper()
+        if upper == "BEGIN:VEVENT" and depth == 0:
+            event, uid, depth = [line], None, 1
+            continue
+        if event is None:
+            if upper == "END:VCALENDAR":
+                break
+            yield _fold(line)
+            continue
+        event.append(line)
+        if upper.startswith("BEGIN:"):
+            depth += 1
+        elif upper.startswith("END:"):
+            depth -= 1
+        elif depth == 1 and upper.startswith("UID:"):
+            uid = line[4:]
+        if depth == 0:
+            if uid in by_uid:
+                event = _merge_event(event, *by_uid.pop(uid), stamp)
+            yield "".join(_fold(line) for line in event)
+            event = None
+    for task, start in by_uid.values():
+        yield _vevent(task, start, stamp)
+    yield "END:VCALENDAR\r\n"
+
+
+def export_tasks_to_ics(tasks, filename="tasks.ics", incremental=False):
+    """
+    Exports tasks (dicts with person, task, deadline and status) to an .ics file,
+    streaming events to a temp file that then replaces `filename`.
+
+    With incremental=True an existing file is merged by UID instead of
+    regenerated: matching events get the new time, title and status, and
+    everything else in the file (other events, alarms, notes) is kept.
+    """
+    stamp = _utc(datetime.now(timezone.utc))
+    if incremental and os.path.exists(filename):
+        pieces = _iter_merged(filename, tasks, stamp)
+    else:
+        pieces = iter_calendar(tasks, stamp)
+
+    tmp = filename + ".tmp"
+    with stage("ics_export"), open(tmp, "w", encoding="utf-8", newline="") as f:
+        f.writelines(pieces)
+    os.replace(tmp, filename)
 
     return filename
@@ -0,0 +1,141 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+
+def normalise_transcript(transcript: str) -> str:
+    """Whitespace/Unicode-insensitive form of a transcript, so trivial re-uploads hit the cache."""
+    text = unicodedata.normalize("NFC", transcript or "")
+    return "\n".join(" ".join(line.split()) for line in text.strip().splitlines() if line.strip())
+
+
+def cache_key(transcript: str, prompt_version: str, model_name: str) -> str:
+    """Content address: sha256 of prompt version, model and normalised transcript."""
+    digest = hashlib.sha256()
+    for part in (prompt_version, model_name, normalise_transcript(transcript)):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class ExtractionCache:
+    """
+    Two-tier cache for extraction results.
+    - memory: per-process LRU of the most recent `memory_items` results
+    - disk: SQLite file shared by every process on the host, with TTL and a size cap
+      (least recently used rows are evicted once `max_bytes` is exceeded)
+    """
+
+    def __init__(self, path="extraction_cache.sqlite", ttl=7 * 24 * 3600, max_bytes=100 * 1024 * 1024,
+                 memory_items=256):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.memory_items = memory_items
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "sets": 0, "evictions": 0}
+        self._conn = None
+        if path:
+            self._conn = sqlite3.connect(path, timeout=10, check_same_thread=False, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS extractions ("
+                " key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL,"
+                " created REAL NOT NULL, accessed REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS extractions_accessed ON extractions(accessed)")
+
+    def _remember(self, key, value):
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_items:
+            self._memory.popitem(last=False)
+
+    def get(self, key):
+        """Return the cached value for `key`, or None."""
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self._stats["memory_hits"] += 1
+                return self._memory[key]
+
+            if self._conn is not None:
+                now = time.time()
+                row = self._conn.execute(
+                    "SELECT value, created FROM extractions WHERE key = ?", (key,)
+                ).fetchone()
+                if row and now - row[1] <= self.ttl:
+                    self._conn.execute("UPDATE extractions SET accessed = ? WHERE key = ?", (now, key))
+                    self._remember(key, row[0])
+                    self._stats["disk_hits"] += 1
+                    return row[0]
+                if row:
+                    self._conn.execute("DELETE FROM extractions WHERE key = ?", (key,))
+                    self._stats["evictions"] += 1
+
+            self._stats["misses"] += 1
+            return None
+
+    def set(self, key, value: str):
+        """Store `value` in both tiers and enforce the disk TTL/size limits."""
+        with self._lock:
+            self._remember(key, value)
+            self._stats["sets"] += 1
+            if self._conn is None:
+                return
+            now = time.time()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO extractions (key, value, size, created, accessed) VALUES (?, ?, ?, ?, ?)",
+                (key, value, len(value.encode("utf-8")), now, now),
+            )
+            self._evict(now)
+
+    def _evict(self, now):
+        expired = self._conn.execute("DELETE FROM extractions WHERE created < ?", (now - self.ttl,)).rowcount
+        self._stats["evictions"] += max(expired, 0)
+
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM extractions").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in self._conn.execute("SELECT key, size FROM extractions ORDER BY accessed").fetchall():
+            if total <= self.max_bytes:
+                break
+            self._conn.execute("DELETE FROM extractions WHERE key = ?", (key,))
+            self._memory.pop(key, None)
+            total -= size
+            self._stats["evictions"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM extractions")
+
+    def stats(self):
+        """Hit/miss counters plus the current hit ratio."""
+        with self._lock:
+            stats = dict(self._stats)
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_ratio"] = round((stats["memory_hits"] + stats["disk_hits"]) / lookups, 4) if lookups else 0.0
+        return stats
+
+
+_cache = None
+
+
+def get_extraction_cache() -> ExtractionCache:
+    """Process-wide cache configured from EXTRACTION_CACHE_* environment variables."""
+    global _cache
+    if _cache is None:
+        _cache = ExtractionCache(
+            path=os.getenv("EXTRACTION_CACHE_PATH", "extraction_cache.sqlite"),
+            ttl=float(os.getenv("EXTRACTION_CACHE_TTL", str(7 * 24 * 3600))),
+            max_bytes=int(float(os.getenv("EXTRACTION_CACHE_MAX_MB", "100")) * 1024 * 1024),
+            memory_items=int(os.getenv("EXTRACTION_CACHE_MEMORY_ITEMS", "256")),
+        )
+    return _cache
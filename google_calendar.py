@@ -1,17 +1,44 @@
 from __future__ import print_function
 import datetime
+import hashlib
 import os
 import pickle
+import random
+import threading
+import time
+import httplib2
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
+from googleapiclient.http import BatchHttpRequest
 from google.auth.transport.requests import Request
+from metrics import inc, stage
 
 # Scopes define what permissions your app has
 SCOPES = ['https://www.googleapis.com/auth/calendar']
 
-def get_calendar_service():
-    """Authenticate and return Google Calendar service."""
+CALENDAR_ID = os.getenv("GOOGLE_CALENDAR_ID", "primary")
+CALENDAR_TIMEZONE = os.getenv("GOOGLE_CALENDAR_TIMEZONE", "Asia/Kolkata")
+# Point the client at a local stub server (e.g. http://127.0.0.1:8089/calendar/v3/); requests are then unauthenticated
+CALENDAR_API_URL = os.getenv("GOOGLE_CALENDAR_API_URL", "")
+# Events per batch request (the Calendar API accepts up to 50) and retries for throttled/5xx items
+CALENDAR_BATCH_SIZE = min(int(os.getenv("GOOGLE_CALENDAR_BATCH_SIZE", "50")), 50)
+CALENDAR_MAX_RETRIES = int(os.getenv("GOOGLE_CALENDAR_MAX_RETRIES", "5"))
+CALENDAR_BACKOFF = float(os.getenv("GOOGLE_CALENDAR_BACKOFF", "1.0"))
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+RATE_LIMIT_REASONS = ("rateLimitExceeded", "userRateLimitExceeded")
+
+_service = None
+_creds = None
+_service_lock = threading.Lock()
+# httplib2 connections are not thread-safe: one sync at a time per process
+_sync_lock = threading.Lock()
+
+
+def _load_credentials():
+    """Read token.pkl, refreshing or re-running the OAuth flow when it is no longer valid."""
     creds = None
 
     # Token file stores the user's access and refresh tokens
@@ -28,32 +55,156 @@ def get_calendar_service():
             creds = flow.run_local_server(port=0)
         with open("token.pkl", "wb") as token:
             pickle.dump(creds, token)
+    return creds
+
+
+def get_calendar_service():
+    """
+    Authenticate and return the Google Calendar service. Built once per process;
+    later calls only refresh the access token when it has expired, and rebuild the
+    service when new credentials had to be loaded.
+    """
+    global _service, _creds
+    with _service_lock:
+        if CALENDAR_API_URL:
+            if _service is None:
+                _service = build("calendar", "v3", http=httplib2.Http(), static_discovery=True,
+                                 client_options={"api_endpoint": CALENDAR_API_URL})
+            return _service
+        if _service is not None and _creds.valid:
+            return _service
+        if _creds is not None and _creds.expired and _creds.refresh_token:
+            _creds.refresh(Request())
+            with open("token.pkl", "wb") as token:
+                pickle.dump(_creds, token)
+        else:
+            _creds = _load_credentials()
+            _service = None  # it wraps the credentials that were just replaced
+        if _service is None:
+            _service = build("calendar", "v3", credentials=_creds, static_discovery=True)
+        return _service
+
+
+def _new_batch(service):
+    if CALENDAR_API_URL:
+        # The discovery document's batch URL always points at Google
+        return BatchHttpRequest(batch_uri=CALENDAR_API_URL.split("/calendar/")[0].rstrip("/") + "/batch/calendar/v3")
+    return service.new_batch_http_request()
 
-    service = build("calendar", "v3", credentials=creds)
-    return service
 
+def event_id(key: str) -> str:
+    """
+    Deterministic event id for a task, so syncing it again updates the same event.
+    Calendar ids must be base32hex (a-v, 0-9); a hex digest qualifies.
+    """
+    return "mta" + hashlib.sha1(key.strip().lower().encode("utf-8")).hexdigest()
 
-def add_event_to_calendar(summary, description, start_time):
-    """Add a single event to Google Calendar."""
-    service = get_calendar_service()
 
+def build_event(summary, description, start_time):
+    """Calendar event body for a one-hour event starting at `start_time`."""
     # Ensure start_time is datetime
     if isinstance(start_time, str):
         start_time = datetime.datetime.fromisoformat(start_time)
 
-    event = {
+    return {
         'summary': summary,
         'description': description,
+        'status': 'confirmed',  # revives the event if it was deleted in the calendar
         'start': {
             'dateTime': start_time.isoformat(),
-            'timeZone': 'Asia/Kolkata',
+            'timeZone': CALENDAR_TIMEZONE,
         },
         'end': {
             'dateTime': (start_time + datetime.timedelta(hours=1)).isoformat(),
-            'timeZone': 'Asia/Kolkata',
+            'timeZone': CALENDAR_TIMEZONE,
         },
     }
 
-    event_result = service.events().insert(calendarId='primary', body=event).execute()
-    print(f"✅ Event created: {event_result.get('htmlLink')}")
-    return event_result.get('htmlLink')
+
+def _retryable(error: HttpError) -> bool:
+    status = error.resp.status
+    if status in RETRYABLE_STATUS:
+        return True
+    return status == 403 and any(reason in str(error.content) for reason in RATE_LIMIT_REASONS)
+
+
+def _backoff(attempt):
+    time.sleep(min(CALENDAR_BACKOFF * 2 ** attempt, 32) * (0.5 + random.random() / 2))
+
+
+def sync_events(events, calendar_id=None, batch_size=None):
+    """
+    Upsert events with batched requests. `events` are dicts with summary,
+    description, start and key (what makes two events "the same", e.g. person and
+    task); the event id is derived from the key, so re-running a sync updates
+    existing events instead of duplicating them.
+
+    Inserts go out `batch_size` per HTTP request. Ids that already exist are
+    updated in a follow-up batch; throttled and 5xx items are retried with
+    exponential backoff. Returns one result per event, in order:
+    {"id", "link", "action": "created" | "updated"} or {"id", "error"}.
+    """
+    calendar_id = calendar_id or CALENDAR_ID
+    batch_size = batch_size or CALENDAR_BATCH_SIZE
+    results = [None] * len(events)
+    # (position, method, attempt) still to send
+    pending = [(i, "insert", 0) for i in range(len(events))]
+    bodies = [dict(build_event(e["summary"], e.get("description", ""), e["start"]),
+                   id=event_id(e.get("key") or e["summary"])) for e in events]
+
+    with _sync_lock, stage("calendar_sync"):
+        service = get_calendar_service()
+        while pending:
+            retry, follow_up = [], []
+            for start in range(0, len(pending), batch_size):
+                chunk = pending[start:start + batch_size]
+                batch = _new_batch(service)
+                answered = set()  # chunk positions whose callback already ran
+
+                def callback(request_id, response, exception, chunk=chunk, answered=answered):
+                    answered.add(int(request_id))
+                    i, method, attempt = chunk[int(request_id)]
+                    if exception is None:
+                        action = "created" if method == "insert" else "updated"
+                        results[i] = {"id": response.get("id"), "link": response.get("htmlLink"), "action": action}
+                    elif method == "insert" and exception.resp.status == 409:
+                        follow_up.append((i, "update", attempt))  # already synced once: update it
+                    elif _retryable(exception) and attempt < CALENDAR_MAX_RETRIES:
+                        retry.append((i, method, attempt + 1))
+                    else:
+                        results[i] = {"id": bodies[i]["id"], "error": str(exception)}
+
+                for n, (i, method, _) in enumerate(chunk):
+                    if method == "insert":
+                        request = service.events().insert(calendarId=calendar_id, body=bodies[i])
+                    else:
+                        request = service.events().update(calendarId=calendar_id, eventId=bodies[i]["id"],
+                                                          body=bodies[i])
+                    batch.add(request, callback=callback, request_id=str(n))
+                try:
+                    with stage("calendar_batch"):
+                        batch.execute()
+                except (httplib2.HttpLib2Error, OSError, HttpError) as e:
+                    # The batch failed in transit: retry the items it never answered
+                    for n, (i, method, attempt) in enumerate(chunk):
+                        if n in answered:
+                            continue
+                        if attempt < CALENDAR_MAX_RETRIES:
+                            retry.append((i, method, attempt + 1))
+                        else:
+                            results[i] = {"id": bodies[i]["id"], "error": str(e)}
+            if retry:
+                _backoff(max(attempt for _, _, attempt in retry) - 1)
+            pending = follow_up + retry
+    for result in results:
+        inc("calendar_events_total", result=result.get("action", "error"))
+    return results
+
+
+def add_event_to_calendar(summary, description, start_time, key=None):
+    """Add (or update) a single event in Google Calendar."""
+    result = sync_events([{"summary": summary, "description": description, "start": start_time, "key": key}])[0]
+    if "error" in result:
+        raise RuntimeError(result["error"])
+    print(f"✅ Event {result['action']}: {result['link']}")
+    return result['link']
@@ -0,0 +1,196 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+# Job states: queued -> running -> done | failed (a failed attempt with retries left goes back to queued)
+STATUSES = ("queued", "running", "done", "failed")
+
+
+def job_key(transcript: str, chunked=None) -> str:
+    """Dedupe key: resubmitting a transcript that is still queued or running returns the existing job."""
+    from extraction_cache import normalise_transcript
+
+    return hashlib.sha256(f"{chunked}\0{normalise_transcript(transcript)}".encode("utf-8")).hexdigest()
+
+
+class JobQueue:
+    """
+    Persistent priority queue of extraction jobs in SQLite (WAL), shared by every
+    backend process on the host. Workers claim the highest-priority runnable job
+    with one atomic UPDATE, holding a lease; a job whose worker died is picked up
+    again once its lease expires. Failed attempts are retried with exponential
+    backoff until `max_attempts`.
+    """
+
+    def __init__(self, path="jobs.sqlite", max_attempts=3, retry_backoff=5.0, lease_seconds=600.0,
+                 retention=7 * 24 * 3600, dedupe_window=0.0):
+        self.path = path
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+        self.lease_seconds = lease_seconds
+        self.retention = retention
+        self.dedupe_window = dedupe_window
+        self._lock = threading.Lock()
+        self._wake = threading.Condition(self._lock)
+        self._stats = {"submitted": 0, "deduplicated": 0, "completed": 0, "retried": 0, "failed": 0}
+        self._conn = sqlite3.connect(path or ":memory:", timeout=10, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " id TEXT PRIMARY KEY, key TEXT, payload TEXT NOT NULL, priority INTEGER NOT NULL,"
+            " status TEXT NOT NULL, attempts INTEGER NOT NULL DEFAULT 0, max_attempts INTEGER NOT NULL,"
+            " result TEXT, error TEXT, run_after REAL NOT NULL, lease_until REAL,"
+            " created REAL NOT NULL, updated REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_runnable ON jobs(status, priority DESC, created)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_key ON jobs(key)")
+        self._prune(time.time())
+
+    def _prune(self, now):
+        """Forget finished jobs older than the retention period."""
+        with self._lock:
+            self._conn.execute("DELETE FROM jobs WHERE status IN ('done', 'failed') AND updated < ?",
+                               (now - self.retention,))
+
+    def submit(self, payload, priority=0, key=None):
+        """
+        Queue a job and return its id. With a `key`, an existing queued or running job
+        for the same key is returned instead, as is one that finished within the last
+        `dedupe_window` seconds; anything older (or failed) runs again.
+        """
+        now = time.time()
+        with self._lock:
+            if key:
+                row = self._conn.execute(
+                    "SELECT id FROM jobs WHERE key = ? AND (status IN ('queued', 'running')"
+                    " OR (status = 'done' AND updated >= ?)) ORDER BY created DESC LIMIT 1",
+                    (key, now - self.dedupe_window),
+                ).fetchone()
+                if row:
+                    self._stats["deduplicated"] += 1
+                    return row[0]
+            job_id = uuid.uuid4().hex
+            self._conn.execute(
+                "INSERT INTO jobs (id, key, payload, priority, status, max_attempts, run_after, created, updated)"
+                " VALUES (?, ?, ?, ?, 'queued', ?, ?, ?, ?)",
+                (job_id, key, json.dumps(payload), int(priority), self.max_attempts, now, now, now),
+            )
+            self._stats["submitted"] += 1
+            self._wake.notify()
+        return job_id
+
+    def claim(self, timeout=0.0):
+        """
+        Lease the next runnable job: (id, payload, attempt) or None if nothing was
+        runnable within `timeout` seconds. Other processes' submissions are seen on
+        the next check, at most every half second.
+        """
+        deadline = time.monotonic() + timeout
+        with self._lock:
+            while True:
+                now = time.time()
+                row = self._conn.execute(
+                    "UPDATE jobs SET status = 'running', attempts = attempts + 1, lease_until = ?, updated = ?"
+                    " WHERE id = (SELECT id FROM jobs WHERE (status = 'queued' AND run_after <= ?)"
+                    "  OR (status = 'running' AND lease_until < ?) ORDER BY priority DESC, created LIMIT 1)"
+                    " RETURNING id, payload, attempts, max_attempts",
+                    (now + self.lease_seconds, now, now, now),
+                ).fetchone()
+                if row and row[2] > row[3]:
+                    # Its worker died on the last allowed attempt
+                    self._finish(row[0], "failed", error="Worker stopped before the job finished")
+                    continue
+                if row:
+                    return row[0], json.loads(row[1]), row[2]
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                self._wake.wait(min(remaining, 0.5))
+
+    def _finish(self, job_id, status, result=None, error=None):
+        self._conn.execute(
+            "UPDATE jobs SET status = ?, result = ?, error = ?, lease_until = NULL, updated = ? WHERE id = ?",
+            (status, json.dumps(result) if result is not None else None, error, time.time(), job_id),
+        )
+        self._stats["completed" if status == "done" else "failed"] += 1
+
+    def complete(self, job_id, result):
+        with self._lock:
+            self._finish(job_id, "done", result=result)
+
+    def release(self, job_id):
+        """Put a claimed job back without counting the attempt (e.g. the worker is shutting down)."""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = 'queued', attempts = attempts - 1, lease_until = NULL, run_after = ?,"
+                " updated = ? WHERE id = ? AND status = 'running'",
+                (time.time(), time.time(), job_id),
+            )
+            self._wake.notify()
+
+    def fail(self, job_id, error: str):
+        """Record a failed attempt: requeue with backoff, or mark the job failed when out of attempts."""
+        with self._lock:
+            row = self._conn.execute("SELECT attempts, max_attempts FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is None:
+                return
+            attempts, max_attempts = row
+            if attempts >= max_attempts:
+                self._finish(job_id, "failed", error=error)
+                return
+            now = time.time()
+            self._conn.execute(
+                "UPDATE jobs SET status = 'queued', error = ?, lease_until = NULL, run_after = ?, updated = ?"
+                " WHERE id = ?",
+                (error, now + self.retry_backoff * 2 ** (attempts - 1), now, job_id),
+            )
+            self._stats["retried"] += 1
+
+    def get(self, job_id):
+        """Job status dict (with `result` once done and `position` while queued), or None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, status, priority, attempts, max_attempts, result, error, created, updated"
+                " FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            job = dict(zip(("job_id", "status", "priority", "attempts", "max_attempts", "result", "error",
+                            "created", "updated"), row))
+            if job["status"] == "queued":
+                job["position"] = self._conn.execute(
+                    "SELECT COUNT(*) FROM jobs WHERE status = 'queued'"
+                    " AND (priority > ? OR (priority = ? AND created < ?))",
+                    (job["priority"], job["priority"], job["created"]),
+                ).fetchone()[0]
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    def stats(self):
+        """Jobs per status plus submit/retry/failure counters."""
+        with self._lock:
+            counts = dict(self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+            stats = dict(self._stats)
+        stats.update({status: counts.get(status, 0) for status in STATUSES})
+        return stats
+
+
+_queue = None
+
+
+def get_job_queue() -> JobQueue:
+    """Process-wide queue configured from JOB_* environment variables."""
+    global _queue
+    if _queue is None:
+        _queue = JobQueue(
+            path=os.getenv("JOB_QUEUE_PATH", "jobs.sqlite"),
+            max_attempts=int(os.getenv("JOB_MAX_ATTEMPTS", "3")),
+            retry_backoff=float(os.getenv("JOB_RETRY_BACKOFF", "5")),
+            lease_seconds=float(os.getenv("JOB_LEASE_SECONDS", "600")),
+            dedupe_window=float(os.getenv("JOB_DEDUPE_WINDOW", "0")),
+        )
+    return _queue
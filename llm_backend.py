@@ -0,0 +1,160 @@
+import asyncio
+import json
+import os
+import re
+import threading
+import time
+from dotenv import load_dotenv
+from metrics import record_tokens
+from rate_limit import get_rate_limiter
+from task_schema import TASK_RESPONSE_SCHEMA
+from transcript_chunker import estimate_tokens
+
+load_dotenv()
+
+GEMINI_MODEL = "models/gemini-2.5-flash"
+
+
+class LLMBackend:
+    """
+    Minimal interface every extraction backend implements.
+    Subclasses only need `generate`; `generate_async` falls back to a worker thread.
+    """
+    model_name = "unknown"
+
+    def generate(self, prompt: str) -> str:
+        raise NotImplementedError
+
+    async def generate_async(self, prompt: str) -> str:
+        return await asyncio.to_thread(self.generate, prompt)
+
+    async def generate_stream(self, prompt: str):
+        """Yield the reply in pieces as it is generated (default: one piece)."""
+        yield await self.generate_async(prompt)
+
+    def _count_tokens(self, prompt: str, reply: str, usage=None):
+        """Token counters for /metrics: the API's usage report when there is one, else an estimate."""
+        prompt_tokens = getattr(usage, "prompt_token_count", None) or estimate_tokens(prompt)
+        reply_tokens = getattr(usage, "candidates_token_count", None) or estimate_tokens(reply)
+        record_tokens(prompt_tokens, reply_tokens, self.model_name)
+
+
+class GeminiBackend(LLMBackend):
+    """
+    Google Gemini via google-generativeai (uses the SDK's native async call).
+    Replies use structured JSON output constrained to TASK_RESPONSE_SCHEMA, and
+    every call goes through the process-wide rate limiter.
+    """
+
+    def __init__(self, model_name=GEMINI_MODEL):
+        import google.generativeai as genai
+
+        genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
+        self.model_name = model_name
+        self.model = genai.GenerativeModel(
+            model_name,
+            generation_config={
+                "response_mime_type": "application/json",
+                "response_schema": TASK_RESPONSE_SCHEMA,
+            },
+        )
+
+    def generate(self, prompt: str) -> str:
+        response = get_rate_limiter().call(self.model.generate_content, prompt)
+        self._count_tokens(prompt, response.text, getattr(response, "usage_metadata", None))
+        return response.text.strip()
+
+    async def generate_async(self, prompt: str) -> str:
+        response = await get_rate_limiter().call_async(self.model.generate_content_async, prompt)
+        self._count_tokens(prompt, response.text, getattr(response, "usage_metadata", None))
+        return response.text.strip()
+
+    async def generate_stream(self, prompt: str):
+        response = await get_rate_limiter().call_async(self.model.generate_content_async, prompt, stream=True)
+        pieces, usage = [], None
+        async for chunk in response:
+            usage = getattr(chunk, "usage_metadata", None) or usage  # the last chunk carries the totals
+            if chunk.text:
+                pieces.append(chunk.text)
+                yield chunk.text
+        self._count_tokens(prompt, "".join(pieces), usage)
+
+
+class FakeBackend(LLMBackend):
+    """
+    Deterministic local stand-in for Gemini, used for load tests.
+    Turns sentences like "Riya will finalize X by Friday" into task JSON
+    after a fixed artificial latency (LLM_FAKE_LATENCY seconds).
+    """
+    model_name = "fake"
+
+    _sentence = re.compile(r"^([A-Z][a-zA-Z]+)\s+(?:will|to|should|needs to)\s+(.+?)(?:\s+by\s+(.+?))?$")
+
+    def __init__(self, latency=None):
+        self.latency = float(os.getenv("LLM_FAKE_LATENCY", "0.2")) if latency is None else latency
+
+    def _respond(self, prompt: str) -> str:
+        transcript = prompt.rsplit("transcript:", 1)[-1]
+        tasks = []
+        for sentence in re.split(r"[.\n]+", transcript):
+            sentence = re.sub(r"^\s*[A-Z][\w ]{0,30}:\s*", "", sentence)  # drop "Speaker:" labels
+            match = self._sentence.match(sentence.strip())
+            if match:
+                person, task, deadline = match.groups()
+                tasks.append({
+                    "person": person,
+                    "task": task[0].upper() + task[1:],
+                    "deadline": deadline or "",
+                    "status": "Pending",
+                })
+        return json.dumps(tasks)
+
+    def _reply(self, prompt: str) -> str:
+        reply = self._respond(prompt)
+        self._count_tokens(prompt, reply)
+        return reply
+
+    def generate(self, prompt: str) -> str:
+        time.sleep(self.latency)
+        return self._reply(prompt)
+
+    async def generate_async(self, prompt: str) -> str:
+        await asyncio.sleep(self.latency)
+        return self._reply(prompt)
+
+    async def generate_stream(self, prompt: str, piece_size=24):
+        # Half the latency before the first token, the rest spread over the pieces
+        text = self._reply(prompt)
+        pieces = [text[i:i + piece_size] for i in range(0, len(text), piece_size)] or [""]
+        await asyncio.sleep(self.latency / 2)
+        for piece in pieces:
+            await asyncio.sleep(self.latency / 2 / len(pieces))
+            yield piece
+
+
+BACKENDS = {
+    "gemini": GeminiBackend,
+    "fake": FakeBackend,
+}
+
+_backend = None
+_backend_lock = threading.Lock()  # the startup warm-up and a first request may race to create it
+
+
+def get_backend() -> LLMBackend:
+    """Return the process-wide backend selected by LLM_BACKEND (default: gemini)."""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                name = os.getenv("LLM_BACKEND", "gemini").lower()
+                if name not in BACKENDS:
+                    raise ValueError(f"Unknown LLM_BACKEND '{name}' (choose from {', '.join(BACKENDS)})")
+                _backend = BACKENDS[name]()
+    return _backend
+
+
+def set_backend(backend: LLMBackend):
+    """Override the process-wide backend (e.g. with a FakeBackend in load tests)."""
+    global _backend
+    _backend = backend
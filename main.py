@@ -1,6 +1,42 @@
+import asyncio
+import importlib
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from agent_utils import extract_tasks_from_text
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from agent_utils import (
+    MAX_IN_FLIGHT,
+    extract_tasks_async,
+    extract_tasks_chunked,
+    extraction_stats,
+    should_chunk,
+    stream_tasks,
+    streaming_stats,
+)
+from deadline_parser import deadline_stats
+from extraction_cache import get_extraction_cache
+from job_queue import get_job_queue, job_key
+from llm_backend import get_backend
+import metrics
+from rate_limit import get_rate_limiter
+from rule_extractor import rule_stats
+from task_schema import loaded_task, stored_task, validation_stats
+from transcript_preprocess import preprocess_stats, preprocess_transcript
+import warmup
+
+# How many transcripts of one batch request are processed at once
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", str(MAX_IN_FLIGHT)))
+# Strip timestamps, filler and duplicate lines before extraction
+PREPROCESS = os.getenv("PREPROCESS", "1") != "0"
+# Queued jobs processed at once per backend process (model calls are still capped by LLM_MAX_IN_FLIGHT)
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+# Longest a GET /jobs/{id}?wait=... long poll may block
+JOB_MAX_WAIT = 30.0
+# A worker whose queue call failed (e.g. "database is locked") waits this long, doubling up to 30 s
+JOB_ERROR_BACKOFF = float(os.getenv("JOB_ERROR_BACKOFF", "1"))
 
 app = FastAPI(title="Meeting-to-Action Agent")
 
@@ -14,23 +50,332 @@ app.add_middleware(
 )
 
 
+# ---------------------
+# 📈 Metrics
+# ---------------------
+@app.middleware("http")
+async def time_requests(request: Request, call_next):
+    started = time.perf_counter()
+    response = await call_next(request)
+    # Route template, not the raw path, so /jobs/{job_id} is one series
+    route = getattr(request.scope.get("route"), "path", "unmatched")
+    metrics.observe("http_request_seconds", time.perf_counter() - started,
+                    method=request.method, route=route, status=response.status_code)
+    return response
+
+
+@app.get("/metrics")
+def prometheus_metrics():
+    """Stage latency histograms, token counters and the /stats counters as gauges, in Prometheus text format."""
+    return PlainTextResponse(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+
 @app.get("/")
 def root():
     return {"message": "Meeting-to-Action Agent backend is running ✅"}
 
 
+@app.get("/ready")
+def ready():
+    """200 once the background warm-up has finished (for load balancer readiness probes), else 503."""
+    status = warmup.status()
+    is_ready = all(task["ready"] for task in status.values())
+    return JSONResponse({"ready": is_ready, "warmup": status}, status_code=200 if is_ready else 503)
+
+
+# Sections of /stats; each is also exported on /metrics as gauges
+STATS_SECTIONS = {
+    "extraction": extraction_stats,
+    "preprocess": preprocess_stats,
+    "rules": rule_stats,
+    "streaming": streaming_stats,
+    "validation": validation_stats,
+    "deadlines": deadline_stats,
+    "cache": lambda: get_extraction_cache().stats(),
+    "jobs": lambda: get_job_queue().stats(),
+    "rate_limit": lambda: get_rate_limiter().stats(),
+    "warmup": warmup.status,
+}
+for _section, _collect in STATS_SECTIONS.items():
+    metrics.register_collector(_section, _collect)
+
+
+@app.get("/stats")
+def stats():
+    """Extraction queue, preprocessing, rule fast path, streaming, validation, deadline parsing, cache, job queue and rate-limiter counters."""
+    return {section: collect() for section, collect in STATS_SECTIONS.items()}
+
+
+def prepare_transcript(transcript: str):
+    """Run the preprocessing pipeline (if enabled); returns (text, token report)."""
+    if not PREPROCESS:
+        return transcript, None
+    with metrics.stage("preprocess"):
+        cleaned = preprocess_transcript(transcript)
+    return cleaned.text, {"before": cleaned.tokens_before, "after": cleaned.tokens_after}
+
+
+async def run_extraction(transcript: str, chunked=None):
+    """Extract tasks from one transcript; long ones (or chunked=True) use map-reduce extraction."""
+    transcript, tokens = prepare_transcript(transcript)
+    result = {"tasks": []}
+    if not transcript:
+        pass  # nothing actionable left after preprocessing
+    elif chunked or (chunked is None and should_chunk(transcript)):
+        tasks, chunks = await extract_tasks_chunked(transcript)
+        result = {"tasks": [t.to_dict() for t in tasks], "chunks": chunks}
+    else:
+        tasks = await extract_tasks_async(transcript)
+        result = {"tasks": [t.to_dict() for t in tasks]}
+    if tokens:
+        result["tokens"] = tokens
+    return result
+
+
 @app.post("/extract_tasks")
 async def extract_tasks(request: Request):
     """
-    API endpoint to extract tasks from meeting transcripts
+    API endpoint to extract tasks from meeting transcripts.
+    With "timings": true the response also carries seconds spent per stage.
     """
     data = await request.json()
     transcript = data.get("transcript", "")
     if not transcript:
         return {"error": "No transcript provided!"}
 
+    with metrics.trace() as timings:
+        try:
+            result = await run_extraction(transcript, data.get("chunked"))
+        except Exception as e:
+            result = {"error": str(e)}
+    if data.get("timings"):
+        result["timings"] = metrics.rounded(timings)
+    return result
+
+
+async def _no_tasks():
+    return
+    yield
+
+
+def _sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@app.post("/extract_tasks/stream")
+async def extract_tasks_stream(request: Request):
+    """
+    Server-Sent Events variant of /extract_tasks: one `task` event per task as soon as
+    the model has finished writing it, then a `done` event with the count and timings
+    (or an `error` event).
+    """
+    data = await request.json()
+    transcript = data.get("transcript", "")
+
+    async def events():
+        if not transcript:
+            yield _sse("error", {"error": "No transcript provided!"})
+            return
+        started = time.perf_counter()
+        first_task_at = None
+        count = 0
+        text, tokens = prepare_transcript(transcript)
+        try:
+            async for task in stream_tasks(text) if text else _no_tasks():
+                if first_task_at is None:
+                    first_task_at = time.perf_counter() - started
+                count += 1
+                yield _sse("task", task.to_dict())
+        except Exception as e:
+            yield _sse("error", {"error": str(e)})
+            return
+        yield _sse("done", {
+            "count": count,
+            "time_to_first_task": round(first_task_at, 3) if first_task_at is not None else None,
+            "seconds": round(time.perf_counter() - started, 3),
+            "tokens": tokens,
+        })
+
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+# ---------------------
+# 📦 Bulk ingestion
+# ---------------------
+def _iter_batch_items(body: bytes, content_type: str):
+    """Yield raw batch items from an NDJSON body (one per line) or a JSON list."""
+    if "ndjson" in content_type or "jsonlines" in content_type:
+        for line in body.split(b"\n"):
+            if line.strip():
+                yield line
+    else:
+        data = json.loads(body)
+        for item in data.get("transcripts", []) if isinstance(data, dict) else data:
+            yield item
+
+
+def _parse_batch_item(item):
+    """Accept a transcript string, {"transcript": ..., "chunked": ...} or an NDJSON line of either."""
+    if isinstance(item, bytes):
+        item = json.loads(item)
+    if isinstance(item, str):
+        item = {"transcript": item}
+    if not isinstance(item, dict) or not item.get("transcript"):
+        raise ValueError("No transcript provided!")
+    return item["transcript"], item.get("chunked")
+
+
+@app.post("/extract_tasks/batch")
+async def extract_tasks_batch(request: Request):
+    """
+    Bulk extraction. Send {"transcripts": [...]}, a JSON list, or an NDJSON body
+    (Content-Type: application/x-ndjson). Results stream back as NDJSON, one line per
+    transcript in completion order: {"index": i, "tasks": ...} or {"index": i, "error": ...}.
+    """
+
+    # Read the body before streaming starts: once the response is running, Starlette's
+    # disconnect listener consumes incoming request messages and request.stream() never ends
+    body = await request.body()
+    content_type = request.headers.get("content-type", "")
+
+    async def results():
+        queue = asyncio.Queue()
+        slots = asyncio.Semaphore(BATCH_CONCURRENCY)
+
+        async def process(index, item):
+            try:
+                transcript, chunked = _parse_batch_item(item)
+                result = await run_extraction(transcript, chunked)
+            except Exception as e:
+                result = {"error": str(e)}
+            finally:
+                slots.release()
+            await queue.put({"index": index, **result})
+
+        async def produce():
+            workers = []
+            try:
+                index = 0
+                for item in _iter_batch_items(body, content_type):
+                    await slots.acquire()
+                    workers.append(asyncio.create_task(process(index, item)))
+                    index += 1
+                await asyncio.gather(*workers)
+            except Exception as e:
+                await queue.put({"index": None, "error": f"Could not read batch: {e}"})
+            finally:
+                for worker in workers:
+                    worker.cancel()  # no-op once finished; stops them if the client went away
+                await queue.put(None)
+
+        producer = asyncio.create_task(produce())
+        try:
+            while (line := await queue.get()) is not None:
+                yield json.dumps(line) + "\n"
+        finally:
+            producer.cancel()
+
+    return StreamingResponse(results(), media_type="application/x-ndjson")
+
+
+# ---------------------
+# 🗃️ Background jobs
+# ---------------------
+# Queue calls block on SQLite (and claim() waits for work), so they get their own threads
+# instead of tying up the default executor the model and cache calls use
+_job_executor = ThreadPoolExecutor(max_workers=JOB_WORKERS + 2, thread_name_prefix="jobs")
+_job_workers = []
+
+
+async def _queue_call(fn, *args):
+    return await asyncio.get_running_loop().run_in_executor(_job_executor, fn, *args)
+
+
+async def _run_job(queue, job_id, payload):
     try:
-        extracted = extract_tasks_from_text(transcript)
-        return {"tasks": extracted}
+        result = await run_extraction(payload["transcript"], payload.get("chunked"))
+    except asyncio.CancelledError:
+        await _queue_call(queue.release, job_id)  # shutting down: another worker picks it up, attempt not counted
+        raise
     except Exception as e:
-        return {"error": str(e)}
+        await _queue_call(queue.fail, job_id, str(e))
+    else:
+        result = dict(result, tasks=[stored_task(t) for t in result["tasks"]])
+        await _queue_call(queue.complete, job_id, result)
+
+
+async def _job_worker():
+    queue = get_job_queue()
+    errors = 0
+    while True:
+        try:
+            claimed = await _queue_call(queue.claim, 1.0)
+            if claimed is not None:
+                job_id, payload, _ = claimed
+                await _run_job(queue, job_id, payload)
+            errors = 0
+        except Exception as e:
+            # A job whose result could not be recorded keeps its lease and is picked up again when it expires
+            delay = min(JOB_ERROR_BACKOFF * 2 ** errors, 30.0)
+            errors = min(errors + 1, 5)
+            print(f"⚠️ Warning: Job worker error, retrying in {delay:g}s: {e}")
+            await asyncio.sleep(delay)
+
+
+@app.on_event("startup")
+def start_warmup():
+    """Import the model SDK and open the caches in the background; the server accepts requests meanwhile."""
+    warmup.start("llm_backend", get_backend)
+    warmup.start("extraction_cache", get_extraction_cache)
+    warmup.start("dateparser", lambda: importlib.import_module("dateparser"))
+
+
+@app.on_event("startup")
+async def start_job_workers():
+    _job_workers.extend(asyncio.create_task(_job_worker()) for _ in range(JOB_WORKERS))
+
+
+@app.on_event("shutdown")
+async def stop_job_workers():
+    for worker in _job_workers:
+        worker.cancel()
+    await asyncio.gather(*_job_workers, return_exceptions=True)
+    _job_workers.clear()
+
+
+@app.post("/jobs")
+async def submit_job(request: Request):
+    """
+    Queue a transcript for background extraction: {"transcript": ..., "chunked": ..., "priority": 0}.
+    Returns {"job_id", "status"} right away; resubmitting a transcript that is still queued
+    or running (or finished within JOB_DEDUPE_WINDOW seconds) returns that job.
+    """
+    data = await request.json()
+    transcript = data.get("transcript", "")
+    if not transcript:
+        return {"error": "No transcript provided!"}
+    payload = {"transcript": transcript, "chunked": data.get("chunked")}
+    queue = get_job_queue()
+    job_id = await _queue_call(queue.submit, payload, data.get("priority", 0), job_key(transcript, payload["chunked"]))
+    job = await _queue_call(queue.get, job_id)
+    return {"job_id": job_id, "status": job["status"]}
+
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str, wait: float = 0):
+    """
+    Job status, attempts and queue position; `result` (same shape as /extract_tasks)
+    once done. `wait` long-polls up to that many seconds (max 30) for the job to finish.
+    """
+    queue = get_job_queue()
+    deadline = time.monotonic() + min(max(wait, 0), JOB_MAX_WAIT)
+    while True:
+        job = await _queue_call(queue.get, job_id)
+        if job is None:
+            return {"error": f"Unknown job {job_id}"}
+        if job["status"] in ("done", "failed") or time.monotonic() >= deadline:
+            if job.get("result"):
+                job["result"]["tasks"] = [loaded_task(t) for t in job["result"].get("tasks", [])]
+            return job
+        await asyncio.sleep(0.25)
@@ -0,0 +1,109 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from bm25_index import reciprocal_rank_fusion
+from embedding_cache import CachedEmbedder, get_embedding_cache
+from memory_manager import (
+    CANDIDATES,
+    DEFAULT_NAMESPACE,
+    EMBEDDING_BATCH_SIZE,
+    TOP_K,
+    answer_from_memory,
+    get_embeddings,
+)
+from memory_snapshot import SNAPSHOT_DIR, SnapshotReader
+from metrics import in_context, stage
+
+SERVICE_URL = os.getenv("MEMORY_SERVICE_URL", "")
+SERVICE_TIMEOUT = float(os.getenv("MEMORY_SERVICE_TIMEOUT", "30"))
+
+
+class RemoteChatMemory:
+    """
+    ChatMemory for UI workers when memory_service.py owns the store: writes go to
+    the service over HTTP, searches run locally against the latest mmapped snapshot.
+    After a write, the next read waits (briefly) until the snapshot includes it.
+    """
+
+    def __init__(self, service_url=SERVICE_URL, snapshot_dir=SNAPSHOT_DIR,
+                 embed_model="sentence-transformers/all-MiniLM-L6-v2"):
+        self.service_url = service_url.rstrip("/")
+        self.reader = SnapshotReader(snapshot_dir)
+        self.embedder = CachedEmbedder(get_embeddings(embed_model), embed_model, get_embedding_cache(),
+                                       EMBEDDING_BATCH_SIZE)
+        self._search_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="memory-search")
+        self._written_seq = 0
+
+    def _post(self, path, payload=None):
+        response = requests.post(f"{self.service_url}{path}", json=payload or {}, timeout=SERVICE_TIMEOUT)
+        response.raise_for_status()
+        data = response.json()
+        if "error" in data:
+            raise RuntimeError(data["error"])
+        self._written_seq = max(self._written_seq, data.get("seq", 0))
+        return data
+
+    def _snapshot(self):
+        if self._written_seq:
+            self.reader.wait_for(self._written_seq)
+        return self.reader.refresh()
+
+    def add(self, text, metadata=None, namespace=None):
+        """Add a chat message or meeting summary to memory."""
+        self.add_many([text], [metadata], namespace)
+
+    def add_many(self, texts, metadatas=None, namespace=None):
+        return self._post("/add", {"texts": list(texts), "metadatas": metadatas, "namespace": namespace})["added"]
+
+    def delete_meeting(self, meeting_id, namespace=None):
+        return self._post("/delete_meeting", {"meeting_id": meeting_id, "namespace": namespace})["deleted"]
+
+    def clear(self):
+        self._post("/clear")
+
+    def meetings(self, namespace=None):
+        snapshot = self._snapshot()
+        return snapshot.meetings(namespace or DEFAULT_NAMESPACE) if snapshot else []
+
+    def stats(self):
+        """Service-side index stats plus this replica's snapshot and embedding counters."""
+        try:
+            service = requests.get(f"{self.service_url}/stats", timeout=SERVICE_TIMEOUT).json()
+        except requests.RequestException as e:
+            service = {"error": str(e)}
+        return {"service": service, "snapshot": self.reader.stats(), "embeddings": self.embedder.stats()}
+
+    def warm_up(self):
+        """Run one embedding and search so the model's and snapshot's first-call costs are paid up front."""
+        self.embedder.embed_one("warm up")
+        self.search("warm up")
+
+    def search(self, query: str, top_k=None, namespaces=None):
+        """Hybrid vector + BM25 search with rank fusion, as ChatMemory.search, over the snapshot."""
+        return self._search(self._snapshot(), query, top_k, namespaces)
+
+    def _vector_search(self, snapshot, query, depth, namespaces):
+        query_vector = self.embedder.embed_one(query)
+        with stage("vector_search"):
+            return snapshot.vector_search(query_vector, depth, namespaces)
+
+    def _search(self, snapshot, query, top_k, namespaces):
+        if snapshot is None:
+            return []
+        namespaces = [namespaces] if isinstance(namespaces, str) else (namespaces or [DEFAULT_NAMESPACE])
+        depth = max(top_k or TOP_K, CANDIDATES)
+        vector_hits = self._search_pool.submit(in_context(self._vector_search), snapshot, query, depth, namespaces)
+        with stage("lexical_search"):
+            lexical_ids = [doc_id for doc_id, _ in snapshot.lexical_search(query, depth, namespaces)]
+        vector_ids = [entry_id for _, entry_id in vector_hits.result()]
+        return reciprocal_rank_fusion([vector_ids, lexical_ids], top_k or TOP_K)
+
+    def retrieve(self, query: str, top_k=None, namespaces=None):
+        """Retrieve relevant past context and rephrase naturally."""
+        snapshot = self._snapshot()
+        if snapshot is None or not snapshot.count():
+            return "I don’t have any prior memory yet."
+        ids = self._search(snapshot, query, top_k, namespaces)
+        texts = snapshot.texts(ids)
+        results = list(dict.fromkeys(texts[i] for i in ids if i in texts))  # Remove duplicates
+        return answer_from_memory(query, results)
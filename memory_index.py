@@ -0,0 +1,330 @@
+import itertools
+import math
+import os
+import pickle
+import threading
+import time
+import faiss
+import numpy as np
+
+DIM = 384
+
+# Index tiers: exact flat search until the store reaches MEMORY_PROMOTE_AT vectors,
+# then an approximate index built in the background ("flat" never promotes)
+TIER = os.getenv("MEMORY_INDEX_TIER", "hnsw").lower()
+PROMOTE_AT = int(os.getenv("MEMORY_PROMOTE_AT", "20000"))
+# IVF centroids go stale as the store grows; rebuild once it has grown by this factor
+RETRAIN_GROWTH = float(os.getenv("MEMORY_RETRAIN_GROWTH", "2.0"))
+HNSW_M = int(os.getenv("MEMORY_HNSW_M", "32"))
+HNSW_EF_SEARCH = int(os.getenv("MEMORY_HNSW_EF_SEARCH", "64"))
+IVF_NPROBE = int(os.getenv("MEMORY_IVF_NPROBE", "16"))
+PQ_M = int(os.getenv("MEMORY_PQ_M", "48"))  # sub-quantizers; must divide DIM
+# Deleted vectors are tombstoned; a partition is rebuilt without them past this share (and count)
+COMPACT_RATIO = float(os.getenv("MEMORY_COMPACT_RATIO", "0.2"))
+COMPACT_MIN = int(os.getenv("MEMORY_COMPACT_MIN", "32"))
+
+TIERS = ("flat", "hnsw", "ivf", "ivfpq")
+
+# Process-wide change stamps: an index whose stamp is unchanged since the last snapshot
+# publish is carried over instead of exported again (a new index never reuses a stamp)
+_change_stamps = itertools.count(1)
+
+
+def ivf_nlist(n: int) -> int:
+    """Number of IVF lists for `n` vectors (~4·√n, the usual FAISS guideline)."""
+    return max(16, min(65536, int(4 * math.sqrt(n))))
+
+
+def build_ann(tier: str, vectors: np.ndarray, params=None, ids=None):
+    """
+    Build and fill an approximate index of the given tier over `vectors`.
+    `params` overrides the search-time knobs (efSearch, nprobe) and HNSW M / PQ m.
+    With `ids`, the index is wrapped in an IndexIDMap2 and searches return those ids.
+    """
+    params = params or {}
+    dim = vectors.shape[1]
+    if tier == "hnsw":
+        index = faiss.index_factory(dim, f"HNSW{params.get('M', HNSW_M)}")
+        index.hnsw.efConstruction = max(40, 2 * params.get("M", HNSW_M))
+    elif tier in ("ivf", "ivfpq"):
+        nlist = params.get("nlist") or ivf_nlist(len(vectors))
+        codec = "Flat" if tier == "ivf" else f"PQ{params.get('pq_m', PQ_M)}"
+        index = faiss.index_factory(dim, f"IVF{nlist},{codec}")
+        # ~64 points per centroid is plenty for k-means and keeps training fast on big stores
+        sample = vectors
+        if len(vectors) > nlist * 64:
+            rng = np.random.default_rng(0)
+            sample = vectors[rng.choice(len(vectors), nlist * 64, replace=False)]
+        index.train(sample)
+    else:
+        raise ValueError(f"Unknown index tier: {tier!r} (expected one of {', '.join(TIERS)})")
+    if ids is None:
+        index.add(vectors)
+    else:
+        index = faiss.IndexIDMap2(index)
+        index.add_with_ids(vectors, ids)
+    set_search_params(index, tier, params)
+    return index
+
+
+def set_search_params(index, tier: str, params=None):
+    params = params or {}
+    if tier == "hnsw":
+        faiss.ParameterSpace().set_index_parameter(index, "efSearch", params.get("efSearch", HNSW_EF_SEARCH))
+    elif tier in ("ivf", "ivfpq"):
+        faiss.ParameterSpace().set_index_parameter(index, "nprobe", params.get("nprobe", IVF_NPROBE))
+
+
+class TieredIndex:
+    """
+    ID-mapped FAISS index that starts exact (IndexFlatL2) and promotes itself to an
+    ANN tier (HNSW, IVF-Flat or IVF-PQ) once it holds `promote_at` live vectors.
+
+    The flat index is always kept: it holds the raw vectors used to (re)build the
+    ANN tier and serves searches until the background build has caught up. New
+    vectors are added to both. IVF tiers are rebuilt when the store has grown by
+    `retrain_growth` since their centroids were trained.
+
+    `remove` only tombstones ids (HNSW cannot delete in place); searches skip them
+    and `compact` rebuilds both tiers without them once `needs_compaction()`.
+    """
+
+    def __init__(self, dim=DIM, tier=TIER, promote_at=PROMOTE_AT, retrain_growth=RETRAIN_GROWTH,
+                 compact_ratio=COMPACT_RATIO, compact_min=COMPACT_MIN):
+        self.dim = dim
+        self.tier = tier if tier in TIERS else "flat"
+        self.promote_at = promote_at
+        self.retrain_growth = retrain_growth
+        self.compact_ratio = compact_ratio
+        self.compact_min = compact_min
+        self.flat = self._new_flat()
+        self.ann = None
+        self.trained_at = 0  # store size the current ANN index was built for
+        self.tombstones = set()
+        self._generation = 0  # bumped by reset/discard so an in-flight rebuild knows it is stale
+        self.changes = next(_change_stamps)  # restamped by every change searches can see
+        self._lock = threading.RLock()
+        self._building = False
+        self._build_stats = {"builds": 0, "last_build_seconds": None, "compactions": 0, "reclaimed": 0}
+
+    def _new_flat(self):
+        return faiss.IndexIDMap2(faiss.IndexFlatL2(self.dim))
+
+    @property
+    def ntotal(self) -> int:
+        """Live vectors (tombstoned ones excluded)."""
+        return self.flat.ntotal - len(self.tombstones)
+
+    def _snapshot(self, start, count):
+        """(vectors, ids) of flat rows [start, start + count)."""
+        vectors = faiss.downcast_index(self.flat.index).reconstruct_n(start, count)
+        ids = faiss.vector_to_array(self.flat.id_map)[start:start + count]
+        return vectors, ids
+
+    def add(self, vectors, ids=None):
+        vectors = np.ascontiguousarray(vectors, dtype="float32").reshape(-1, self.dim)
+        with self._lock:
+            if ids is None:
+                ids = np.arange(self.flat.ntotal, self.flat.ntotal + len(vectors))
+            ids = np.asarray(ids, dtype="int64")
+            self.flat.add_with_ids(vectors, ids)
+            if self.ann is not None:
+                self.ann.add_with_ids(vectors, ids)
+            self.changes = next(_change_stamps)
+        self.maybe_promote()
+
+    def remove(self, ids):
+        """Tombstone `ids`; they stop appearing in results immediately."""
+        with self._lock:
+            self.tombstones.update(int(i) for i in ids)
+            self.changes = next(_change_stamps)
+
+    def search(self, query, k):
+        query = np.ascontiguousarray(query, dtype="float32").reshape(-1, self.dim)
+        with self._lock:
+            index = self.ann if self.ann is not None else self.flat
+            dead = set(self.tombstones)
+            # At most len(dead) of the hits can be tombstoned, so over-fetch by that much
+            distances, ids = index.search(query, k + len(dead))
+        if not dead:
+            return distances, ids
+        kept_d = np.full((len(query), k), np.inf, dtype="float32")
+        kept_i = np.full((len(query), k), -1, dtype="int64")
+        for row in range(len(query)):
+            live = [j for j, i in enumerate(ids[row]) if i >= 0 and int(i) not in dead][:k]
+            kept_d[row, :len(live)], kept_i[row, :len(live)] = distances[row, live], ids[row, live]
+        return kept_d, kept_i
+
+    def reset(self):
+        with self._lock:
+            self.flat = self._new_flat()
+            self.ann, self.trained_at = None, 0
+            self.tombstones.clear()
+            self._generation += 1
+            self.changes = next(_change_stamps)
+
+    def discard(self, ids):
+        """Hard-remove `ids` from the flat index now (crash repair); the ANN tier is rebuilt if needed."""
+        ids = np.asarray(list(ids), dtype="int64")
+        if not len(ids):
+            return
+        with self._lock:
+            self.flat.remove_ids(ids)
+            self.tombstones.difference_update(int(i) for i in ids)
+            self.ann, self.trained_at = None, 0
+            self._generation += 1
+            self.changes = next(_change_stamps)
+        self.maybe_promote()
+
+    # -------------------------------
+    # Promotion and compaction
+    # -------------------------------
+    def _needs_build(self) -> bool:
+        if self.tier == "flat" or self.ntotal < self.promote_at:
+            return False
+        if self.ann is None:
+            return True
+        return self.tier != "hnsw" and self.ntotal >= self.trained_at * self.retrain_growth
+
+    def needs_compaction(self) -> bool:
+        dead = len(self.tombstones)
+        return dead >= self.compact_min and dead >= self.compact_ratio * self.flat.ntotal
+
+    def maybe_promote(self, background=True):
+        """Start an ANN (re)build if the store crossed a threshold; returns True if one started."""
+        with self._lock:
+            if self._building or not self._needs_build():
+                return False
+            self._building = True
+        if background:
+            threading.Thread(target=self._rebuild, name="memory-index-build", daemon=True).start()
+        else:
+            self._rebuild()
+        return True
+
+    def compact(self):
+        """Rebuild without tombstoned vectors (blocking); returns the number of vectors reclaimed."""
+        with self._lock:
+            if self._building or not self.tombstones:
+                return 0
+            self._building = True
+        return self._rebuild(compacting=True)
+
+    def _rebuild(self, compacting=False):
+        try:
+            started = time.perf_counter()
+            with self._lock:
+                generation, n = self._generation, self.flat.ntotal
+                vectors, ids = self._snapshot(0, n)
+                dead = set(self.tombstones) if compacting else set()
+            if dead:
+                keep = np.fromiter((int(i) not in dead for i in ids), dtype=bool, count=len(ids))
+                vectors, ids = vectors[keep], ids[keep]
+            # Slow part, runs without the lock
+            flat = None
+            if compacting:
+                flat = self._new_flat()
+                flat.add_with_ids(vectors, ids)
+            promote = self.tier != "flat" and len(ids) >= self.promote_at
+            ann = build_ann(self.tier, vectors, ids=ids) if promote or not compacting else None
+            with self._lock:
+                if self._generation != generation:  # reset/discarded meanwhile
+                    return 0
+                if self.flat.ntotal > n:  # vectors added while building
+                    extra_vectors, extra_ids = self._snapshot(n, self.flat.ntotal - n)
+                    for index in (flat, ann):
+                        if index is not None:
+                            index.add_with_ids(extra_vectors, extra_ids)
+                if compacting:
+                    self.flat = flat
+                    self.tombstones -= dead
+                    self._build_stats["compactions"] += 1
+                    self._build_stats["reclaimed"] += len(dead)
+                self.ann, self.trained_at = ann, (len(ids) if ann is not None else 0)
+                self.changes = next(_change_stamps)
+            self._build_stats["builds"] += ann is not None
+            self._build_stats["last_build_seconds"] = round(time.perf_counter() - started, 3)
+            if ann is not None and not compacting:
+                print(f"🧠 Memory index promoted to {self.tier} ({len(ids)} vectors)")
+            return len(dead)
+        except Exception as e:
+            print(f"⚠️ Warning: Memory index rebuild failed, keeping the current index - {e}")
+            return 0
+        finally:
+            with self._lock:
+                self._building = False
+
+    def ids(self):
+        """Ids of all vectors still in the index (tombstoned ones included)."""
+        with self._lock:
+            return faiss.vector_to_array(self.flat.id_map)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "tier": self.tier if self.ann is not None else "flat",
+                "configured_tier": self.tier,
+                "vectors": self.ntotal,
+                "tombstones": len(self.tombstones),
+                "trained_at": self.trained_at,
+                "building": self._building,
+                **self._build_stats,
+            }
+
+    # -------------------------------
+    # Persistence
+    # -------------------------------
+    def serialize(self) -> bytes:
+        with self._lock:
+            state = {
+                "tier": self.tier,
+                "flat": faiss.serialize_index(self.flat),
+                "trained_at": self.trained_at,
+                "tombstones": sorted(self.tombstones),
+                # An ANN index that is behind the flat one is rebuilt on load instead
+                "ann": faiss.serialize_index(self.ann) if self.ann is not None and self.ann.ntotal == self.flat.ntotal else None,
+            }
+        return pickle.dumps(state)
+
+    def export_search_index(self):
+        """
+        (faiss bytes, tier, tombstone ids) of the index searches currently use, for
+        read replicas (see memory_snapshot).
+        """
+        with self._lock:
+            if self.ann is not None:
+                return faiss.serialize_index(self.ann), self.tier, sorted(self.tombstones)
+            return faiss.serialize_index(self.flat), "flat", sorted(self.tombstones)
+
+    @classmethod
+    def deserialize(cls, data: bytes, **kwargs):
+        index = cls(**kwargs)
+        state = pickle.loads(data) if data.startswith(b"\x80") else {"flat": data, "ann": None}
+        flat = faiss.deserialize_index(np.frombuffer(state["flat"], dtype="uint8"))
+        if isinstance(flat, faiss.IndexIDMap2):
+            index.flat = flat
+        else:
+            # Positional index written before ids existed: row i gets id i
+            index.flat.add_with_ids(flat.reconstruct_n(0, flat.ntotal), np.arange(flat.ntotal))
+            return index
+        index.tombstones = set(state.get("tombstones", ()))
+        if state["ann"] is not None and state["tier"] == index.tier:
+            index.ann = faiss.deserialize_index(np.frombuffer(state["ann"], dtype="uint8"))
+            index.trained_at = state["trained_at"]
+            set_search_params(index.ann, index.tier)
+        return index
+
+
+def serialize_partitions(partitions) -> bytes:
+    """One checkpoint blob for a {namespace: TieredIndex} mapping."""
+    return pickle.dumps({"partitions": {ns: index.serialize() for ns, index in partitions.items()}})
+
+
+def read_partitions(path, default_namespace="default", **kwargs):
+    """{namespace: TieredIndex}; a single-index checkpoint becomes the default namespace."""
+    with open(path, "rb") as f:
+        data = f.read()
+    state = pickle.loads(data) if data.startswith(b"\x80") else None
+    if isinstance(state, dict) and "partitions" in state:
+        return {ns: TieredIndex.deserialize(blob, **kwargs) for ns, blob in state["partitions"].items()}
+    return {default_namespace: TieredIndex.deserialize(data, **kwargs)}
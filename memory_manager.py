@@ -1,33 +1,211 @@
-import faiss
+import atexit
+import functools
 import pickle
-import numpy as np
 import os
-import streamlit as st
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
-from langchain_huggingface import HuggingFaceEmbeddings
-import google.generativeai as genai  # 🧠 For natural rephrasing
+from bm25_index import BM25Index, reciprocal_rank_fusion, tokenize
+from embedding_cache import CachedEmbedder, get_embedding_cache
+from memory_index import TieredIndex, read_partitions, serialize_partitions
+from memory_snapshot import SNAPSHOT_DIR, publish_snapshot
+from memory_wal import WriteAheadLog, replay
+from metrics import in_context, stage
+from rate_limit import get_rate_limiter
+from transcript_preprocess import resolve_first_person
+
+try:
+    import fcntl  # single-writer lock; not available on Windows
+except ImportError:
+    fcntl = None
 
 load_dotenv()  # Load .env file (for GEMINI_API_KEY)
 
+TEXTS_PATH = "memory_texts.pkl"
+WAL_PATH = "memory.wal"
+LOCK_PATH = "memory.lock"
+
+# Durability knobs: the log is fsync'ed in batches, the full index is only rewritten at checkpoints
+WAL_FSYNC_EVERY = int(os.getenv("MEMORY_WAL_FSYNC_EVERY", "32"))
+WAL_FSYNC_INTERVAL = float(os.getenv("MEMORY_WAL_FSYNC_INTERVAL", "1.0"))
+CHECKPOINT_EVERY = int(os.getenv("MEMORY_CHECKPOINT_EVERY", "500"))
+CHECKPOINT_INTERVAL = float(os.getenv("MEMORY_CHECKPOINT_INTERVAL", "60"))
+# Texts per embedding-model call for add_many (and per index/WAL write)
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "64"))
+# Retrieval: entries returned after fusing vector and BM25 results, and candidates taken from each
+TOP_K = int(os.getenv("MEMORY_TOP_K", "3"))
+CANDIDATES = int(os.getenv("MEMORY_CANDIDATES", "20"))
+# Partition used when the caller doesn't name one (e.g. "user:riya" or "team:growth")
+DEFAULT_NAMESPACE = os.getenv("MEMORY_NAMESPACE", "default")
+
+
+def _acquire_writer_lock(path=LOCK_PATH):
+    """
+    Exclusive lock on the memory files for the lifetime of the process. A second
+    writer would overwrite the same checkpoint and log, so it fails fast instead.
+    """
+    if fcntl is None:
+        return None
+    f = open(path, "a")
+    try:
+        fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        f.close()
+        raise RuntimeError(
+            "Chat memory is already open for writing by another process. Run memory_service.py "
+            "and set MEMORY_SERVICE_URL so UI workers share it."
+        )
+    return f
+
+
+def _atomic_write(path, data: bytes):
+    """Write to a temp file, fsync, then rename over `path` so readers never see half a file."""
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
 
-# ✅ Cache heavy models so they load only once per session
-@st.cache_resource(show_spinner=False)
+
+# ✅ Cache heavy models so they load only once per process
+@functools.lru_cache(maxsize=None)
 def get_embeddings(model_name="sentence-transformers/all-MiniLM-L6-v2"):
-    """Load and cache Hugging Face embeddings model."""
+    """Load and cache Hugging Face embeddings model (imported here: torch takes seconds to load)."""
+    from langchain_huggingface import HuggingFaceEmbeddings
+
     return HuggingFaceEmbeddings(model_name=model_name)
 
 
-@st.cache_resource(show_spinner=False)
+def _read_entries(state):
+    """({id: {"text", "metadata", "namespace"}}, seq, next id) from any checkpoint layout."""
+    if isinstance(state, list):  # checkpoints written before the WAL only held the texts
+        state = {"texts": state, "metadata": [{} for _ in state], "seq": 0}
+    if "entries" not in state:  # positional layout: text i belongs to vector i
+        entries = {
+            i: {"text": text, "metadata": metadata or {}, "namespace": DEFAULT_NAMESPACE}
+            for i, (text, metadata) in enumerate(zip(state["texts"], state["metadata"]))
+        }
+        return entries, state["seq"], len(entries)
+    return state["entries"], state["seq"], state["next_id"]
+
+
 def load_faiss_memory(db_path="vector_store.faiss"):
-    """Load FAISS index and memory texts with caching."""
+    """
+    Load the last checkpoint (per-namespace FAISS partitions + memory entries) and
+    replay the write-ahead log on top of it. Returns (partitions, entries, seq, next_id,
+    replayed), where `replayed` counts the log records not yet covered by a checkpoint.
+    """
+    try:
+        partitions = read_partitions(db_path, DEFAULT_NAMESPACE)
+        with open(TEXTS_PATH, "rb") as f:
+            state = pickle.load(f)
+    except Exception:
+        # Start empty if files not found
+        partitions, state = {}, {"entries": {}, "seq": 0, "next_id": 0}
+    entries, seq, next_id = _read_entries(state)
+
+    # Crash between the index and texts renames: drop vectors the entries don't know about yet
+    for index in partitions.values():
+        index.discard([i for i in index.ids() if int(i) not in entries and int(i) not in index.tombstones])
+
+    replayed = 0
+    for record, vector in replay(WAL_PATH, after_seq=seq):
+        if record.get("op") == "delete":
+            for entry_id in record["ids"]:
+                entry = entries.pop(entry_id, None)
+                if entry:
+                    partitions[entry["namespace"]].remove([entry_id])
+        else:
+            # Records written before entry ids existed continue the positional numbering
+            entry_id = record.get("id", next_id)
+            namespace = record.get("namespace", DEFAULT_NAMESPACE)
+            entries[entry_id] = {"text": record["text"], "metadata": record.get("metadata") or {}, "namespace": namespace}
+            partitions.setdefault(namespace, TieredIndex()).add(vector, [entry_id])
+            next_id = max(next_id, entry_id + 1)
+        seq = record["seq"]
+        replayed += 1
+    if replayed:
+        print(f"🧠 Recovered {replayed} memory writes from the write-ahead log")
+    for index in partitions.values():
+        index.maybe_promote()  # no-op below MEMORY_PROMOTE_AT or when the checkpoint held the ANN tier
+    return partitions, entries, seq, next_id, replayed
+
+
+# ✅ Lazy Gemini initialization (shared by ChatMemory and the read replicas in memory_client)
+_model = None
+
+
+def _rephrase_model():
+    """Gemini model for rephrasing; the SDK is imported and configured on first use."""
+    global _model
+    if _model is None:
+        import google.generativeai as genai  # 🧠 For natural rephrasing
+
+        if os.getenv("GEMINI_API_KEY"):
+            genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
+        _model = genai.GenerativeModel("gemini-2.0-flash")
+    return _model
+
+
+def answer_from_memory(query: str, results):
+    """Pick the lines of the retrieved entries that answer `query` and rephrase them naturally."""
+    # Step 2: Extract relevant lines (sharing a content word with the query)
+    filtered_lines = []
+    query_terms = set(tokenize(query))
+    wants_deadline = "deadline" in query.lower()
+
+    for r in results:
+        for line in r.split("\n"):
+            line_lower = line.lower()
+            # Skip irrelevant headers
+            if line_lower.startswith(("meeting summary", "tasks:")):
+                continue
+            # Match words
+            if query_terms.intersection(tokenize(line)):
+                filtered_lines.append(line.strip())
+            # Smart deadline filter
+            elif wants_deadline and any(x in line_lower for x in ["(", "deadline", "by", "due"]):
+                filtered_lines.append(line.strip())
+
+    # Step 3: Fallback if no direct matches
+    if not filtered_lines:
+        for r in results:
+            for line in r.split("\n"):
+                if not line.lower().startswith(("meeting summary", "tasks:")):
+                    filtered_lines.append(line.strip())
+        if not filtered_lines:
+            return "I searched my memory but couldn’t find anything specific about that."
+
+    combined_text = "\n".join(filtered_lines[:3])
+
+    # Step 4: Rephrase naturally with Gemini (lazy-loaded)
     try:
-        index = faiss.read_index(db_path)
-        with open("memory_texts.pkl", "rb") as f:
-            texts = pickle.load(f)
-        return index, texts
+        model = _rephrase_model()
+        prompt = (
+            "You are a professional meeting assistant. Read the context below and answer the user's question "
+            "in **one short, clear, natural sentence only.** "
+            "Avoid lists, options, or restating the question.\n\n"
+            f"Question: {query}\n"
+            f"Context:\n{combined_text}"
+        )
+
+        with stage("memory_rephrase"):
+            response = get_rate_limiter().call(model.generate_content, prompt)
+        clean_reply = response.text.strip() if response.text else combined_text
+
+        # Step 5: Final cleanup
+        bad_phrases = [
+            "Option", "option", "suggestion", "example",
+            "Here are", "Here’s", "Alternative", "Let's refine"
+        ]
+        for phrase in bad_phrases:
+            if phrase in clean_reply:
+                clean_reply = clean_reply.split("\n")[0].strip()
+
+        return clean_reply.split("\n")[0].strip()  # Keep only first line
     except Exception:
-        # Create new FAISS index if files not found
-        return faiss.IndexFlatL2(384), []
+        return combined_text
 
 
 class ChatMemory:
@@ -35,120 +213,263 @@ class ChatMemory:
         # ✅ Cached resources
         self.db_path = db_path
         self.embeddings = get_embeddings(embed_model)
-        self.index, self.texts = load_faiss_memory(db_path)
+        self.embedder = CachedEmbedder(self.embeddings, embed_model, get_embedding_cache(), EMBEDDING_BATCH_SIZE)
+        # ✅ Lock the files once the model has loaded; released if they can't be opened, so a retry isn't locked out
+        self._writer_lock = _acquire_writer_lock()
+        try:
+            # ✅ One ID-mapped FAISS partition per namespace; entry ids are the FAISS ids
+            self.partitions, self.entries, self.seq, self.next_id, replayed = load_faiss_memory(db_path)
+            # ✅ Lexical index per partition (same ids); rebuilt from the entries, updated on add/delete
+            self.lexical = {}
+            self._by_meeting = {}
+            for entry_id in sorted(self.entries):
+                entry = self.entries[entry_id]
+                self.lexical.setdefault(entry["namespace"], BM25Index()).add(entry["text"], entry_id)
+                self._index_meeting(entry_id, entry["metadata"])
+            # ✅ Writes go to the append-only log; a background thread compacts and checkpoints
+            self.wal = WriteAheadLog(WAL_PATH, WAL_FSYNC_EVERY, WAL_FSYNC_INTERVAL)
+        except BaseException:
+            if self._writer_lock is not None:
+                self._writer_lock.close()
+            raise
+        self._search_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="memory-search")
+        self._lock = threading.RLock()
+        self._checkpoint_lock = threading.Lock()
+        self._unsaved = replayed  # recovered writes are checkpointed like new ones, so the log isn't replayed forever
+        self._wake = threading.Event()
+        self._closed = False
+        threading.Thread(target=self._checkpoint_loop, name="memory-checkpoint", daemon=True).start()
+        self._published_seq = None
+        self._published = None  # {"root", "path", "changes", "ids"} of the last snapshot, the base for the next
+        atexit.register(self.close)
 
-        # ✅ Lazy Gemini initialization
-        self.model = None
-        api_key = os.getenv("GEMINI_API_KEY")
-        if api_key:
-            genai.configure(api_key=api_key)
+    def _index_meeting(self, entry_id, metadata):
+        meeting_id = (metadata or {}).get("meeting_id")
+        if meeting_id:
+            self._by_meeting.setdefault(meeting_id, set()).add(entry_id)
 
-    def _save(self):
-        """Save FAISS index and memory texts."""
-        try:
-            faiss.write_index(self.index, self.db_path)
-            with open("memory_texts.pkl", "wb") as f:
-                pickle.dump(self.texts, f)
-        except Exception as e:
-            print(f"⚠️ Warning: Failed to save memory - {e}")
+    def _checkpoint_loop(self):
+        while not self._closed:
+            self._wake.wait(CHECKPOINT_INTERVAL)
+            self._wake.clear()
+            if not self._closed:
+                self.compact()
+                self.checkpoint()
 
-    def add(self, text):
-        """Add a chat message or meeting summary to memory."""
-        if not text.strip():
+    def checkpoint(self):
+        """Write the FAISS partitions and memory entries, then drop the log segment they now cover."""
+        with self._checkpoint_lock:
+            with self._lock:
+                if not self._unsaved:
+                    return
+                self.wal.rotate()
+                index_bytes = serialize_partitions(self.partitions)
+                state = {"entries": dict(self.entries), "seq": self.seq, "next_id": self.next_id}
+                unsaved, self._unsaved = self._unsaved, 0
+            try:
+                # Index first: a crash in between is repaired on load (see load_faiss_memory)
+                with stage("memory_checkpoint"):
+                    _atomic_write(self.db_path, index_bytes)
+                    _atomic_write(TEXTS_PATH, pickle.dumps(state))
+                    self.wal.discard_rotated()
+            except Exception as e:
+                with self._lock:
+                    self._unsaved += unsaved  # the rotated segment is kept and retried next time
+                print(f"⚠️ Warning: Failed to save memory - {e}")
+
+    def publish_snapshot(self, root=SNAPSHOT_DIR):
+        """
+        Publish the current state as a read-only snapshot for SnapshotReader
+        replicas (versioned by seq). Only partitions and entries changed since the
+        previous publish are written; the rest is carried over from it. Returns the
+        seq, or None if nothing changed.
+        """
+        with self._checkpoint_lock:
+            base = self._published
+            if base is not None and (base["root"] != root or not os.path.isdir(base["path"])):
+                base = None  # first publish here, or the base was removed: write everything
+            with self._lock:
+                if self.seq == self._published_seq and base is not None:
+                    return None
+                seq = self.seq
+                changes = {ns: index.changes for ns, index in self.partitions.items()}
+                partitions = {
+                    ns: None if base is not None and base["changes"].get(ns) == stamp
+                    else self.partitions[ns].export_search_index()
+                    for ns, stamp in changes.items()
+                }
+                ids = set(self.entries)
+                previous = base["ids"] if base is not None else set()
+                added = {i: self.entries[i] for i in ids - previous}
+            with stage("memory_snapshot_publish"):
+                path = publish_snapshot(root, seq, partitions, added, previous - ids,
+                                        base["path"] if base is not None else None)
+            self._published = {"root": root, "path": path, "changes": changes, "ids": ids}
+            self._published_seq = seq
+        return seq
+
+    def compact(self):
+        """
+        Rebuild partitions whose tombstones passed MEMORY_COMPACT_RATIO, reclaiming
+        their memory now and their disk space at the next checkpoint.
+        """
+        with self._lock:
+            due = [(ns, index) for ns, index in self.partitions.items() if index.needs_compaction()]
+        for namespace, index in due:
+            reclaimed = index.compact()  # slow part runs without the memory lock
+            with self._lock:
+                if self.partitions.get(namespace) is not index:
+                    continue  # cleared meanwhile
+                self.lexical[namespace].compact()
+                if not index.ntotal and not index.tombstones:
+                    del self.partitions[namespace], self.lexical[namespace]
+                self._unsaved += 1
+            print(f"🧹 Compacted memory partition '{namespace}' ({reclaimed} deleted vectors reclaimed)")
+
+    def close(self):
+        """Flush the log, write a final checkpoint and release the writer lock."""
+        if self._closed:
             return
+        self._closed = True
+        self._wake.set()
+        self.checkpoint()
+        self.wal.close()
+        if self._writer_lock is not None:
+            self._writer_lock.close()
 
-        # 🧠 Fix: replace pronouns like "I’ll" or "I'll" with the last mentioned name
-        lines = text.split("\n")
-        last_speaker = None
-        fixed_lines = []
-        for line in lines:
-            # Detect who’s speaking
-            if "→" in line or ":" in line:
-                if ":" in line:
-                    last_speaker = line.split(":")[0].strip()
-                elif "→" in line:
-                    last_speaker = line.split("→")[0].strip()
-
-            # Replace “I’ll” or “I will” with the speaker’s name
-            if last_speaker and any(word in line.lower() for word in ["i'll", "i’ll", "i will"]):
-                line = line.replace("I’ll", f"{last_speaker} will").replace("I'll", f"{last_speaker} will").replace(
-                    "I will", f"{last_speaker} will")
-
-            fixed_lines.append(line)
-
-        fixed_text = "\n".join(fixed_lines)
-
-        # Continue the usual embedding process
-        embedding = np.array(self.embeddings.embed_query(fixed_text)).astype("float32").reshape(1, -1)
-        self.index.add(embedding)
-        self.texts.append(fixed_text)
-        self._save()
-
-    def retrieve(self, query: str, top_k=3):
-        """Retrieve relevant past context and rephrase naturally."""
-        if not self.texts:
-            return "I don’t have any prior memory yet."
+    def clear(self):
+        """Forget everything: in-memory state, checkpoint files and the log."""
+        with self._checkpoint_lock, self._lock:
+            self.partitions.clear()
+            self.lexical.clear()
+            self.entries.clear()
+            self._by_meeting.clear()
+            self.seq += 1  # readers see the wipe as a new snapshot
+            self._unsaved = 0
+            self.wal.rotate()
+            self.wal.discard_rotated()
+            for path in (self.db_path, TEXTS_PATH):
+                if os.path.exists(path):
+                    os.remove(path)
+
+    def add(self, text, metadata=None, namespace=None):
+        """Add a chat message or meeting summary to memory."""
+        self.add_many([text], [metadata], namespace)
 
-        # Step 1: Search FAISS for top-k results
-        query_vector = np.array(self.embeddings.embed_query(query)).astype("float32").reshape(1, -1)
-        distances, indices = self.index.search(query_vector, top_k)
-        results = [self.texts[i] for i in indices[0] if i < len(self.texts)]
-        results = list(dict.fromkeys(results))  # Remove duplicates
+    def add_many(self, texts, metadatas=None, namespace=None):
+        """
+        Bulk ingestion: texts are embedded EMBEDDING_BATCH_SIZE at a time (cached
+        texts are not re-embedded) and each batch is written with one index add.
+        Returns the number of entries stored.
+        """
+        namespace = namespace or DEFAULT_NAMESPACE
+        metadatas = metadatas or [None] * len(texts)
+        # 🧠 Fix: replace pronouns like "I’ll" or "I'll" with the speaker's name
+        entries = [(resolve_first_person(text), metadata) for text, metadata in zip(texts, metadatas) if text.strip()]
 
-        # Step 2: Extract relevant lines
-        filtered_lines = []
-        query_words = query.lower().split()
+        for start in range(0, len(entries), EMBEDDING_BATCH_SIZE):
+            batch = entries[start:start + EMBEDDING_BATCH_SIZE]
+            embeddings = self.embedder.embed([text for text, _ in batch])
+            with self._lock:
+                ids = list(range(self.next_id, self.next_id + len(batch)))
+                self.next_id += len(batch)
+                self.partitions.setdefault(namespace, TieredIndex()).add(embeddings, ids)
+                lexical = self.lexical.setdefault(namespace, BM25Index())
+                for entry_id, (text, metadata), embedding in zip(ids, batch, embeddings):
+                    self.seq += 1
+                    self.entries[entry_id] = {"text": text, "metadata": metadata or {}, "namespace": namespace}
+                    lexical.add(text, entry_id)
+                    self._index_meeting(entry_id, metadata)
+                    self.wal.append({"seq": self.seq, "op": "add", "id": entry_id, "namespace": namespace,
+                                     "text": text, "metadata": metadata}, embedding)
+                self._unsaved += len(batch)
+                if self._unsaved >= CHECKPOINT_EVERY:
+                    self._wake.set()
+        return len(entries)
 
-        for r in results:
-            for line in r.split("\n"):
-                line_lower = line.lower()
-                # Skip irrelevant headers
-                if line_lower.startswith(("meeting summary", "tasks:")):
-                    continue
-                # Match words
-                if any(word in line_lower for word in query_words):
-                    filtered_lines.append(line.strip())
-                # Smart deadline filter
-                if "deadline" in query.lower() and any(x in line_lower for x in ["(", "deadline", "by", "due"]):
-                    if line not in filtered_lines:
-                        filtered_lines.append(line.strip())
+    def delete(self, ids):
+        """
+        Forget entries. They disappear from search immediately (tombstones); their
+        vectors are reclaimed by background compaction. Returns the number deleted.
+        """
+        with self._lock:
+            ids = [entry_id for entry_id in dict.fromkeys(ids) if entry_id in self.entries]
+            if not ids:
+                return 0
+            self.seq += 1
+            self.wal.append({"seq": self.seq, "op": "delete", "ids": ids})
+            for entry_id in ids:
+                entry = self.entries.pop(entry_id)
+                self.partitions[entry["namespace"]].remove([entry_id])
+                self.lexical[entry["namespace"]].remove(entry_id)
+                self._by_meeting.get(entry["metadata"].get("meeting_id"), set()).discard(entry_id)
+            self._unsaved += 1
+            if any(index.needs_compaction() for index in self.partitions.values()):
+                self._wake.set()
+        return len(ids)
 
-        # Step 3: Fallback if no direct matches
-        if not filtered_lines:
-            for r in results:
-                for line in r.split("\n"):
-                    if not line.lower().startswith(("meeting summary", "tasks:")):
-                        filtered_lines.append(line.strip())
-            if not filtered_lines:
-                return "I searched my memory but couldn’t find anything specific about that."
+    def delete_meeting(self, meeting_id, namespace=None):
+        """Forget every entry saved for one meeting (optionally only in one namespace)."""
+        with self._lock:
+            ids = [entry_id for entry_id in self._by_meeting.get(meeting_id, ())
+                   if namespace is None or self.entries[entry_id]["namespace"] == namespace]
+        return self.delete(ids)
 
-        combined_text = "\n".join(filtered_lines[:3])
+    def meetings(self, namespace=None):
+        """[(meeting_id, first line of its entry)] for meetings still in memory, newest first."""
+        namespace = namespace or DEFAULT_NAMESPACE
+        with self._lock:
+            found = [(max(ids), meeting_id) for meeting_id, ids in self._by_meeting.items() if ids]
+            return [(meeting_id, self.entries[entry_id]["text"].split("\n")[0])
+                    for entry_id, meeting_id in sorted(found, reverse=True)
+                    if self.entries[entry_id]["namespace"] == namespace]
 
-        # Step 4: Rephrase naturally with Gemini (lazy-loaded)
-        try:
-            if self.model is None:
-                self.model = genai.GenerativeModel("gemini-2.0-flash")
-
-            prompt = (
-                "You are a professional meeting assistant. Read the context below and answer the user's question "
-                "in **one short, clear, natural sentence only.** "
-                "Avoid lists, options, or restating the question.\n\n"
-                f"Question: {query}\n"
-                f"Context:\n{combined_text}"
-            )
-
-            response = self.model.generate_content(prompt)
-            clean_reply = response.text.strip() if response.text else combined_text
-
-            # Step 5: Final cleanup
-            bad_phrases = [
-                "Option", "option", "suggestion", "example",
-                "Here are", "Here’s", "Alternative", "Let's refine"
-            ]
-            for phrase in bad_phrases:
-                if phrase in clean_reply:
-                    clean_reply = clean_reply.split("\n")[0].strip()
-
-            return clean_reply.split("\n")[0].strip()  # Keep only first line
-        except Exception:
-            return combined_text
+    def stats(self):
+        """Per-partition index tier/tombstones and embedding throughput / cache hit rate."""
+        with self._lock:
+            partitions = {ns: index.stats() for ns, index in self.partitions.items()}
+        return {"entries": len(self.entries), "partitions": partitions, "embeddings": self.embedder.stats()}
+
+    def warm_up(self):
+        """Run one embedding and search so the model's and indexes' first-call costs are paid up front."""
+        self.embedder.embed_one("warm up")
+        self.search("warm up")
+
+    def _vector_search(self, query, depth, namespaces):
+        query_vector = self.embedder.embed_one(query)
+        with self._lock:
+            indexes = [self.partitions[ns] for ns in namespaces if ns in self.partitions]
+        hits = []
+        with stage("vector_search"):
+            for index in indexes:
+                distances, ids = index.search(query_vector, depth)
+                hits.extend((float(d), int(i)) for d, i in zip(distances[0], ids[0]) if i >= 0)
+        return [entry_id for _, entry_id in sorted(hits)[:depth]]
+
+    def search(self, query: str, top_k=None, namespaces=None):
+        """
+        Hybrid search over the caller's partitions only: vector (FAISS) and lexical
+        (BM25) candidates are fetched in parallel and merged with reciprocal rank
+        fusion. Returns entry ids, best first.
+        """
+        namespaces = [namespaces] if isinstance(namespaces, str) else (namespaces or [DEFAULT_NAMESPACE])
+        depth = max(top_k or TOP_K, CANDIDATES)
+        vector_ids = self._search_pool.submit(in_context(self._vector_search), query, depth, namespaces)
+        with self._lock:
+            lexical_indexes = [self.lexical[ns] for ns in namespaces if ns in self.lexical]
+        with stage("lexical_search"):
+            lexical = sorted((hit for index in lexical_indexes for hit in index.search(query, depth)),
+                             key=lambda hit: hit[1], reverse=True)
+        lexical_ids = [doc_id for doc_id, _ in lexical[:depth]]
+        return reciprocal_rank_fusion([vector_ids.result(), lexical_ids], top_k or TOP_K)
+
+    def retrieve(self, query: str, top_k=None, namespaces=None):
+        """Retrieve relevant past context and rephrase naturally."""
+        if not self.entries:
+            return "I don’t have any prior memory yet."
+
+        # Step 1: Hybrid search for top-k results
+        ids = self.search(query, top_k, namespaces)
+        results = list(dict.fromkeys(self.entries[i]["text"] for i in ids if i in self.entries))  # Remove duplicates
+
+        return answer_from_memory(query, results)
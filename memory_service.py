@@ -0,0 +1,109 @@
+"""
+Single-writer chat memory service.
+
+Owns the only ChatMemory (FAISS partitions, entries, write-ahead log) and publishes
+versioned read-only snapshots to MEMORY_SNAPSHOT_DIR. UI workers started with
+MEMORY_SERVICE_URL send their writes here and search the snapshots themselves
+(memory_client.RemoteChatMemory), so any number of them can run side by side.
+
+    python memory_service.py            # or: uvicorn memory_service:app --port 8001
+"""
+import asyncio
+import os
+import threading
+from fastapi import FastAPI, Request
+from fastapi.responses import PlainTextResponse
+import metrics
+from memory_manager import ChatMemory
+from memory_snapshot import SNAPSHOT_DIR
+
+# Writes are batched into one snapshot per interval instead of one per write
+SNAPSHOT_INTERVAL = float(os.getenv("MEMORY_SNAPSHOT_INTERVAL", "1.0"))
+SERVICE_HOST = os.getenv("MEMORY_SERVICE_HOST", "127.0.0.1")
+SERVICE_PORT = int(os.getenv("MEMORY_SERVICE_PORT", "8001"))
+
+app = FastAPI(title="Meeting-to-Action Memory Service")
+memory = None
+_dirty = threading.Event()
+
+
+def _publish_loop():
+    while True:
+        _dirty.wait()
+        _dirty.clear()
+        try:
+            memory.publish_snapshot(SNAPSHOT_DIR)
+        except Exception as e:
+            print(f"⚠️ Warning: Failed to publish memory snapshot - {e}")
+            _dirty.set()
+        threading.Event().wait(SNAPSHOT_INTERVAL)
+
+
+@app.on_event("startup")
+def startup():
+    global memory
+    memory = ChatMemory()
+    memory.publish_snapshot(SNAPSHOT_DIR)  # readers can start before the first write
+    metrics.register_collector("memory", memory.stats)
+    threading.Thread(target=_publish_loop, name="memory-snapshot", daemon=True).start()
+
+
+def _written():
+    """Schedule a snapshot; the returned seq lets the writer wait until its write is visible."""
+    _dirty.set()
+    return {"seq": memory.seq}
+
+
+@app.get("/")
+def root():
+    return {"message": "Memory service is running ✅", "seq": memory.seq}
+
+
+@app.post("/add")
+async def add(request: Request):
+    """{"texts": [...], "metadatas": [...], "namespace": ...} -> {"added", "seq"}"""
+    data = await request.json()
+    try:
+        # Embedding runs the model: keep it off the event loop so other requests aren't stalled
+        added = await asyncio.to_thread(memory.add_many, data.get("texts", []), data.get("metadatas"),
+                                        data.get("namespace"))
+    except Exception as e:
+        return {"error": str(e)}
+    return {"added": added, **_written()}
+
+
+@app.post("/delete_meeting")
+async def delete_meeting(request: Request):
+    data = await request.json()
+    deleted = await asyncio.to_thread(memory.delete_meeting, data.get("meeting_id"), data.get("namespace"))
+    return {"deleted": deleted, **_written()}
+
+
+@app.post("/clear")
+def clear():
+    memory.clear()
+    return _written()
+
+
+@app.post("/snapshot")
+def snapshot():
+    """Publish now (e.g. before starting readers) instead of waiting for the interval."""
+    memory.publish_snapshot(SNAPSHOT_DIR)
+    return {"seq": memory.seq}
+
+
+@app.get("/stats")
+def stats():
+    return memory.stats()
+
+
+@app.get("/metrics")
+def prometheus_metrics():
+    """Embedding, checkpoint and snapshot timings plus memory stats, in Prometheus text format."""
+    return PlainTextResponse(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    uvicorn.run(app, host=SERVICE_HOST, port=SERVICE_PORT)
@@ -0,0 +1,264 @@
+import json
+import os
+import shutil
+import sqlite3
+import threading
+import time
+import faiss
+import numpy as np
+from bm25_index import tokenize
+from memory_index import set_search_params
+
+# Versioned read snapshots published by the memory service:
+#   <root>/CURRENT                 -> "v0000000042" (swapped atomically)
+#   <root>/v0000000042/manifest.json, p0.faiss, p1.faiss, ..., entries.sqlite
+SNAPSHOT_DIR = os.getenv("MEMORY_SNAPSHOT_DIR", "memory_snapshots")
+KEEP_SNAPSHOTS = int(os.getenv("MEMORY_KEEP_SNAPSHOTS", "3"))
+# Read-only memory maps: every reader process shares the page cache instead of holding its own copy.
+# IVF inverted lists are mapped by IO_FLAG_MMAP; flat codes and HNSW need IO_FLAG_MMAP_IFC (newer faiss),
+# and faiss refuses the two together on IVF indexes.
+IVF_MMAP_FLAGS = faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY
+CODES_MMAP_FLAGS = getattr(faiss, "IO_FLAG_MMAP_IFC", faiss.IO_FLAG_MMAP) | faiss.IO_FLAG_READ_ONLY
+
+
+def mmap_flags(tier: str) -> int:
+    return IVF_MMAP_FLAGS if tier in ("ivf", "ivfpq") else CODES_MMAP_FLAGS
+
+
+def _fsync_write(path, data: bytes):
+    with open(path, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def _fsync_dir(path):
+    if hasattr(os, "O_DIRECTORY"):
+        fd = os.open(path, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+
+def _write_entries(path, added, removed=()):
+    """
+    Entries table plus an FTS5 index (BM25 ranking) that readers query in place.
+    Creates the file, or patches a copy of the previous snapshot's with the entries
+    added and removed since.
+    """
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS entries (id INTEGER PRIMARY KEY, namespace TEXT NOT NULL, text TEXT NOT NULL,"
+        " metadata TEXT NOT NULL, meeting_id TEXT)"
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS entries_meeting ON entries(namespace, meeting_id)")
+    conn.execute("CREATE VIRTUAL TABLE IF NOT EXISTS entries_fts USING fts5(text, namespace UNINDEXED)")
+    removed = [(int(entry_id),) for entry_id in removed]
+    conn.executemany("DELETE FROM entries WHERE id = ?", removed)
+    conn.executemany("DELETE FROM entries_fts WHERE rowid = ?", removed)
+    rows = [(entry_id, e["namespace"], e["text"], json.dumps(e["metadata"]), e["metadata"].get("meeting_id"))
+            for entry_id, e in added.items()]
+    conn.executemany("INSERT INTO entries VALUES (?, ?, ?, ?, ?)", rows)
+    conn.executemany("INSERT INTO entries_fts (rowid, text, namespace) VALUES (?, ?, ?)",
+                     [(row[0], row[2], row[1]) for row in rows])
+    conn.commit()
+    conn.close()
+    with open(path, "rb+") as f:  # a carried-over copy may not have been written by SQLite at all
+        os.fsync(f.fileno())
+
+
+def _link_or_copy(source, target):
+    """Snapshot files are never modified once published, so versions can share them."""
+    try:
+        os.link(source, target)
+    except OSError:
+        shutil.copyfile(source, target)
+
+
+def _versions(root):
+    return sorted(d for d in os.listdir(root) if d.startswith("v"))
+
+
+def publish_snapshot(root, seq: int, partitions, added, removed=(), base=None, keep=KEEP_SNAPSHOTS):
+    """
+    Write the memory state as of write `seq` as the next snapshot version and point
+    CURRENT at it. The directory is fully written and fsync'ed under a temporary name,
+    renamed into place, and only then does CURRENT change, so readers never see a
+    partial snapshot.
+
+    Publishing is incremental against `base`, the previous snapshot's directory:
+    - `partitions` is {namespace: (faiss bytes, tier, tombstone ids)} for changed
+      partitions and {namespace: None} for unchanged ones, which are hard-linked
+      from `base` (namespaces left out are dropped)
+    - `added` / `removed` are the entries changed since `base`; entries.sqlite is a
+      plain file copy of the base's, patched with them (FTS is not rebuilt)
+    Without a base every partition must be given and `added` holds every entry.
+    A changed partition is still exported whole, and the entries copy grows with
+    the memory, so MEMORY_SNAPSHOT_INTERVAL should grow with very large memories.
+    """
+    os.makedirs(root, exist_ok=True)
+    existing = _versions(root)
+    version = int(existing[-1][1:]) + 1 if existing else 1
+    name = f"v{version:010d}"
+    final = os.path.join(root, name)
+    tmp = os.path.join(root, f".{name}.tmp")
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+
+    base_parts = {}
+    if base is not None:
+        with open(os.path.join(base, "manifest.json")) as f:
+            base_parts = json.load(f)["partitions"]
+
+    manifest = {"version": version, "seq": seq, "created": time.time(), "partitions": {}}
+    for i, (namespace, part) in enumerate(sorted(partitions.items())):
+        file = f"p{i}.faiss"
+        if part is None:
+            _link_or_copy(os.path.join(base, base_parts[namespace]["file"]), os.path.join(tmp, file))
+            manifest["partitions"][namespace] = dict(base_parts[namespace], file=file)
+            continue
+        index_bytes, tier, tombstones = part
+        _fsync_write(os.path.join(tmp, file), np.asarray(index_bytes).tobytes())
+        manifest["partitions"][namespace] = {"file": file, "tier": tier, "tombstones": tombstones}
+    if base is not None:
+        shutil.copyfile(os.path.join(base, "entries.sqlite"), os.path.join(tmp, "entries.sqlite"))
+    _write_entries(os.path.join(tmp, "entries.sqlite"), added, removed)
+    _fsync_write(os.path.join(tmp, "manifest.json"), json.dumps(manifest).encode("utf-8"))
+    _fsync_dir(tmp)
+    os.rename(tmp, final)
+
+    current_tmp = os.path.join(root, "CURRENT.tmp")
+    _fsync_write(current_tmp, name.encode("utf-8"))
+    os.replace(current_tmp, os.path.join(root, "CURRENT"))
+    _fsync_dir(root)
+
+    # Old versions can go: readers that still map them keep working (unlinked files stay
+    # readable on POSIX) and switch on their next refresh
+    for old in _versions(root)[:-keep]:
+        shutil.rmtree(os.path.join(root, old), ignore_errors=True)
+    return final
+
+
+class Snapshot:
+    """One published version, opened read-only: mmapped FAISS partitions + immutable SQLite entries."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, "manifest.json")) as f:
+            manifest = json.load(f)
+        self.version = manifest["version"]
+        self.seq = manifest["seq"]
+        self.indexes, self.tombstones = {}, {}
+        for namespace, part in manifest["partitions"].items():
+            index = faiss.read_index(os.path.join(path, part["file"]), mmap_flags(part["tier"]))
+            set_search_params(index, part["tier"])
+            self.indexes[namespace] = index
+            self.tombstones[namespace] = set(part["tombstones"])
+        uri = f"file:{os.path.abspath(os.path.join(path, 'entries.sqlite'))}?mode=ro&immutable=1"
+        self._conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+
+    def vector_search(self, query_vector, depth, namespaces):
+        """[(distance, entry id)] across `namespaces`, nearest first, deleted entries skipped."""
+        hits = []
+        for namespace in namespaces:
+            index = self.indexes.get(namespace)
+            if index is None:
+                continue
+            dead = self.tombstones[namespace]
+            distances, ids = index.search(np.asarray(query_vector, dtype="float32").reshape(1, -1), depth + len(dead))
+            hits.extend((float(d), int(i)) for d, i in zip(distances[0], ids[0]) if i >= 0 and int(i) not in dead)
+        return sorted(hits)[:depth]
+
+    def lexical_search(self, query, depth, namespaces):
+        """[(entry id, score)] from the FTS5 BM25 index, best first."""
+        terms = tokenize(query)
+        if not terms or not namespaces:
+            return []
+        match = " OR ".join('"' + term.replace('"', "") + '"' for term in terms)
+        rows = self._conn.execute(
+            f"SELECT rowid, -bm25(entries_fts) FROM entries_fts WHERE entries_fts MATCH ?"
+            f" AND namespace IN ({','.join('?' * len(namespaces))}) ORDER BY bm25(entries_fts) LIMIT ?",
+            (match, *namespaces, depth),
+        ).fetchall()
+        return [(int(rowid), score) for rowid, score in rows]
+
+    def texts(self, ids):
+        """{entry id: text} for the ids that exist."""
+        if not ids:
+            return {}
+        rows = self._conn.execute(
+            f"SELECT id, text FROM entries WHERE id IN ({','.join('?' * len(ids))})", list(ids)
+        ).fetchall()
+        return dict(rows)
+
+    def count(self):
+        return self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def meetings(self, namespace):
+        """[(meeting_id, first line of its entry)], newest first."""
+        rows = self._conn.execute(
+            "SELECT meeting_id, text FROM entries WHERE namespace = ? AND meeting_id IS NOT NULL"
+            " AND id IN (SELECT MAX(id) FROM entries WHERE namespace = ? GROUP BY meeting_id) ORDER BY id DESC",
+            (namespace, namespace),
+        ).fetchall()
+        return [(meeting_id, text.split("\n")[0]) for meeting_id, text in rows]
+
+    def close(self):
+        self._conn.close()
+
+
+class SnapshotReader:
+    """
+    Read replica of the memory store. Checks CURRENT at most every
+    `check_interval` seconds and switches to a newer snapshot when one is
+    published; the previous one is closed when the last search using it drops it.
+    """
+
+    def __init__(self, root=SNAPSHOT_DIR, check_interval=1.0):
+        self.root = root
+        self.check_interval = check_interval
+        self._snapshot = None
+        self._checked = 0.0
+        self._lock = threading.Lock()
+        self._stats = {"reloads": 0}
+
+    def _current_name(self):
+        try:
+            with open(os.path.join(self.root, "CURRENT")) as f:
+                return f.read().strip()
+        except FileNotFoundError:
+            return None
+
+    def refresh(self, force=False):
+        """Switch to the newest published snapshot; returns it (None if nothing is published yet)."""
+        now = time.monotonic()
+        if not force and now - self._checked < self.check_interval:
+            return self._snapshot
+        with self._lock:
+            self._checked = now
+            name = self._current_name()
+            if name and (self._snapshot is None or os.path.basename(self._snapshot.path) != name):
+                try:
+                    self._snapshot = Snapshot(os.path.join(self.root, name))
+                    self._stats["reloads"] += 1
+                except (OSError, RuntimeError, sqlite3.Error) as e:
+                    # Garbage-collected between reading CURRENT and opening it; retry next time
+                    print(f"⚠️ Warning: Could not open memory snapshot {name} - {e}")
+        return self._snapshot
+
+    def wait_for(self, seq, timeout=5.0):
+        """Block until a snapshot that includes write `seq` is visible (read-your-writes)."""
+        deadline = time.monotonic() + timeout
+        while True:
+            snapshot = self.refresh(force=True)
+            if snapshot is not None and snapshot.seq >= seq:
+                return True
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.05)
+
+    def stats(self):
+        snapshot = self._snapshot
+        return {**self._stats, "version": snapshot.version if snapshot else None,
+                "seq": snapshot.seq if snapshot else None}
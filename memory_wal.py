@@ -0,0 +1,123 @@
+import json
+import os
+import struct
+import threading
+import time
+import zlib
+import numpy as np
+
+# Record = <payload length><crc32(payload)> payload
+# payload = <vector dim><float32 vector><JSON: seq, op, text, metadata, ...>
+HEADER = struct.Struct("<II")
+DIM = struct.Struct("<I")
+
+
+class WriteAheadLog:
+    """
+    Append-only log of memory writes.
+    Appends go to a buffered file and are fsync'ed in batches: after `fsync_every`
+    records or `fsync_interval` seconds, whichever comes first (a background thread
+    handles the time-based flush). A checkpoint calls `rotate()` to start a fresh
+    segment and `discard_rotated()` once the checkpoint is durable.
+    """
+
+    def __init__(self, path="memory.wal", fsync_every=32, fsync_interval=1.0):
+        self.path = path
+        self.rotated_path = path + ".old"
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self._lock = threading.Lock()
+        # Cut off a torn tail left by a crash so new records are not appended after garbage
+        valid_end = 0
+        for _, _, valid_end in _iter_records(path):
+            pass
+        if os.path.exists(path) and os.path.getsize(path) > valid_end:
+            os.truncate(path, valid_end)
+        self._file = open(path, "ab")
+        self._pending = 0
+        self._closed = False
+        self._flusher = threading.Thread(target=self._flush_loop, name="memory-wal-fsync", daemon=True)
+        self._flusher.start()
+
+    def append(self, record: dict, vector=None):
+        vector = np.zeros(0, dtype="float32") if vector is None else np.asarray(vector, dtype="float32").ravel()
+        payload = DIM.pack(vector.size) + vector.tobytes() + json.dumps(record).encode("utf-8")
+        with self._lock:
+            self._file.write(HEADER.pack(len(payload), zlib.crc32(payload)) + payload)
+            self._pending += 1
+            if self._pending >= self.fsync_every:
+                self._sync()
+
+    def _sync(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._pending = 0
+
+    def flush(self):
+        with self._lock:
+            if self._pending and not self._closed:
+                self._sync()
+
+    def _flush_loop(self):
+        while not self._closed:
+            time.sleep(self.fsync_interval)
+            self.flush()
+
+    def rotate(self):
+        """Move the current segment aside so a checkpoint can cover it; appends continue in a new file."""
+        with self._lock:
+            self._sync()
+            self._file.close()
+            if os.path.exists(self.rotated_path):
+                # A previous checkpoint failed; keep both segments by appending
+                with open(self.rotated_path, "ab") as old, open(self.path, "rb") as current:
+                    old.write(current.read())
+                os.remove(self.path)
+            else:
+                os.replace(self.path, self.rotated_path)
+            self._file = open(self.path, "ab")
+
+    def discard_rotated(self):
+        if os.path.exists(self.rotated_path):
+            os.remove(self.rotated_path)
+
+    def close(self):
+        with self._lock:
+            if not self._closed:
+                self._sync()
+                self._file.close()
+                self._closed = True
+
+
+def _iter_records(path):
+    """Yield (record, vector, end offset); stops at the first torn or corrupt record."""
+    if not os.path.exists(path):
+        return
+    with open(path, "rb") as f:
+        data = f.read()
+    pos = 0
+    while pos + HEADER.size <= len(data):
+        length, crc = HEADER.unpack_from(data, pos)
+        payload = data[pos + HEADER.size:pos + HEADER.size + length]
+        if len(payload) < length or zlib.crc32(payload) != crc:
+            print(f"⚠️ Warning: Ignoring torn record at byte {pos} of {path}")
+            return
+        (dim,) = DIM.unpack_from(payload)
+        vector = np.frombuffer(payload, dtype="float32", count=dim, offset=DIM.size)
+        record = json.loads(payload[DIM.size + dim * 4:].decode("utf-8"))
+        pos += HEADER.size + length
+        yield record, vector, pos
+
+
+def read_log(path):
+    """Yield (record, vector) from a log segment in write order, ignoring a torn tail."""
+    for record, vector, _ in _iter_records(path):
+        yield record, vector
+
+
+def replay(path, after_seq=0):
+    """Records newer than `after_seq` from the rotated and current segments, in order."""
+    for segment in (path + ".old", path):
+        for record, vector in read_log(segment):
+            if record.get("seq", 0) > after_seq:
+                yield record, vector
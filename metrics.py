@@ -0,0 +1,264 @@
+"""
+Lightweight in-process metrics: per-stage latency histograms, counters, gauges
+collected from the existing *_stats() functions, and per-request timing
+breakdowns. Rendered in the Prometheus text format (GET /metrics on the backend
+and the memory service; METRICS_PORT serves it from the Streamlit process).
+
+    with stage("embed"):            # histogram mta_stage_seconds{stage="embed"}
+        ...
+    with trace() as timings:        # {"embed": 0.012, ...} for everything timed inside
+        ...
+"""
+import contextlib
+import contextvars
+import functools
+import inspect
+import math
+import os
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+PREFIX = "mta_"
+# Seconds; covers a sub-millisecond BM25 lookup up to a slow model call
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_lock = threading.Lock()
+_histograms = {}  # name -> {"buckets", "series": {labels: [bucket counts, sum, count]}}
+_counters = {}  # name -> {"series": {labels: value}}
+_collectors = []  # (section, fn returning a stats dict)
+_help = {
+    "stage_seconds": "Time spent in each pipeline stage",
+    "http_request_seconds": "HTTP request latency until the response starts",
+    "llm_tokens_total": "Model tokens, by direction (prompt/reply)",
+    "calendar_events_total": "Calendar events synced, by result (created/updated/error)",
+}
+_trace = contextvars.ContextVar("metrics_trace", default=None)
+
+
+def _labels(labels: dict):
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def observe(name: str, value: float, **labels):
+    """Record one observation in histogram `name`."""
+    key = _labels(labels)
+    with _lock:
+        histogram = _histograms.setdefault(name, {"buckets": BUCKETS, "series": {}})
+        series = histogram["series"].get(key)
+        if series is None:
+            series = histogram["series"][key] = [[0] * len(histogram["buckets"]), 0.0, 0]
+        for i, bound in enumerate(histogram["buckets"]):
+            if value <= bound:
+                series[0][i] += 1
+        series[1] += value
+        series[2] += 1
+
+
+def inc(name: str, amount=1, **labels):
+    """Add to counter `name`."""
+    key = _labels(labels)
+    with _lock:
+        series = _counters.setdefault(name, {"series": {}})["series"]
+        series[key] = series.get(key, 0) + amount
+
+
+def register_collector(section: str, fn):
+    """
+    Export `fn()` (a stats dict like extraction_stats()) as gauges named
+    mta_<section>_<key> on every scrape; nested dicts extend the name and
+    non-numeric values are skipped. Re-registering a section replaces it.
+    """
+    with _lock:
+        _collectors[:] = [(s, f) for s, f in _collectors if s != section]
+        _collectors.append((section, fn))
+
+
+# ---------------------
+# ⏱️ Stages and traces
+# ---------------------
+@contextlib.contextmanager
+def stage(name: str):
+    """Time a block into mta_stage_seconds{stage=name} and the current trace, if any."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        observe("stage_seconds", elapsed, stage=name)
+        timings = _trace.get()
+        if timings is not None:
+            timings[name] = timings.get(name, 0.0) + elapsed
+
+
+def timed(name: str):
+    """Decorator form of `stage` for plain and async functions."""
+    def decorate(fn):
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with stage(name):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with stage(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+@contextlib.contextmanager
+def trace():
+    """
+    Collect {stage: seconds} for every stage run inside the block, including in
+    asyncio tasks and asyncio.to_thread calls started from it (other threads need
+    `in_context`). Stages that overlap, e.g. parallel chunks, are summed, so the
+    breakdown can add up to more than `total`.
+    """
+    timings = {}
+    token = _trace.set(timings)
+    started = time.perf_counter()
+    try:
+        yield timings
+    finally:
+        timings["total"] = time.perf_counter() - started
+        _trace.reset(token)
+
+
+def in_context(fn):
+    """Bind `fn` to the caller's trace, for handing work to a thread pool."""
+    return functools.partial(contextvars.copy_context().run, fn)
+
+
+def rounded(timings: dict, digits=4):
+    return {name: round(seconds, digits) for name, seconds in timings.items()}
+
+
+def summary(name="stage_seconds", label="stage"):
+    """{label value: {"count", "seconds", "mean_ms"}} for histogram `name` (e.g. for benchmark reports)."""
+    with _lock:
+        series = dict(_histograms.get(name, {}).get("series", {}))
+    out = {}
+    for labels, (_, total, count) in sorted(series.items()):
+        key = dict(labels).get(label, ",".join(f"{k}={v}" for k, v in labels))
+        out[key] = {"count": count, "seconds": round(total, 4), "mean_ms": round(total / count * 1000, 3)}
+    return out
+
+
+def reset():
+    """Forget all histograms and counters (collectors stay registered)."""
+    with _lock:
+        _histograms.clear()
+        _counters.clear()
+
+
+def record_tokens(prompt_tokens, reply_tokens, backend: str):
+    if prompt_tokens:
+        inc("llm_tokens_total", prompt_tokens, direction="prompt", backend=backend)
+    if reply_tokens:
+        inc("llm_tokens_total", reply_tokens, direction="reply", backend=backend)
+
+
+# ---------------------
+# 📤 Prometheus text format
+# ---------------------
+def _metric_name(*parts) -> str:
+    return PREFIX + re.sub(r"[^a-zA-Z0-9_]", "_", "_".join(parts)).lower()
+
+
+def _format_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in pairs)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+
+def _format_value(value) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(int(value))
+
+
+def _gauges(prefix, stats, out):
+    for key, value in stats.items():
+        if isinstance(value, dict):
+            _gauges(f"{prefix}_{key}", value, out)
+        elif isinstance(value, (int, float)):
+            out.append((_metric_name(prefix, str(key)), value))
+
+
+def render() -> str:
+    """All metrics in the Prometheus text exposition format (version 0.0.4)."""
+    lines = []
+    with _lock:
+        histograms = {name: (h["buckets"], {k: (list(s[0]), s[1], s[2]) for k, s in h["series"].items()})
+                      for name, h in _histograms.items()}
+        counters = {name: dict(c["series"]) for name, c in _counters.items()}
+        collectors = list(_collectors)
+
+    for name, (buckets, series) in sorted(histograms.items()):
+        full = _metric_name(name)
+        lines += [f"# HELP {full} {_help.get(name, name)}", f"# TYPE {full} histogram"]
+        for labels, (counts, total, count) in sorted(series.items()):
+            for bound, bucket_count in zip(buckets, counts):
+                lines.append(f"{full}_bucket{_format_labels(labels, [('le', bound)])} {bucket_count}")
+            lines.append(f"{full}_bucket{_format_labels(labels, [('le', '+Inf')])} {count}")
+            lines.append(f"{full}_sum{_format_labels(labels)} {_format_value(total)}")
+            lines.append(f"{full}_count{_format_labels(labels)} {count}")
+
+    for name, series in sorted(counters.items()):
+        full = _metric_name(name)
+        lines += [f"# HELP {full} {_help.get(name, name)}", f"# TYPE {full} counter"]
+        lines += [f"{full}{_format_labels(labels)} {_format_value(value)}" for labels, value in sorted(series.items())]
+
+    for section, fn in collectors:
+        try:
+            gauges = []
+            _gauges(section, fn(), gauges)
+        except Exception as e:
+            print(f"⚠️ Warning: Metrics collector '{section}' failed - {e}")
+            continue
+        for full, value in gauges:
+            lines += [f"# TYPE {full} gauge", f"{full} {_format_value(value)}"]
+    return "\n".join(lines) + "\n"
+
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+_server = None
+
+
+def serve_metrics(port=None):
+    """
+    Serve /metrics on `port` (default METRICS_PORT) from a background thread, for
+    processes without their own HTTP API such as the Streamlit UI. No-op without
+    a port or when already serving.
+    """
+    global _server
+    port = int(port or os.getenv("METRICS_PORT") or 0)
+    if not port or _server is not None:
+        return _server
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            body = render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    try:
+        _server = ThreadingHTTPServer(("0.0.0.0", port), Handler)
+    except OSError as e:
+        print(f"⚠️ Warning: Could not serve metrics on port {port} - {e}")
+        return None
+    threading.Thread(target=_server.serve_forever, name="metrics", daemon=True).start()
+    return _server
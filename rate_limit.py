@@ -0,0 +1,176 @@
+import asyncio
+import os
+import random
+import threading
+import time
+from transcript_chunker import estimate_tokens
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    """
+    True for Gemini quota errors (google.api_core ResourceExhausted / HTTP 429), by
+    exception type or status code only: a 429 in the message may be an id or a count.
+    """
+    response = getattr(error, "response", None)
+    return (
+        type(error).__name__ in ("ResourceExhausted", "TooManyRequests")
+        or getattr(error, "code", None) == 429
+        or getattr(error, "status_code", None) == 429
+        or getattr(response, "status_code", None) == 429
+    )
+
+
+class TokenBucket:
+    """
+    Classic token bucket refilled continuously at `per_minute / 60` per second.
+    `reserve` deducts immediately (the balance may go negative) and returns how long
+    the caller must wait, which keeps callers FIFO without polling.
+    """
+
+    def __init__(self, per_minute):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.available = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount=1.0) -> float:
+        with self._lock:
+            now = time.monotonic()
+            self.available = min(self.capacity, self.available + (now - self.updated) * self.rate)
+            self.updated = now
+            self.available -= min(amount, self.capacity)
+            return 0.0 if self.available >= 0 else -self.available / self.rate
+
+
+class RateLimiter:
+    """
+    Process-wide limiter for Gemini calls: requests/min and tokens/min buckets,
+    plus exponential backoff with jitter when the API still answers 429.
+    A limit of 0 disables that bucket.
+    """
+
+    def __init__(self, requests_per_minute=60, tokens_per_minute=1_000_000, max_retries=5,
+                 backoff_base=1.0, backoff_max=30.0):
+        self.buckets = []
+        if requests_per_minute:
+            self.buckets.append(("requests", TokenBucket(requests_per_minute)))
+        if tokens_per_minute:
+            self.buckets.append(("tokens", TokenBucket(tokens_per_minute)))
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._lock = threading.Lock()
+        self._stats = {"queue_depth": 0, "max_queue_depth": 0, "calls": 0, "throttled": 0,
+                       "wait_seconds": 0.0, "retries_429": 0}
+
+    def _reserve(self, tokens) -> float:
+        amounts = {"requests": 1, "tokens": tokens}
+        return max([bucket.reserve(amounts[name]) for name, bucket in self.buckets] or [0.0])
+
+    def _enter(self, wait):
+        with self._lock:
+            self._stats["calls"] += 1
+            if wait > 0:
+                self._stats["throttled"] += 1
+                self._stats["wait_seconds"] += wait
+                self._stats["queue_depth"] += 1
+                self._stats["max_queue_depth"] = max(self._stats["max_queue_depth"], self._stats["queue_depth"])
+
+    def _leave(self, wait):
+        if wait > 0:
+            with self._lock:
+                self._stats["queue_depth"] -= 1
+
+    def _backoff(self, attempt) -> float:
+        with self._lock:
+            self._stats["retries_429"] += 1
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def call(self, fn, prompt, *args, **kwargs):
+        """Run `fn(prompt, ...)` once the buckets allow it, retrying 429s with backoff."""
+        tokens = estimate_tokens(prompt)
+        for attempt in range(self.max_retries + 1):
+            wait = self._reserve(tokens)
+            self._enter(wait)
+            try:
+                time.sleep(wait)
+            finally:
+                self._leave(wait)
+            try:
+                return fn(prompt, *args, **kwargs)
+            except Exception as e:
+                if attempt == self.max_retries or not is_rate_limit_error(e):
+                    raise
+                time.sleep(self._backoff(attempt))
+
+    async def call_async(self, fn, prompt, *args, **kwargs):
+        """Async twin of `call` for coroutine functions such as generate_content_async."""
+        tokens = estimate_tokens(prompt)
+        for attempt in range(self.max_retries + 1):
+            wait = self._reserve(tokens)
+            self._enter(wait)
+            try:
+                await asyncio.sleep(wait)
+            finally:
+                self._leave(wait)
+            try:
+                return await fn(prompt, *args, **kwargs)
+            except Exception as e:
+                if attempt == self.max_retries or not is_rate_limit_error(e):
+                    raise
+                await asyncio.sleep(self._backoff(attempt))
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        stats["wait_seconds"] = round(stats["wait_seconds"], 3)
+        return stats
+
+
+class SingleFlight:
+    """
+    Coalesces identical concurrent async calls: while a call for `key` is running,
+    later callers await the same result instead of starting their own.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self.coalesced = 0
+
+    async def do(self, key, fn):
+        future = self._calls.get(key)
+        if future is not None:
+            self.coalesced += 1
+        else:
+            future = asyncio.ensure_future(fn())
+            self._calls[key] = future
+
+            def forget(done):
+                if self._calls.get(key) is done:
+                    del self._calls[key]
+
+            future.add_done_callback(forget)
+        # shield: one caller disconnecting must not cancel the call the others are waiting on
+        return await asyncio.shield(future)
+
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+
+_limiter = None
+_limiter_lock = threading.Lock()  # concurrent first calls must share one set of buckets
+
+
+def get_rate_limiter() -> RateLimiter:
+    """Process-wide limiter configured from GEMINI_RPM / GEMINI_TPM / GEMINI_MAX_RETRIES."""
+    global _limiter
+    if _limiter is None:
+        with _limiter_lock:
+            if _limiter is None:
+                _limiter = RateLimiter(
+                    requests_per_minute=float(os.getenv("GEMINI_RPM", "60")),
+                    tokens_per_minute=float(os.getenv("GEMINI_TPM", "1000000")),
+                    max_retries=int(os.getenv("GEMINI_MAX_RETRIES", "5")),
+                )
+    return _limiter
@@ -0,0 +1,175 @@
+import re
+import threading
+from dataclasses import dataclass, field
+from task_schema import coerce_task
+
+# Deadline phrases the rules understand ("by Friday", "tomorrow", "end of next week", "Nov 14", ...)
+WEEKDAY = r"(?:mon|tues|wednes|thurs|fri|satur|sun)day"
+MONTH = r"(?:jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)[a-z]*\.?"
+# Relative phrases also read as a deadline without "by"/"on" in front ("send the notes tomorrow")
+RELATIVE_DEADLINE = (
+    rf"(?:(?:this|next|coming)\s+)?{WEEKDAY}(?:\s+(?:morning|afternoon|evening|night))?"
+    r"|today|tonight|tomorrow(?:\s+(?:morning|afternoon|evening))?|eod|eow|end\s+of\s+(?:the\s+)?(?:day|week|month)"
+    r"|(?:next|this)\s+(?:week|month)|end\s+of\s+next\s+(?:week|month)"
+)
+DEADLINE = (
+    rf"{RELATIVE_DEADLINE}"
+    rf"|{MONTH}\s+\d{{1,2}}(?:st|nd|rd|th)?|\d{{1,2}}(?:st|nd|rd|th)?\s+(?:of\s+)?{MONTH}|\d{{4}}-\d{{2}}-\d{{2}}"
+)
+PERSON = r"[A-Z][a-z]+(?:\s+[A-Z][a-z]+)?"
+NOT_PEOPLE = {"i", "we", "you", "they", "he", "she", "it", "this", "that", "the", "someone", "everyone",
+              "somebody", "nobody", "team", "let", "lets", "there", "then", "also", "so", "ok", "okay",
+              # Days and dates ("Friday will be the launch")
+              "monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday", "today", "tonight",
+              "tomorrow", "next", "week", "month", "january", "february", "march", "april", "june", "july",
+              "august", "september", "october", "november", "december",
+              # Departments and groups: an LLM decides who in them owns the task
+              "marketing", "sales", "engineering", "design", "product", "finance", "legal", "support", "ops",
+              "operations", "hr", "management", "leadership", "everybody", "all", "client", "customer", "vendor"}
+
+# Speaker labels ("Riya:", "RIYA SHARMA:"): one to three capitalised words, no digits or sentence punctuation
+LABEL_WORD = r"[A-Z](?:[^\W\d_]|['’-])*"
+SPEAKER_NAME = rf"{LABEL_WORD}(?:[ \t]+{LABEL_WORD}){{0,2}}"
+# Line labels that look like a speaker but are not one ("Note: ...", "Action items: ...")
+NOT_SPEAKERS = {"note", "notes", "nb", "ps", "fyi", "re", "subject", "action", "actions", "action item", "action items",
+                "todo", "to do", "to-do", "task", "tasks", "agenda", "summary", "meeting summary", "minutes",
+                "decision", "decisions", "update", "updates", "status", "next steps", "follow up", "follow-up",
+                "reminder", "deadline", "owner", "topic", "question", "answer", "q", "a", "outcome", "attendees",
+                "context", "background", "important", "warning", "monday", "tuesday", "wednesday", "thursday",
+                "friday", "saturday", "sunday", "today", "tomorrow"}
+SPEAKER_LABEL = re.compile(rf"^\s*(?:\[[^\]]*\]\s*)?({SPEAKER_NAME})\s*:\s+")
+SENTENCE_SPLIT = re.compile(r"(?<=[.!?;])\s+|\n+")
+
+DUE = r"(?i:by|before|on|until|due)"
+# Optional trailing deadline: any DEADLINE after a DUE word, or a bare relative one
+WHEN = rf"(?:\s+(?:{DUE}\s+(?P<deadline>(?i:{DEADLINE}))|(?P<relative>(?i:{RELATIVE_DEADLINE}))))?$"
+# (pattern, confidence); every pattern captures person, task and optionally deadline.
+# Names must be capitalised, the rest is case-insensitive.
+PATTERNS = [
+    (re.compile(
+        rf"^(?P<person>{PERSON})\s+(?i:will|shall|is going to)\s+(?P<task>.+?){WHEN}"), 0.95),
+    (re.compile(
+        rf"^(?P<person>{PERSON})\s+(?i:to|needs to|has to|should|must)\s+(?P<task>.+?)"
+        rf"(?:\s+(?:{DUE}\s+)?(?P<deadline>(?i:{DEADLINE})))?$"), 0.9),
+    (re.compile(
+        rf"^(?P<person>{PERSON})\s+(?i:is responsible for|is in charge of|is handling)\s+(?P<task>.+?){WHEN}"), 0.85),
+]
+# First person: "I'll send the deck by Monday" spoken by a labelled speaker
+FIRST_PERSON = re.compile(
+    rf"^(?:I\s+will|I'll|I’ll|I\s+am\s+going\s+to|I'm\s+going\s+to)\s+(?P<task>.+?){WHEN}")
+# "Riya will be out next week" describes a state, not an action item
+STATE_PREDICATE = re.compile(r"^(?:be|been|being|is|are|was|were|remain|stay)\b", re.I)
+# Words that make a "will" sentence too uncertain or compound for the rules
+HEDGES = re.compile(r"\b(?:maybe|probably|might|perhaps|if|whether|unless|but|or|not|never|think|try|will)\b|[,?]", re.I)
+MAX_TASK_WORDS = 14
+
+# Sentences with nothing to extract ("Thanks everyone", "Sounds good", "Hi all, thanks for joining")
+ACK = (r"(?:hi|hello|hey|thanks|thank you|ok|okay|sure|yes|yeah|yep|no|great|cool|perfect|sounds good|"
+       r"good (?:morning|afternoon|evening)|bye|see you|agreed|noted|got it|makes sense|um+|uh+)")
+NON_ACTIONABLE = re.compile(
+    rf"^{ACK}(?:[\s,.!]+(?:{ACK}|all|everyone|team|guys|folks|so much|a lot|for joining|again|that|it)\b)*[\s,.!]*$",
+    re.I)
+
+# Below this confidence a sentence is handed to the LLM instead
+MIN_CONFIDENCE = 0.85
+# "Budget will increase", "Google will announce": a subject that never spoke in the transcript may not be a person
+UNKNOWN_PERSON_CONFIDENCE = 0.5
+
+
+@dataclass
+class RuleResult:
+    tasks: list = field(default_factory=list)
+    leftover: list = field(default_factory=list)  # sentences (with speaker label) the rules could not handle
+    confidence: float = 1.0
+
+    @property
+    def complete(self) -> bool:
+        return not self.leftover
+
+
+_stats = {"transcripts": 0, "complete": 0, "partial": 0, "sentences_matched": 0, "sentences_leftover": 0}
+_stats_lock = threading.Lock()
+
+
+def rule_stats():
+    with _stats_lock:
+        return dict(_stats)
+
+
+def _deadline(match) -> str:
+    return (match["deadline"] or match.groupdict().get("relative") or "").strip()
+
+
+def speaker_label(line: str):
+    """Return (speaker or None, rest of line)."""
+    label = SPEAKER_LABEL.match(line)
+    if not label or " ".join(label.group(1).lower().split()) in NOT_SPEAKERS:
+        return None, line
+    return label.group(1).strip(), line[label.end():]
+
+
+def _known_speakers(lines):
+    """Lower-cased full and first names of everyone who speaks in `lines`."""
+    known = set()
+    for line in lines:
+        speaker = speaker_label(line)[0]
+        if speaker:
+            known.update((speaker.lower(), speaker.split()[0].lower()))
+    return known
+
+
+def _match_sentence(sentence: str, speaker, known=frozenset()):
+    """Return (task dict, confidence) for one sentence, or None. `known`: names seen as speakers."""
+    sentence = sentence.strip().rstrip(".!;").strip()
+    if speaker:
+        match = FIRST_PERSON.match(sentence)
+        if match and not STATE_PREDICATE.match(match["task"]):
+            task = match["task"].strip()
+            confidence = 0.6 if HEDGES.search(task) or len(task.split()) > MAX_TASK_WORDS else 0.9
+            return {"person": speaker, "task": task[0].upper() + task[1:],
+                    "deadline": _deadline(match)}, confidence
+    for pattern, confidence in PATTERNS:
+        match = pattern.match(sentence)
+        if match and not NOT_PEOPLE.intersection(match["person"].lower().split()) \
+                and not STATE_PREDICATE.match(match["task"]):
+            task = match["task"].strip()
+            if HEDGES.search(task) or len(task.split()) > MAX_TASK_WORDS:
+                confidence -= 0.3
+            if match["person"].lower() not in known:
+                confidence = min(confidence, UNKNOWN_PERSON_CONFIDENCE)
+            return {"person": match["person"], "task": task[0].upper() + task[1:],
+                    "deadline": _deadline(match)}, confidence
+    return None
+
+
+def extract_rule_based(transcript: str) -> RuleResult:
+    """
+    Pattern-based task extraction for labelled transcripts ("Riya: I'll finalize X by
+    Friday", "Arjun to contact vendors tomorrow" where Arjun speaks). A named owner
+    only counts when that name speaks somewhere in the transcript. Sentences no rule
+    covers with confidence >= MIN_CONFIDENCE are returned in `leftover` for the LLM.
+    """
+    result = RuleResult()
+    confidences = []
+    lines = (transcript or "").splitlines()
+    known = _known_speakers(lines)
+    for line in lines:
+        speaker, line = speaker_label(line)
+        for sentence in SENTENCE_SPLIT.split(line):
+            if not sentence.strip() or NON_ACTIONABLE.match(sentence.strip()):
+                continue
+            matched = _match_sentence(sentence, speaker, known)
+            task = coerce_task(matched[0]) if matched and matched[1] >= MIN_CONFIDENCE else None
+            if task is None:
+                result.leftover.append(f"{speaker}: {sentence.strip()}" if speaker else sentence.strip())
+            else:
+                result.tasks.append(task)
+                confidences.append(matched[1])
+
+    result.confidence = min(confidences) if confidences and not result.leftover else 0.0
+    with _stats_lock:
+        _stats["transcripts"] += 1
+        _stats["complete" if result.complete else "partial"] += 1
+        _stats["sentences_matched"] += len(result.tasks)
+        _stats["sentences_leftover"] += len(result.leftover)
+    return result
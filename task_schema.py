@@ -0,0 +1,171 @@
+import json
+import re
+import threading
+from dataclasses import asdict, dataclass
+from typing import Optional
+from deadline_parser import parse_deadline
+from task_stream import IncrementalTaskParser
+
+# Schema handed to Gemini's structured-output mode (response_mime_type=application/json)
+TASK_RESPONSE_SCHEMA = {
+    "type": "ARRAY",
+    "items": {
+        "type": "OBJECT",
+        "properties": {
+            "person": {"type": "STRING"},
+            "task": {"type": "STRING"},
+            "deadline": {"type": "STRING"},
+            "status": {"type": "STRING"},
+        },
+        "required": ["person", "task"],
+    },
+}
+
+# Keys models sometimes use instead of ours
+FIELD_ALIASES = {
+    "person": ("person", "assignee", "owner", "name", "who"),
+    "task": ("task", "action", "action_item", "description", "title"),
+    "deadline": ("deadline", "due", "due_date", "by", "when"),
+    "status": ("status", "state"),
+}
+
+
+class TaskValidationError(ValueError):
+    """Raised when a model reply cannot be turned into a task list, even after repair."""
+
+
+@dataclass
+class Task:
+    person: str
+    task: str
+    deadline: str = ""
+    status: str = "Pending"
+    deadline_iso: Optional[str] = None  # e.g. "2025-11-14T00:00:00", None if unparseable
+
+    def to_dict(self):
+        return asdict(self)
+
+
+_stats = {"responses": 0, "clean": 0, "repaired": 0, "failed": 0, "reasks": 0, "dropped_items": 0}
+_stats_lock = threading.Lock()
+
+
+def record(counter: str, amount=1):
+    with _stats_lock:
+        _stats[counter] += amount
+
+
+def validation_stats():
+    """Counters for structured output plus repair and re-ask rates."""
+    with _stats_lock:
+        stats = dict(_stats)
+    responses = stats["responses"] or 1
+    stats["repair_rate"] = round(stats["repaired"] / responses, 4)
+    stats["reask_rate"] = round(stats["reasks"] / responses, 4)
+    return stats
+
+
+def normalise_deadline(deadline: str) -> Optional[str]:
+    """ISO-8601 form of a natural-language deadline ('Friday', 'next week'), or None."""
+    if not deadline:
+        return None
+    parsed = parse_deadline(deadline)
+    return parsed.isoformat() if parsed else None
+
+
+def coerce_task(item) -> Optional[Task]:
+    """Build a Task from one loosely-shaped dict; None if person or task is missing."""
+    if not isinstance(item, dict):
+        return None
+    lowered = {str(k).strip().lower(): v for k, v in item.items()}
+    values = {}
+    for field, aliases in FIELD_ALIASES.items():
+        value = next((lowered[a] for a in aliases if lowered.get(a) not in (None, "")), "")
+        values[field] = " ".join(str(value).split())
+    if not values["person"] or not values["task"]:
+        return None
+    if values["deadline"].lower() in ("n/a", "none", "null", "not specified", "unspecified"):
+        values["deadline"] = ""
+    return Task(
+        person=values["person"],
+        task=values["task"],
+        deadline=values["deadline"],
+        status=values["status"] or "Pending",
+        deadline_iso=normalise_deadline(values["deadline"]),
+    )
+
+
+def repair_json(text: str) -> str:
+    """Fix the usual defects in model JSON: fences, prose, smart/single quotes, trailing commas."""
+    cleaned = (text or "").strip()
+    cleaned = re.sub(r"^```(?:json)?\s*|\s*```$", "", cleaned)
+    cleaned = cleaned.translate(str.maketrans({"“": '"', "”": '"', "‘": "'", "’": "'"}))
+    starts = [i for i in (cleaned.find("["), cleaned.find("{")) if i != -1]
+    if starts:
+        start = min(starts)
+        end = max(cleaned.rfind("]"), cleaned.rfind("}"))
+        cleaned = cleaned[start:end + 1] if end > start else cleaned[start:]
+    if '"' not in cleaned:
+        cleaned = cleaned.replace("'", '"')
+    cleaned = re.sub(r",\s*([\]}])", r"\1", cleaned)
+    cleaned = re.sub(r"\bNone\b", "null", cleaned)
+    return cleaned
+
+
+def parse_task_reply(text: str):
+    """
+    Turn a model reply into validated Tasks.
+    Tries strict JSON first, then local repair, then salvages whatever complete task
+    objects a truncated reply contains. Raises TaskValidationError if all of that fails.
+    Returns (tasks, repaired).
+    """
+    record("responses")
+    repaired = False
+    try:
+        data = json.loads(text)
+    except (TypeError, ValueError):
+        repaired = True
+        fixed = repair_json(text)
+        try:
+            data = json.loads(fixed)
+        except ValueError:
+            data = IncrementalTaskParser().feed(fixed if fixed.startswith("[") else "[" + fixed)
+            if not data:
+                record("failed")
+                raise TaskValidationError(f"Model reply is not valid task JSON: {text[:120]!r}")
+
+    if isinstance(data, dict):
+        data = data.get("tasks", [data])
+    if not isinstance(data, list):
+        record("failed")
+        raise TaskValidationError("Model reply is not a list of tasks.")
+
+    tasks = [coerce_task(item) for item in data]
+    valid = [t for t in tasks if t is not None]
+    if len(valid) < len(tasks):
+        repaired = True
+        record("dropped_items", len(tasks) - len(valid))
+    record("repaired" if repaired else "clean")
+    return valid, repaired
+
+
+def stored_task(item: dict) -> dict:
+    """
+    Task dict for storing (extraction cache, job results): without deadline_iso,
+    which for "tomorrow" or "Friday" is only right on the day it was resolved.
+    """
+    return {k: v for k, v in item.items() if k != "deadline_iso"}
+
+
+def loaded_task(item: dict) -> dict:
+    """Stored task dict with deadline_iso resolved again against the current time."""
+    return dict(item, deadline_iso=normalise_deadline(item.get("deadline") or ""))
+
+
+def tasks_to_json(tasks) -> str:
+    return json.dumps([stored_task(t.to_dict()) for t in tasks])
+
+
+def tasks_from_json(text: str):
+    """Inverse of tasks_to_json (used for cached, already-validated results)."""
+    return [Task(**loaded_task(item)) for item in json.loads(text)]
@@ -0,0 +1,346 @@
+import bisect
+import os
+import re
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Optional
+from metrics import timed
+from task_schema import normalise_deadline
+
+DONE_STATUSES = {"done", "completed", "complete", "closed", "cancelled"}
+
+# Question shapes the store can answer on its own
+QUESTION_START = re.compile(r"^\s*(?:who|whose|what|when|which|show|list|any|anything|is|are|does|do|how many|tell me)\b", re.I)
+NEAREST = re.compile(r"\b(?:nearest|next|soonest|earliest|closest|upcoming|first)\b.*\b(?:deadline|due|task)|\bdue (?:next|first|soonest)\b", re.I)
+OVERDUE = re.compile(r"\b(?:overdue|past due|late|missed)\b", re.I)
+DUE_WORDS = re.compile(r"\b(?:due|deadlines?|scheduled|by|before)\b", re.I)
+BEFORE = re.compile(r"\b(?:before|by|until)\s+(?P<when>[\w ,-]+?)\s*\??$", re.I)
+PERSON_WORDS = re.compile(r"\b(?:tasks?|doing|do|working|assigned|responsible|owns?|has|have|deadlines?|due|to-?dos?)\b", re.I)
+MAX_QUESTION_WORDS = 25
+
+
+@dataclass
+class StoredTask:
+    id: int
+    meeting_id: str
+    person: str
+    task: str
+    deadline: str
+    deadline_at: Optional[datetime]
+    status: str
+    created: float
+
+    @property
+    def done(self) -> bool:
+        return self.status.lower() in DONE_STATUSES
+
+    def line(self) -> str:
+        """Same shape as the task lines stored in chat memory."""
+        return f"{self.person} → {self.task} (Deadline: {self.deadline or 'N/A'})"
+
+
+def _to_local(value) -> Optional[datetime]:
+    """Naive local datetime from an ISO string/datetime; date-only deadlines mean end of that day."""
+    if not value:
+        return None
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value)
+        except ValueError:
+            return None
+    if value.tzinfo is not None:
+        value = value.astimezone().replace(tzinfo=None)
+    if value.time() == datetime.min.time():
+        value = value.replace(hour=23, minute=59, second=59)
+    return value
+
+
+def _day(dt: datetime) -> str:
+    return dt.strftime("%Y-%m-%d")
+
+
+class TaskStore:
+    """
+    Extracted tasks as structured rows (SQLite) with in-memory indexes on
+    deadline (sorted), assignee, status and meeting, so the common "who / when /
+    what's overdue" questions are answered without vector search or an LLM call.
+    """
+
+    def __init__(self, path="tasks.sqlite"):
+        self.path = path
+        self._lock = threading.RLock()
+        self._tasks = {}
+        self._deadlines = []  # sorted (timestamp, task id)
+        self._by_person = {}  # lower-cased full name and first name -> ids
+        self._by_status = {}
+        self._by_meeting = {}
+        self._conn = None
+        if path:
+            self._conn = sqlite3.connect(path, timeout=10, check_same_thread=False, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS tasks ("
+                " id INTEGER PRIMARY KEY AUTOINCREMENT, meeting_id TEXT NOT NULL, person TEXT NOT NULL,"
+                " task TEXT NOT NULL, deadline TEXT, deadline_at TEXT, status TEXT NOT NULL, created REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS tasks_meeting ON tasks(meeting_id)")
+            for row in self._conn.execute(
+                "SELECT id, meeting_id, person, task, deadline, deadline_at, status, created FROM tasks"
+            ):
+                self._index(StoredTask(row[0], row[1], row[2], row[3], row[4] or "", _to_local(row[5]), row[6], row[7]))
+        self._next_id = max(self._tasks, default=0) + 1
+
+    # -------------------------------
+    # Index maintenance
+    # -------------------------------
+    def _person_keys(self, person):
+        name = " ".join(person.lower().split())
+        return {name, name.split()[0]} if name else set()
+
+    def _person_ids(self, person: str):
+        """Ids of `person`'s tasks: an exact full-name match, or everyone with that first name."""
+        with self._lock:
+            return set(self._by_person.get(" ".join(person.lower().split()), ()))
+
+    def _index(self, task: StoredTask):
+        self._tasks[task.id] = task
+        if task.deadline_at is not None:
+            bisect.insort(self._deadlines, (task.deadline_at.timestamp(), task.id))
+        for key in self._person_keys(task.person):
+            self._by_person.setdefault(key, set()).add(task.id)
+        self._by_status.setdefault(task.status.lower(), set()).add(task.id)
+        self._by_meeting.setdefault(task.meeting_id, set()).add(task.id)
+
+    def _unindex(self, task: StoredTask):
+        self._tasks.pop(task.id, None)
+        if task.deadline_at is not None:
+            entry = (task.deadline_at.timestamp(), task.id)
+            i = bisect.bisect_left(self._deadlines, entry)
+            if i < len(self._deadlines) and self._deadlines[i] == entry:
+                self._deadlines.pop(i)
+        for key in self._person_keys(task.person):
+            self._by_person.get(key, set()).discard(task.id)
+        self._by_status.get(task.status.lower(), set()).discard(task.id)
+        self._by_meeting.get(task.meeting_id, set()).discard(task.id)
+
+    # -------------------------------
+    # Writes
+    # -------------------------------
+    def add_meeting(self, meeting_id: str, tasks):
+        """Store a meeting's extracted tasks (dicts or Task objects), replacing any earlier copy of it."""
+        now = time.time()
+        rows = []
+        for t in tasks:
+            t = t if isinstance(t, dict) else t.to_dict()
+            if not t.get("person") or not t.get("task"):
+                continue
+            deadline = t.get("deadline") or ""
+            if deadline.upper() == "N/A":
+                deadline = ""
+            # Re-resolved here rather than trusting deadline_iso, which may come from an older cached result
+            deadline_at = _to_local(normalise_deadline(deadline))
+            rows.append((t["person"], t["task"], deadline, deadline_at, t.get("status") or "Pending"))
+
+        with self._lock:
+            # Write the rows first; the indexes only change once the transaction has committed
+            ids = []
+            if self._conn is not None:
+                self._conn.execute("BEGIN")
+                try:
+                    self._conn.execute("DELETE FROM tasks WHERE meeting_id = ?", (meeting_id,))
+                    for person, task, deadline, deadline_at, status in rows:
+                        ids.append(self._conn.execute(
+                            "INSERT INTO tasks (meeting_id, person, task, deadline, deadline_at, status, created)"
+                            " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                            (meeting_id, person, task, deadline, deadline_at.isoformat() if deadline_at else None,
+                             status, now),
+                        ).lastrowid)
+                    self._conn.execute("COMMIT")
+                except BaseException:
+                    self._conn.execute("ROLLBACK")
+                    raise
+            else:
+                ids = list(range(self._next_id, self._next_id + len(rows)))
+
+            for task_id in list(self._by_meeting.get(meeting_id, ())):
+                self._unindex(self._tasks[task_id])
+            for task_id, (person, task, deadline, deadline_at, status) in zip(ids, rows):
+                self._next_id = max(self._next_id, task_id + 1)
+                self._index(StoredTask(task_id, meeting_id, person, task, deadline, deadline_at, status, now))
+        return len(rows)
+
+    def delete_meeting(self, meeting_id: str):
+        """Remove every task of one meeting; returns how many were removed."""
+        with self._lock:
+            removed = list(self._by_meeting.pop(meeting_id, ()))
+            for task_id in removed:
+                self._unindex(self._tasks[task_id])
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM tasks WHERE meeting_id = ?", (meeting_id,))
+        return len(removed)
+
+    def set_status(self, task_id: int, status: str):
+        with self._lock:
+            task = self._tasks[task_id]
+            self._by_status.get(task.status.lower(), set()).discard(task_id)
+            task.status = status
+            self._by_status.setdefault(status.lower(), set()).add(task_id)
+            if self._conn is not None:
+                self._conn.execute("UPDATE tasks SET status = ? WHERE id = ?", (status, task_id))
+
+    def clear(self):
+        with self._lock:
+            self._tasks.clear()
+            self._deadlines.clear()
+            self._by_person.clear()
+            self._by_status.clear()
+            self._by_meeting.clear()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM tasks")
+
+    # -------------------------------
+    # Indexed queries
+    # -------------------------------
+    def __len__(self):
+        return len(self._tasks)
+
+    def for_person(self, person: str, include_done=False):
+        """A person's tasks, soonest deadline first (tasks without a deadline last)."""
+        with self._lock:
+            tasks = [self._tasks[i] for i in self._person_ids(person) if include_done or not self._tasks[i].done]
+        return sorted(tasks, key=lambda t: (t.deadline_at is None, t.deadline_at or datetime.max, t.id))
+
+    def with_status(self, status: str):
+        with self._lock:
+            return [self._tasks[i] for i in sorted(self._by_status.get(status.lower(), ()))]
+
+    def for_meeting(self, meeting_id: str):
+        with self._lock:
+            return [self._tasks[i] for i in sorted(self._by_meeting.get(meeting_id, ()))]
+
+    def due_between(self, start: datetime, end: datetime, include_done=False):
+        """Tasks with a deadline in [start, end], in deadline order."""
+        with self._lock:
+            lo = bisect.bisect_left(self._deadlines, (start.timestamp(), -1))
+            hi = bisect.bisect_right(self._deadlines, (end.timestamp(), float("inf")))
+            tasks = [self._tasks[i] for _, i in self._deadlines[lo:hi]]
+        return [t for t in tasks if include_done or not t.done]
+
+    def overdue(self, now: datetime = None):
+        """Open tasks whose deadline has passed, most overdue first."""
+        now = now or datetime.now()
+        with self._lock:
+            hi = bisect.bisect_left(self._deadlines, (now.timestamp(), -1))
+            tasks = [self._tasks[i] for _, i in self._deadlines[:hi]]
+        return [t for t in tasks if not t.done]
+
+    def nearest_deadline(self, now: datetime = None, person: str = None, limit=1):
+        """The next `limit` open tasks due from `now` on, optionally for one person."""
+        now = now or datetime.now()
+        ids = self._person_ids(person) if person else None
+        found = []
+        with self._lock:
+            start = bisect.bisect_left(self._deadlines, (now.timestamp(), -1))
+            for _, task_id in self._deadlines[start:]:
+                task = self._tasks[task_id]
+                if task.done or (ids is not None and task_id not in ids):
+                    continue
+                found.append(task)
+                if len(found) >= limit:
+                    break
+        return found
+
+    # -------------------------------
+    # Question answering
+    # -------------------------------
+    def _mentioned_person(self, question: str):
+        lowered = question.lower()
+        with self._lock:
+            names = sorted(self._by_person, key=len, reverse=True)  # "riya sharma" before "riya"
+        for name in names:
+            if self._by_person.get(name) and re.search(rf"\b{re.escape(name)}\b", lowered):
+                return name
+        return None
+
+    def _date_range(self, question: str, now: datetime):
+        lowered = question.lower()
+        today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        end_of_day = timedelta(days=1, microseconds=-1)
+        if "today" in lowered or "tonight" in lowered:
+            return now, today + end_of_day, "today"
+        if "tomorrow" in lowered:
+            return today + timedelta(days=1), today + timedelta(days=1) + end_of_day, "tomorrow"
+        if "next week" in lowered:
+            monday = today + timedelta(days=7 - today.weekday())
+            return monday, monday + timedelta(days=6) + end_of_day, "next week"
+        if "this week" in lowered:
+            return now, today + timedelta(days=6 - today.weekday()) + end_of_day, "this week"
+        if "this month" in lowered:
+            next_month = (today.replace(day=28) + timedelta(days=4)).replace(day=1)
+            return now, next_month - timedelta(microseconds=1), "this month"
+        match = BEFORE.search(question)
+        if match:
+            end = _to_local(normalise_deadline(match["when"]))
+            if end is not None:
+                return now, end, f"by {match['when'].strip()}"
+        return None
+
+    @timed("task_store_answer")
+    def answer(self, question: str, now: datetime = None) -> Optional[str]:
+        """
+        Answer nearest-deadline, overdue, date-range and per-person questions from
+        the indexes. Returns None for anything else (the caller falls back to the
+        vector memory).
+        """
+        if not self._tasks or not question or len(question.split()) > MAX_QUESTION_WORDS:
+            return None
+        if not (QUESTION_START.match(question) or question.strip().endswith("?")):
+            return None
+        now = now or datetime.now()
+        person = self._mentioned_person(question)
+
+        ids = self._person_ids(person) if person else None
+
+        if OVERDUE.search(question):
+            tasks = [t for t in self.overdue(now) if ids is None or t.id in ids]
+            if not tasks:
+                return f"{person.title()} has nothing overdue right now. 🎉" if person else "Nothing is overdue right now. 🎉"
+            return "⏰ Overdue:\n" + "\n".join(f"- {t.line()}" for t in tasks)
+
+        window = self._date_range(question, now) if DUE_WORDS.search(question) else None
+        if window:
+            start, end, label = window
+            tasks = [t for t in self.due_between(start, end) if ids is None or t.id in ids]
+            if not tasks:
+                return f"No open tasks are due {label}."
+            return f"📅 Due {label}:\n" + "\n".join(f"- {t.line()}" for t in tasks)
+
+        if NEAREST.search(question):
+            tasks = self.nearest_deadline(now, person=person)
+            if not tasks:
+                return None  # e.g. no parseable deadlines; let the vector memory try
+            t = tasks[0]
+            if person:
+                return f"{t.person}'s next deadline is on {_day(t.deadline_at)} ({t.task})."
+            return f"{t.person} has the nearest deadline, which is on {_day(t.deadline_at)} ({t.task})."
+
+        if person and PERSON_WORDS.search(question):
+            tasks = self.for_person(person)
+            if not tasks:
+                return f"{person.title()} has no open tasks."
+            return "\n".join(f"- {t.line()}" for t in tasks)
+        return None
+
+
+_store = None
+
+
+def get_task_store() -> TaskStore:
+    """Process-wide store at TASK_STORE_PATH (empty = in-memory only)."""
+    global _store
+    if _store is None:
+        _store = TaskStore(os.getenv("TASK_STORE_PATH", "tasks.sqlite"))
+    return _store
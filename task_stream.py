@@ -0,0 +1,62 @@
+import json
+
+
+class IncrementalTaskParser:
+    """
+    Incremental parser for a streamed JSON array of task objects.
+    Feed it text pieces as the model produces them; `feed` returns every task
+    object that became complete in that piece. Prose or ``` fences around the
+    array are ignored.
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self.pos = 0  # next character of buffer to scan
+        self.depth = 0  # 0 = outside the array, 1 = inside it, 2+ = inside an object
+        self.in_string = False
+        self.escaped = False
+        self.object_start = None
+        self.done = False
+
+    def feed(self, text: str):
+        self.buffer += text
+        tasks = []
+        while self.pos < len(self.buffer) and not self.done:
+            char = self.buffer[self.pos]
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif char == "\\":
+                    self.escaped = True
+                elif char == '"':
+                    self.in_string = False
+            elif char == '"' and self.depth > 0:
+                self.in_string = True
+            elif char in "[{":
+                if self.depth == 0 and char == "[":
+                    self.depth = 1
+                elif self.depth > 0:
+                    if self.depth == 1 and char == "{":
+                        self.object_start = self.pos
+                    self.depth += 1
+            elif char in "]}" and self.depth > 0:
+                self.depth -= 1
+                if self.depth == 1 and char == "}" and self.object_start is not None:
+                    try:
+                        task = json.loads(self.buffer[self.object_start:self.pos + 1])
+                        if isinstance(task, dict):
+                            tasks.append(task)
+                    except ValueError:
+                        pass  # malformed element: skip it, keep streaming the rest
+                    self.object_start = None
+                elif self.depth == 0:
+                    self.done = True
+            self.pos += 1
+
+        # Drop text nobody will need again so long streams stay O(n)
+        keep_from = self.object_start if self.object_start is not None else self.pos
+        self.buffer = self.buffer[keep_from:]
+        self.pos -= keep_from
+        if self.object_start is not None:
+            self.object_start = 0
+        return tasks
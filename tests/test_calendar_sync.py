@@ -0,0 +1,57 @@
+"""sync_events when a batch request drops after Google has already answered part of it."""
+from types import SimpleNamespace
+import pytest
+
+google_calendar = pytest.importorskip("google_calendar")
+
+EVENTS = [{"summary": f"Task {n}", "start": "2026-10-20T10:00:00", "key": f"task-{n}"} for n in range(4)]
+
+
+class Service:
+    def __init__(self):
+        self.sent = []  # event ids per executed batch
+
+    def events(self):
+        return SimpleNamespace(insert=lambda calendarId, body: body)
+
+
+class DroppingBatch:
+    """Answers the first `answer` requests of its first execution, then fails in transit."""
+
+    def __init__(self, service, answer):
+        self.service, self.answer, self.requests = service, answer, []
+
+    def add(self, request, callback, request_id):
+        self.requests.append((request, callback, request_id))
+
+    def execute(self):
+        self.service.sent.append([body["id"] for body, _, _ in self.requests])
+        answer = self.answer if len(self.service.sent) == 1 else len(self.requests)
+        for body, callback, request_id in self.requests[:answer]:
+            callback(request_id, {"id": body["id"], "htmlLink": "link"}, None)
+        if answer < len(self.requests):
+            raise OSError("connection reset")
+
+
+def test_items_answered_before_a_dropped_batch_are_not_resent(monkeypatch):
+    service = Service()
+    monkeypatch.setattr(google_calendar, "get_calendar_service", lambda: service)
+    monkeypatch.setattr(google_calendar, "_new_batch", lambda s: DroppingBatch(s, answer=2))
+    monkeypatch.setattr(google_calendar, "_backoff", lambda attempt: None)
+
+    results = google_calendar.sync_events(EVENTS)
+
+    assert [r["action"] for r in results] == ["created"] * 4
+    assert service.sent[1] == service.sent[0][2:]
+
+
+def test_service_is_rebuilt_with_new_credentials(monkeypatch):
+    old, new = SimpleNamespace(valid=False, expired=False, refresh_token=None), SimpleNamespace(valid=True)
+    monkeypatch.setattr(google_calendar, "CALENDAR_API_URL", "")
+    monkeypatch.setattr(google_calendar, "_creds", old)
+    monkeypatch.setattr(google_calendar, "_service", SimpleNamespace(credentials=old))
+    monkeypatch.setattr(google_calendar, "_load_credentials", lambda: new)
+    monkeypatch.setattr(google_calendar, "build", lambda *args, credentials, **kwargs: SimpleNamespace(
+        credentials=credentials))
+
+    assert google_calendar.get_calendar_service().credentials is new
@@ -0,0 +1,20 @@
+"""Deadline phrases resolved against the time they are parsed at, with and without a memo hit."""
+from datetime import datetime
+import pytest
+from deadline_parser import parse_deadline
+
+pytest.importorskip("dateparser")
+
+AFTERNOON = datetime(2026, 10, 16, 15, 30)
+EVENING = datetime(2026, 10, 16, 20, 0)
+
+
+def test_clock_relative_phrases_use_the_time_of_day():
+    assert parse_deadline("in 2 hours", AFTERNOON) == datetime(2026, 10, 16, 17, 30)
+    assert parse_deadline("10am", AFTERNOON) == datetime(2026, 10, 17, 10, 0)  # this morning has passed
+    assert parse_deadline("in 2 hours", EVENING) == datetime(2026, 10, 16, 22, 0)  # same day, not memoised
+
+
+def test_date_phrases_are_memoised_per_day():
+    assert parse_deadline("Nov 14", AFTERNOON) == datetime(2026, 11, 14)
+    assert parse_deadline("Nov 14", EVENING) == datetime(2026, 11, 14)
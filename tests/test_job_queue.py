@@ -0,0 +1,30 @@
+"""Which existing job a resubmitted transcript gets back."""
+import pytest
+from job_queue import JobQueue
+
+PAYLOAD = {"transcript": "Riya will finalize the deck by Friday."}
+
+
+@pytest.fixture
+def queue(tmp_path):
+    return JobQueue(str(tmp_path / "jobs.sqlite"))
+
+
+def test_running_job_is_reused(queue):
+    job_id = queue.submit(PAYLOAD, key="k")
+    assert queue.submit(PAYLOAD, key="k") == job_id
+    queue.claim()
+    assert queue.submit(PAYLOAD, key="k") == job_id
+
+
+def test_finished_job_runs_again(queue):
+    job_id = queue.submit(PAYLOAD, key="k")
+    queue.complete(queue.claim()[0], {"tasks": []})
+    assert queue.submit(PAYLOAD, key="k") != job_id
+
+
+def test_dedupe_window_reuses_recent_results(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.sqlite"), dedupe_window=60)
+    job_id = queue.submit(PAYLOAD, key="k")
+    queue.complete(queue.claim()[0], {"tasks": []})
+    assert queue.submit(PAYLOAD, key="k") == job_id
@@ -0,0 +1,132 @@
+"""
+Crash recovery of ChatMemory: write-ahead log replay, torn log tails, a
+checkpoint interrupted between its two renames, and a rotated log segment
+left behind by a checkpoint that never finished.
+
+Each test runs in its own working directory with hashed bag-of-words
+embeddings, so no model is loaded and no project files are touched.
+"""
+import atexit
+import os
+import pytest
+import memory_manager
+from benchmarks.fakes import FakeEmbeddings
+from memory_index import serialize_partitions
+from memory_manager import TEXTS_PATH, WAL_PATH, ChatMemory, _atomic_write
+
+TEXTS = ["Riya will finalize the campaign", "Arjun will contact vendors", "Nisha will draft the email",
+         "Kavya will review the budget"]
+
+
+@pytest.fixture(autouse=True)
+def workdir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(memory_manager, "get_embeddings", lambda model_name="fake": FakeEmbeddings(model_name))
+    return tmp_path
+
+
+def crash(memory):
+    """Drop `memory` like a killed process would: the log is on disk, no checkpoint is written."""
+    atexit.unregister(memory.close)
+    memory._closed = True  # stops the checkpoint thread
+    memory.wal.close()
+    memory._writer_lock.close()
+
+
+def open_memory(capsys):
+    """(ChatMemory, number of writes it recovered from the log)."""
+    capsys.readouterr()
+    memory = ChatMemory()
+    recovered = [line for line in capsys.readouterr().out.splitlines() if "Recovered" in line]
+    return memory, int(recovered[0].split()[2]) if recovered else 0
+
+
+def vector_count(memory):
+    return sum(index.ntotal for index in memory.partitions.values())
+
+
+def test_recovered_writes_are_checkpointed(capsys):
+    memory, _ = open_memory(capsys)
+    memory.add_many(TEXTS)
+    crash(memory)
+
+    memory, recovered = open_memory(capsys)
+    assert recovered == len(TEXTS)
+    memory.close()  # nothing new was written, the replayed records still need a checkpoint
+    assert os.path.exists(memory.db_path) and os.path.exists(TEXTS_PATH)
+
+    memory, recovered = open_memory(capsys)
+    assert recovered == 0
+    assert sorted(e["text"] for e in memory.entries.values()) == sorted(TEXTS)
+    memory.close()
+
+
+def test_torn_log_tail_is_ignored_and_cut_off(capsys):
+    memory, _ = open_memory(capsys)
+    memory.add_many(TEXTS[:3])
+    crash(memory)
+    intact = os.path.getsize(WAL_PATH)
+    with open(WAL_PATH, "ab") as f:
+        f.write(b"\x40\x00\x00\x00\x01\x02half a record")
+
+    memory, recovered = open_memory(capsys)
+    assert recovered == 3
+    assert os.path.getsize(WAL_PATH) == intact
+    memory.add(TEXTS[3])  # appended after the cut, not after the garbage
+    crash(memory)
+
+    memory, recovered = open_memory(capsys)
+    assert sorted(e["text"] for e in memory.entries.values()) == sorted(TEXTS)
+    memory.close()
+
+
+def test_index_written_without_texts(capsys):
+    memory, _ = open_memory(capsys)
+    memory.add_many(TEXTS[:2])
+    memory.checkpoint()
+    memory.add_many(TEXTS[2:])
+    # Crash between the checkpoint's index rename and its texts rename
+    _atomic_write(memory.db_path, serialize_partitions(memory.partitions))
+    crash(memory)
+
+    memory, recovered = open_memory(capsys)
+    assert recovered == 2
+    assert len(memory.entries) == len(TEXTS)
+    assert vector_count(memory) == len(TEXTS)  # the early vectors were dropped, then replayed once
+    assert len(set(memory.search("vendors", top_k=4))) == len(memory.search("vendors", top_k=4))
+    memory.close()
+
+
+def test_rotated_segment_is_replayed(capsys):
+    memory, _ = open_memory(capsys)
+    memory.add_many(TEXTS[:3])
+    memory.wal.rotate()  # a checkpoint started but never wrote its files
+    memory.add(TEXTS[3])
+    crash(memory)
+    assert os.path.exists(WAL_PATH + ".old")
+
+    memory, recovered = open_memory(capsys)
+    assert recovered == len(TEXTS)
+    assert [memory.entries[i]["text"] for i in sorted(memory.entries)] == TEXTS
+    memory.close()
+    assert not os.path.exists(WAL_PATH + ".old")
+
+    memory, recovered = open_memory(capsys)
+    assert recovered == 0 and len(memory.entries) == len(TEXTS)
+    memory.close()
+
+
+def test_failed_open_releases_the_writer_lock(monkeypatch, capsys):
+    load = memory_manager.load_faiss_memory
+
+    def broken(db_path):
+        raise OSError("unreadable checkpoint")
+
+    monkeypatch.setattr(memory_manager, "load_faiss_memory", broken)
+    with pytest.raises(OSError) as failed:  # kept, as a warm-up future keeps the error and its traceback
+        ChatMemory()
+    monkeypatch.setattr(memory_manager, "load_faiss_memory", load)
+
+    memory, _ = open_memory(capsys)  # not "already open for writing by another process"
+    memory.close()
+    assert failed.value
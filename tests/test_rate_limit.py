@@ -0,0 +1,18 @@
+"""What the Gemini rate limiter treats as a quota error."""
+from types import SimpleNamespace
+from rate_limit import is_rate_limit_error
+
+
+class ResourceExhausted(Exception):
+    pass
+
+
+def test_quota_errors_by_type_or_status():
+    assert is_rate_limit_error(ResourceExhausted("Quota exceeded"))
+    assert is_rate_limit_error(SimpleNamespace(code=429))
+    assert is_rate_limit_error(SimpleNamespace(response=SimpleNamespace(status_code=429)))
+
+
+def test_429_in_the_message_is_not_a_quota_error():
+    assert not is_rate_limit_error(ValueError("Invalid request 4291: 429 bytes at line 429"))
+    assert not is_rate_limit_error(SimpleNamespace(code=400))
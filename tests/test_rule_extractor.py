@@ -0,0 +1,31 @@
+"""Which sentences the rule fast path keeps, and which it hands to the model."""
+from rule_extractor import extract_rule_based
+
+
+def people(transcript):
+    result = extract_rule_based(transcript)
+    return [t.person for t in result.tasks], len(result.leftover)
+
+
+def test_subjects_that_never_speak_go_to_the_model():
+    for sentence in ["Meeting will resume at 3pm.", "Budget will increase by 10 percent.",
+                     "Google will announce the results on Monday.", "Customers will receive the update by Friday.",
+                     "Prices will go up next month."]:
+        assert people(f"Riya: {sentence}") == ([], 1), sentence
+
+
+def test_speakers_own_their_tasks():
+    transcript = "Riya: I'll send the revised deck by Monday.\nArjun: Sure.\nRiya: Arjun will book the venue by Friday."
+    assert people(transcript) == (["Riya", "Arjun"], 0)
+    assert people("Riya Sharma: Riya will send the deck by Friday.") == (["Riya"], 0)
+
+
+def test_note_prefix_is_not_a_speaker():
+    assert people("Note: Arjun will call the vendor by Friday.") == ([], 1)
+
+
+def test_bare_relative_deadlines_are_split_off():
+    tasks = extract_rule_based("Riya: Riya will send the notes tomorrow.\nRiya: I'll update the client next week.\n"
+                               "Riya: Riya will review the Nov 14 numbers.").tasks
+    assert [(t.task, t.deadline) for t in tasks] == [
+        ("Send the notes", "tomorrow"), ("Update the client", "next week"), ("Review the Nov 14 numbers", "")]
@@ -0,0 +1,34 @@
+"""Chunked streaming extraction when chunks fail."""
+import asyncio
+import pytest
+import agent_utils
+
+
+def collect(transcript):
+    async def run():
+        return [task async for task in agent_utils._stream_chunked(transcript)]
+    return asyncio.run(run())
+
+
+@pytest.fixture
+def chunks(monkeypatch):
+    monkeypatch.setattr(agent_utils, "split_transcript", lambda text, *args: text.split("|"))
+
+
+def test_every_chunk_failing_is_an_error(chunks, monkeypatch):
+    async def down(chunk):
+        raise RuntimeError("quota exhausted")
+
+    monkeypatch.setattr(agent_utils, "extract_tasks_async", down)
+    with pytest.raises(RuntimeError, match="All 2 chunks failed: quota exhausted"):
+        collect("first|second")
+
+
+def test_one_failed_chunk_keeps_the_others(chunks, monkeypatch):
+    async def flaky(chunk):
+        if chunk == "second":
+            raise RuntimeError("quota exhausted")
+        return [agent_utils.coerce_task({"person": "Riya", "task": "Send the deck"})]
+
+    monkeypatch.setattr(agent_utils, "extract_tasks_async", flaky)
+    assert [t.person for t in collect("first|second")] == ["Riya"]
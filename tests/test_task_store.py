@@ -0,0 +1,35 @@
+"""TaskStore question answering for people who share a first name, and atomic meeting writes."""
+from datetime import datetime
+import pytest
+from task_store import TaskStore
+
+NOW = datetime(2026, 10, 16, 15, 30)
+TASKS = [
+    {"person": "Riya Kapoor", "task": "Finalize the deck", "deadline": "2026-10-20"},
+    {"person": "Riya Sharma", "task": "Review the budget", "deadline": "2026-10-25"},
+    {"person": "Arjun", "task": "Contact vendors", "deadline": "2026-10-01"},
+]
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = TaskStore(str(tmp_path / "tasks.sqlite"))
+    store.add_meeting("m1", TASKS)
+    return store
+
+
+def test_full_name_picks_that_person(store):
+    assert store.answer("When is Riya Sharma's next deadline?", NOW).startswith("Riya Sharma's")
+    assert store.answer("When is Riya's next deadline?", NOW).startswith("Riya Kapoor's")  # soonest of both
+
+
+def test_overdue_respects_person(store):
+    assert "Arjun" in store.answer("Is Arjun late?", NOW)
+    assert store.answer("Is Riya late?", NOW) == "Riya has nothing overdue right now. 🎉"
+
+
+def test_failed_write_changes_nothing(store):
+    with pytest.raises(Exception):
+        store.add_meeting("m1", [{"person": "Nisha", "task": "Draft"}, {"person": "Omar", "task": object()}])
+    assert sorted(t.person for t in store.for_meeting("m1")) == ["Arjun", "Riya Kapoor", "Riya Sharma"]
+    assert len(TaskStore(store.path)) == len(TASKS)
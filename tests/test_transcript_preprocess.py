@@ -0,0 +1,30 @@
+"""Which line prefixes preprocessing reads as speaker labels."""
+from transcript_preprocess import preprocess_transcript, resolve_first_person, split_speaker
+
+
+def clean(transcript):
+    return preprocess_transcript(transcript).text
+
+
+def test_labels_are_resolved():
+    assert clean("[00:01:02] RIYA SHARMA: I'll send the deck by Friday.") == \
+        "Riya Sharma: Riya Sharma will send the deck by Friday."
+    assert clean("Speaker 2 (Arjun): I will call the vendor.") == "Arjun: Arjun will call the vendor."
+    assert split_speaker("- O'Brien → I'll check") == ("O'Brien", "I'll check")
+
+
+def test_clock_times_are_not_labels():
+    assert clean("Arjun will call the vendor at 4:30 on Friday.") == "Arjun will call the vendor at 4:30 on Friday."
+    assert clean("We meet again at 4:30 on Friday.\nI'll send the notes by Monday.") == \
+        "We meet again at 4:30 on Friday.\nI'll send the notes by Monday."
+
+
+def test_note_and_action_prefixes_are_not_speakers():
+    assert split_speaker("Note: Riya will send the deck.") == (None, "Note: Riya will send the deck.")
+    assert clean("Action items: I'll send it.") == "Action items: I'll send it."
+    assert resolve_first_person("Meeting Summary: I'll follow up") == "Meeting Summary: I'll follow up"
+
+
+def test_mid_line_label_keeps_the_sentence():
+    assert clean("So I'll handle it. Riya: Okay.") == "I'll handle it. Riya: Okay."
+    assert split_speaker("We agreed that Riya Sharma and Arjun: yes")[0] is None
@@ -0,0 +1,110 @@
+import re
+from difflib import SequenceMatcher
+
+# Speaker turn, e.g. "Riya: I'll finalize ..." or "[10:02] Arjun: sounds good"
+SPEAKER_LINE = re.compile(r"^\s*(?:\[[^\]]*\]\s*)?([A-Z][\w.' -]{0,30}?)\s*:\s+\S")
+SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token), good enough for budgeting prompts."""
+    return max(1, len(text) // 4) if text else 0
+
+
+def _split_units(transcript: str):
+    """Break a transcript into speaker turns, or into sentences if there are no speaker labels."""
+    lines = [line for line in transcript.splitlines() if line.strip()]
+    if any(SPEAKER_LINE.match(line) for line in lines):
+        turns, current = [], []
+        for line in lines:
+            if SPEAKER_LINE.match(line) and current:
+                turns.append("\n".join(current))
+                current = []
+            current.append(line.strip())
+        if current:
+            turns.append("\n".join(current))
+        return turns
+    return [s.strip() for s in SENTENCE_END.split(" ".join(lines)) if s.strip()]
+
+
+def _split_oversized(unit: str, max_tokens: int):
+    """Hard-split a single unit that is larger than the whole budget on word boundaries."""
+    words, pieces, current = unit.split(), [], []
+    for word in words:
+        if current and estimate_tokens(" ".join(current + [word])) > max_tokens:
+            pieces.append(" ".join(current))
+            current = []
+        current.append(word)
+    if current:
+        pieces.append(" ".join(current))
+    return pieces
+
+
+def split_transcript(transcript: str, max_tokens=1500, overlap_tokens=150):
+    """
+    Split a transcript into chunks of at most ~max_tokens, cutting only between
+    speaker turns (or sentences). The last ~overlap_tokens of each chunk are repeated
+    at the start of the next so tasks spanning a boundary are not lost.
+    """
+    units = []
+    for unit in _split_units(transcript):
+        if estimate_tokens(unit) > max_tokens:
+            units.extend(_split_oversized(unit, max_tokens))
+        else:
+            units.append(unit)
+
+    chunks, current = [], []
+    for unit in units:
+        if current and estimate_tokens("\n".join(current + [unit])) > max_tokens:
+            chunks.append("\n".join(current))
+            # Carry trailing units forward as overlap
+            carried = []
+            for previous in reversed(current):
+                if estimate_tokens("\n".join([previous] + carried + [unit])) > max_tokens \
+                        or estimate_tokens("\n".join([previous] + carried)) > overlap_tokens:
+                    break
+                carried.insert(0, previous)
+            current = carried
+        current.append(unit)
+    if current:
+        chunks.append("\n".join(current))
+    return chunks
+
+
+def _normalise(text) -> str:
+    return re.sub(r"[^a-z0-9 ]+", "", str(text or "").lower()).strip()
+
+
+def _field(task, name):
+    """Read a field from either a task dict or a task_schema.Task."""
+    return task.get(name) if isinstance(task, dict) else getattr(task, name, None)
+
+
+def find_duplicate(task, tasks, similarity=0.85):
+    """Index of the task in `tasks` with the same person and a near-identical description, or None."""
+    person, text = _normalise(_field(task, "person")), _normalise(_field(task, "task"))
+    for i, existing in enumerate(tasks):
+        if _normalise(_field(existing, "person")) != person:
+            continue
+        if SequenceMatcher(None, _normalise(_field(existing, "task")), text).ratio() >= similarity:
+            return i
+    return None
+
+
+def merge_tasks(task_lists, similarity=0.85):
+    """
+    Merge per-chunk task lists into one, dropping duplicates: same person and a
+    near-identical task description. When duplicates disagree, the copy that has
+    a deadline wins.
+    """
+    merged = []
+    for tasks in task_lists:
+        for task in tasks:
+            if task is None:
+                continue
+            i = find_duplicate(task, merged, similarity)
+            if i is None:
+                merged.append(task)
+            elif not _field(merged[i], "deadline") and _field(task, "deadline"):
+                merged[i] = task
+    return merged
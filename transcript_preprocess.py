@@ -0,0 +1,133 @@
+import re
+import threading
+from dataclasses import dataclass
+from rule_extractor import NON_ACTIONABLE, NOT_SPEAKERS, SPEAKER_NAME
+from transcript_chunker import estimate_tokens
+
+# "[00:01:23]", "00:01:23 -", "(10:02 AM)", "10:02:" at the start of a line
+TIMESTAMP = re.compile(r"^\s*[\[(]?\d{1,2}:\d{2}(?::\d{2})?(?:\.\d+)?\s*(?:[ap]\.?m\.?)?[\])]?\s*[-–:|]?\s*", re.I)
+# "Riya:", ">> RIYA SHARMA:", "Speaker 2 (Riya):", "- Arjun →"; never a colon followed by a digit ("at 4:30")
+SPEAKER = re.compile(
+    rf"^\s*(?:>>|[-*•])?\s*(?:Speaker\s*\d+\s*\((?P<alias>[^)]+)\)|(?P<name>{SPEAKER_NAME}))\s*(?::(?!\d)|→)\s*")
+FILLER = re.compile(r",?\s*\b(?:um+|uh+|erm+|hmm+|uh-huh|you know|i mean|kind of|sort of)\b,?", re.I)
+LEADING_FILLER = re.compile(r"^(?:(?:so|well|okay|ok|alright|right|basically|yeah|anyway)\b[,\s]+)+", re.I)
+
+# First-person phrasing → "<speaker> ..." so the extractor knows who owns the task
+FIRST_PERSON = [
+    (re.compile(r"\bI(?:'|’)ll\b|\bI will\b"), "{speaker} will"),
+    (re.compile(r"\bI(?:'|’)m going to\b|\bI am going to\b"), "{speaker} is going to"),
+    (re.compile(r"\bI need to\b"), "{speaker} needs to"),
+    (re.compile(r"\bI have to\b"), "{speaker} has to"),
+    (re.compile(r"\bI can\b"), "{speaker} can"),
+    (re.compile(r"\bI should\b"), "{speaker} should"),
+]
+
+
+@dataclass
+class PreprocessResult:
+    text: str
+    tokens_before: int
+    tokens_after: int
+    lines_dropped: int
+
+
+_stats = {"transcripts": 0, "tokens_before": 0, "tokens_after": 0, "lines_dropped": 0}
+_stats_lock = threading.Lock()
+
+
+def preprocess_stats():
+    """Cumulative prompt-token savings across all preprocessed transcripts."""
+    with _stats_lock:
+        stats = dict(_stats)
+    stats["saved_ratio"] = round(1 - stats["tokens_after"] / stats["tokens_before"], 4) if stats["tokens_before"] else 0.0
+    return stats
+
+
+def _canonical_speaker(label: str) -> str:
+    label = " ".join(label.split())
+    return label.title() if label.isupper() or label.islower() else label
+
+
+def split_speaker(line: str):
+    """Return (speaker or None, rest of line)."""
+    match = SPEAKER.match(line)
+    if not match or " ".join((match["name"] or "").lower().split()) in NOT_SPEAKERS:
+        return None, line
+    return _canonical_speaker(match["alias"] or match["name"]), line[match.end():]
+
+
+def strip_timestamps(lines):
+    for line in lines:
+        yield TIMESTAMP.sub("", line)
+
+
+def normalise_speakers(lines):
+    """Yield (speaker, text) pairs with consistent speaker names."""
+    for line in lines:
+        yield split_speaker(line)
+
+
+def drop_filler(turns):
+    """Remove filler words and drop turns that are empty or purely acknowledgements/greetings."""
+    for speaker, text in turns:
+        text = LEADING_FILLER.sub("", " ".join(FILLER.sub(" ", text).split())).strip(" ,")
+        if text and not NON_ACTIONABLE.match(text):
+            yield speaker, text
+
+
+def _replace_first_person(text: str, speaker: str) -> str:
+    for pattern, replacement in FIRST_PERSON:
+        text = pattern.sub(replacement.format(speaker=speaker), text)
+    return text
+
+
+def resolve_pronouns(turns):
+    """Replace "I'll", "I will", ... with the speaker's name (the last speaker for unlabelled lines)."""
+    last_speaker = None
+    for speaker, text in turns:
+        last_speaker = speaker or last_speaker
+        yield speaker, _replace_first_person(text, last_speaker) if last_speaker else text
+
+
+def resolve_first_person(text: str) -> str:
+    """Line-preserving pronoun resolution for already formatted text such as memory entries."""
+    resolved, last_speaker = [], None
+    for line in text.split("\n"):
+        last_speaker = split_speaker(line)[0] or last_speaker
+        resolved.append(_replace_first_person(line, last_speaker) if last_speaker else line)
+    return "\n".join(resolved)
+
+
+def collapse_duplicates(turns):
+    """Drop repeated turns (same speaker, same words ignoring case and punctuation)."""
+    seen = set()
+    for speaker, text in turns:
+        key = (speaker, re.sub(r"[^a-z0-9 ]+", "", text.lower()))
+        if key not in seen:
+            seen.add(key)
+            yield speaker, text
+
+
+def iter_preprocessed(lines):
+    """Streaming pipeline: raw transcript lines in, cleaned "Speaker: text" lines out."""
+    turns = normalise_speakers(strip_timestamps(lines))
+    for speaker, text in collapse_duplicates(resolve_pronouns(drop_filler(turns))):
+        yield f"{speaker}: {text}" if speaker else text
+
+
+def preprocess_transcript(transcript: str) -> PreprocessResult:
+    """Clean a whole transcript and report prompt tokens before and after."""
+    lines = [line for line in (transcript or "").splitlines() if line.strip()]
+    cleaned = list(iter_preprocessed(lines))
+    result = PreprocessResult(
+        text="\n".join(cleaned),
+        tokens_before=estimate_tokens(transcript),
+        tokens_after=estimate_tokens("\n".join(cleaned)),
+        lines_dropped=len(lines) - len(cleaned),
+    )
+    with _stats_lock:
+        _stats["transcripts"] += 1
+        _stats["tokens_before"] += result.tokens_before
+        _stats["tokens_after"] += result.tokens_after
+        _stats["lines_dropped"] += result.lines_dropped
+    return result
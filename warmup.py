@@ -0,0 +1,94 @@
+"""
+Background warm-up of slow resources (SDK imports, model clients, the embedding
+model and memory indexes), so a page or API can serve while they load and only
+the first request that needs one waits for it.
+
+    warmup.start("memory", load_memory)   # returns at once; runs once per process
+    memory = warmup.get("memory")         # waits only if it is still loading
+"""
+import os
+import threading
+import time
+from concurrent.futures import Future
+
+# A failed warm-up is retried no sooner than this many seconds later, doubling per failure up to 10 minutes
+RETRY_DELAY = float(os.getenv("WARMUP_RETRY_DELAY", "30"))
+
+_lock = threading.Lock()
+_tasks = {}  # name -> {"future", "started", "seconds", "failures"}
+
+
+def _run(name, fn, future):
+    if not future.set_running_or_notify_cancel():
+        return
+    task = _tasks[name]
+    try:
+        result = fn()
+    except BaseException as e:
+        task["seconds"] = time.perf_counter() - task["started"]
+        task["failures"] += 1
+        print(f"⚠️ Warning: Warm-up of {name} failed - {e}")
+        future.set_exception(e)
+    else:
+        task["seconds"] = time.perf_counter() - task["started"]
+        future.set_result(result)
+
+
+def _failed(task) -> bool:
+    return task["future"].done() and task["future"].exception() is not None
+
+
+def _retry_in(task) -> float:
+    """Seconds until a failed warm-up may be started again (0 once it may)."""
+    delay = min(RETRY_DELAY * 2 ** (min(task["failures"], 10) - 1), 600.0)
+    return max(task["started"] + task["seconds"] + delay - time.perf_counter(), 0.0)
+
+
+def start(name: str, fn) -> Future:
+    """
+    Run `fn()` for `name` on a background (daemon) thread, once per process. Later
+    calls return the same future; a warm-up that failed is started again once its
+    retry delay has passed (until then its failed future is returned).
+    """
+    with _lock:
+        task = _tasks.get(name)
+        if task is not None and not (_failed(task) and not _retry_in(task)):
+            return task["future"]
+        future = Future()
+        _tasks[name] = {"future": future, "started": time.perf_counter(), "seconds": None,
+                        "failures": task["failures"] if task else 0}
+    threading.Thread(target=_run, args=(name, fn, future), name=f"warmup-{name}", daemon=True).start()
+    return future
+
+
+def get(name: str, fn=None, timeout=None):
+    """Result of warm-up `name`, waiting for it if needed (and starting it with `fn` if it never was)."""
+    with _lock:
+        task = _tasks.get(name)
+    if fn is not None and (task is None or _failed(task)):
+        return start(name, fn).result(timeout)
+    if task is None:
+        raise KeyError(f"No warm-up named '{name}'")
+    return task["future"].result(timeout)
+
+
+def ready(name: str) -> bool:
+    """True once `name` has finished loading successfully."""
+    with _lock:
+        task = _tasks.get(name)
+    return task is not None and task["future"].done() and not _failed(task)
+
+
+def status():
+    """{name: {"ready", "seconds", "error", "retry_in"}}; seconds so far while still loading."""
+    with _lock:
+        tasks = dict(_tasks)
+    report = {}
+    for name, task in tasks.items():
+        future = task["future"]
+        error = future.exception() if future.done() else None
+        seconds = task["seconds"] if task["seconds"] is not None else time.perf_counter() - task["started"]
+        report[name] = {"ready": future.done() and error is None, "seconds": round(seconds, 3),
+                        "error": str(error) if error else None,
+                        "retry_in": round(_retry_in(task)) if error else None}
+    return report